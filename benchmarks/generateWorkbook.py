@@ -0,0 +1,186 @@
+###############################
+# Synthetic input generator   #
+###############################
+#Writes court accounting input workbooks in the layout excelConverter.py expects, at any size.
+# Usage: python generateWorkbook.py <output.xlsx> <rows>
+
+import argparse
+import datetime
+
+from openpyxl import Workbook
+
+
+#### GLOBALS ####
+TRUST_NAME = "Smith Family Trust"
+DATE_RANGE = "January through December 2019"
+
+#Data rows written for each row of perScheduleRows, used to spread the requested row count over all sheets
+DATA_BLOCKS_PER_SCHEDULE_ROW = 17
+
+
+def titleRows(sheetTitle):
+    #A1-A3 titles, A2 is what extractSheetNameMappings uses to identify the schedule
+    yield [TRUST_NAME]
+    yield [sheetTitle]
+    yield [DATE_RANGE]
+
+def dataRow(*cells):
+    #Build a row from (colNum, value) pairs
+    row = list()
+    for colNum, value in cells:
+        while len(row) < colNum - 1:
+            row.append(None)
+        row.append(value)
+    return row
+
+def assetRows(sheetTitle, numRows, dateHeaders, assetsRow=5):
+    #ASSETS / TOTAL ASSETS block used by Beginning, Sch H and Market Value
+    yield from titleRows(sheetTitle)
+    for i in range(4, assetsRow-1):
+        yield []
+    yield dataRow(*[(4+i, header) for i, header in enumerate(dateHeaders)])
+
+    yield dataRow((1, "ASSETS"))
+    yield dataRow((2, "Current Assets"))
+    yield dataRow((3, "Checking/Savings"))
+    for k in range(numRows):
+        yield dataRow((3, "Account %d" % (k)), *[(4+i, 100.0 + k) for i in range(len(dateHeaders))])
+    yield dataRow((3, "Total Checking/Savings"))
+    yield dataRow((2, "Total Current Assets"))
+    yield dataRow((1, "TOTAL ASSETS"))
+
+def detailRows(sheetTitle, numRows):
+    #Investment detail, Inventory / Total Inventory block
+    yield from titleRows(sheetTitle)
+    yield dataRow((4, "On Hand"), (5, "Asset Value"))
+    yield dataRow((2, "Inventory"))
+    for k in range(numRows):
+        yield dataRow((3, "Stock %d" % (k)), (4, 10 + k), (5, 1000.0 + k))
+    yield dataRow((2, "Total Inventory"))
+    yield dataRow((1, "TOTAL"))
+
+def additionalRows(numRows):
+    yield from titleRows("Additional Property Received")
+    yield dataRow((3, "Date"), (4, "Name"), (5, "Memo"), (6, "Paid Amount"))
+    yield dataRow((2, "Additional Property Received"))
+    for k in range(numRows):
+        yield dataRow((3, datetime.datetime(2019, 1, 1 + k % 28)), (4, "Donor %d" % (k)), (5, "Gift"), (6, 50.0 + k))
+    yield dataRow((2, "Total Additional Property Received"))
+    yield dataRow((1, "TOTAL"))
+
+def schARows(numRows):
+    yield from titleRows("Schedule A - Receipts")
+    yield dataRow((3, "Date"), (4, "Memo"), (5, "Paid Amount"))
+    for section in ["Interest", "Dividends"]:
+        yield dataRow((2, section))
+        for k in range(numRows):
+            if section == "Dividends":
+                memo = "Dividends received from Fund %d" % (k)
+            else:
+                memo = "Interest"
+            yield dataRow((3, datetime.datetime(2019, 2, 1 + k % 28)), (4, memo), (5, 10.0 + k))
+        yield dataRow((2, "Total " + section))
+    yield dataRow((1, "TOTAL"))
+
+def schBERows(numRows):
+    #Paired rows per sale: first row holds the proceeds (Credit), second one the cost basis (Debit)
+    yield from titleRows("Schedule B/E - For Export To Excel Only")
+    yield dataRow((2, "Date"), (3, "Qty"), (4, "Item"), (5, "Debit"), (6, "Credit"))
+    yield []
+    for k in range(numRows):
+        if k % 3 != 0:
+            costBasis = 150.0 + k
+        else:
+            costBasis = 250.0 + k
+        yield dataRow((2, datetime.datetime(2019, 3, 1 + k % 28)), (3, 5 + k), (4, "Security %d" % (k)), (6, 200.0 + k))
+        yield dataRow((4, "Security %d" % (k)), (5, costBasis))
+    yield dataRow((1, "TOTAL"))
+
+def schCRows(numRows):
+    yield from titleRows("Schedule C - Net Income from Trade or Business")
+    yield dataRow(*[(3+i, header) for i, header in enumerate(["Type", "Date", "Num", "Name", "Memo", "Paid Amount", "Balance"])])
+    yield dataRow((2, "Rent"))
+    for k in range(numRows):
+        yield dataRow((3, "Deposit"), (4, datetime.datetime(2019, 4, 1 + k % 28)), (6, "Tenant %d" % (k)), (8, 20.0))
+    yield dataRow((2, "Total Rent"))
+    yield dataRow((1, "TOTAL"), (9, 20.0 * numRows))
+
+def schDRows(numRows):
+    yield from titleRows("Schedule D - Disbursements")
+    yield dataRow(*[(4+i, header) for i, header in enumerate(["Name", "Date", "Memo", "Num", "Paid Amount"])])
+    rowNum = 5
+    for section in ["Fees", "Taxes"]:
+        yield dataRow((2, section))
+        rowNum += 1
+        sectionStartRow = rowNum
+        for k in range(numRows):
+            yield dataRow((4, "Payee %d" % (k)), (5, datetime.datetime(2019, 5, 1 + k % 28)), (6, "Memo"), (8, 30.0 + k))
+            rowNum += 1
+        yield dataRow((2, "Total " + section), (8, "=ROUND(SUM(H%d:H%d),5)" % (sectionStartRow, rowNum - 1)))
+        rowNum += 1
+    yield dataRow((1, "TOTAL"))
+
+def schFRows(numRows):
+    yield from titleRows("Schedule F - Net Loss from Trade or Business")
+    yield dataRow((3, "Type"), (4, "Date"), (5, "Num"), (7, "Name"), (8, "Memo"), (9, "Paid Amount"))
+    yield dataRow((2, "Repairs"))
+    for k in range(numRows):
+        yield dataRow((3, "Check"), (4, datetime.datetime(2019, 6, 1 + k % 28)), (7, "Vendor %d" % (k)), (9, -15.0))
+    yield dataRow((2, "Total Repairs"))
+    yield dataRow((1, "TOTAL"), (9, -15.0 * numRows))
+
+def schGRows(numRows):
+    yield from titleRows("Schedule G - Distributions")
+    yield []
+    for k in range(numRows):
+        yield dataRow((3, "Beneficiary %d" % (k)), (5, k * 2.0))
+    yield []
+    yield dataRow((1, "TOTAL"), (5, "=SUM(E5:E%d)" % (4 + numRows)))
+
+def liabilityRows(numRows):
+    yield from titleRows("Liability Detail")
+    yield []
+    for k in range(numRows + 3):
+        yield dataRow((4, "Loan %d" % (k)), (7, k * 3.0))
+
+def generateWorkbook(outputPath, rows):
+    #rows is the approximate total number of data rows over all schedules
+    numRows = max(1, rows // DATA_BLOCKS_PER_SCHEDULE_ROW)
+
+    sheets = [
+        assetRows("Property on Hand at Beginning of Account", numRows, ["Dec 31, 18"]),
+        detailRows("Property on Hand at Beginning of Account - Investment Detail", numRows),
+        additionalRows(numRows),
+        schARows(numRows),
+        schBERows(numRows),
+        schCRows(numRows),
+        schDRows(numRows),
+        schFRows(numRows),
+        schGRows(numRows),
+        assetRows("Schedule H - Property on Hand at Close of Account", numRows, ["Dec 31, 19"]),
+        detailRows("Schedule H - Investment Detail", numRows),
+        assetRows("Estimated Market Value", numRows, ["Dec 31, 18", "Dec 31, 19"], assetsRow=6),
+        liabilityRows(numRows),
+    ]
+
+    #Write-only keeps memory flat even for the 1M row sizes
+    workbook = Workbook(write_only=True)
+    for sheetNum, sheetRows in enumerate(sheets, 1):
+        sheet = workbook.create_sheet(title="Sheet%d" % (sheetNum))
+        for row in sheetRows:
+            sheet.append(row)
+    workbook.save(outputPath)
+
+    return numRows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic court accounting input workbook.")
+    parser.add_argument("output", help="Path of the .xlsx file to write")
+    parser.add_argument("rows", type=int, help="Approximate number of data rows across all schedules")
+    args = parser.parse_args(argv)
+
+    numRows = generateWorkbook(args.output, args.rows)
+    print("Wrote %s (%d rows per schedule)" % (args.output, numRows))
+
+if __name__ == '__main__':
+    main()
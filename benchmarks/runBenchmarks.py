@@ -0,0 +1,257 @@
+###############################
+# Conversion benchmark runner #
+###############################
+#Times full MigrateExcel conversions of generated workbooks and compares them against stored baselines.
+# Usage: python runBenchmarks.py [--sizes 100 1000 ...] [--save-baseline]
+
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+#Benchmarks live next to the converter, not in a package
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import excelConverter
+from generateWorkbook import generateWorkbook
+
+
+#### GLOBALS ####
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+ALL_SIZES = [100, 1000, 10000, 100000, 1000000]
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baselines.json")
+DEFAULT_TOLERANCE = 0.20
+
+#Modules that must only be imported when they are used, a plain "import excelConverter" (every worker process) may not load them
+DEFERRED_MODULES = ["openpyxl", "tkinter", "pyarrow", "sqlite3"]
+
+#Startup is measured in a fresh interpreter, like a spawned worker process
+STARTUP_SCRIPT = '''import sys, time
+start = time.perf_counter()
+import excelConverter
+print(time.perf_counter() - start)
+print(",".join(sorted(name for name in sys.modules if "." not in name)))
+'''
+
+
+def runConversion(inputPath, streamOutput, fastReader):
+    #Runs in a fresh worker process so peak RSS belongs to this conversion only
+    result = excelConverter.convertWorkbook(inputPath, streamOutput=streamOutput, profile=True, fastReader=fastReader)
+
+    peakRssKB = None
+    stageSeconds = dict()
+    if result["profileReport"] is not None:
+        with open(result["profileReport"]) as reportFile:
+            report = json.load(reportFile)
+        peakRssKB = report["peakRssKB"]
+        for stage in report["stages"]:
+            if stage["depth"] == 0:
+                stageSeconds[stage["stage"]] = stageSeconds.get(stage["stage"], 0.0) + stage["wallSeconds"]
+        os.remove(result["profileReport"])
+
+    if result["output"] is not None:
+        os.remove(result["output"])
+
+    return {"success": result["success"], "seconds": result["seconds"], "peakRssKB": peakRssKB, "stageSeconds": stageSeconds}
+
+def benchmarkSize(workDir, rows, repeat, streamOutput, fastReader):
+    inputPath = os.path.join(workDir, "benchmark_%d.xlsx" % (rows))
+    if not os.path.exists(inputPath):
+        print("  Generating %d row workbook.." % (rows))
+        generateWorkbook(inputPath, rows)
+
+    runs = list()
+    for i in range(repeat):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            run = executor.submit(runConversion, inputPath, streamOutput, fastReader).result()
+        if not run["success"]:
+            print("  ERROR: Conversion of %d row workbook failed" % (rows))
+        runs.append(run)
+        print("  %8d rows  run %d: %8.3fs" % (rows, i + 1, run["seconds"]))
+
+    #Median is less sensitive to a single noisy run than the mean
+    peakRssValues = [run["peakRssKB"] for run in runs if run["peakRssKB"] is not None]
+    slowestStages = sorted(runs[-1]["stageSeconds"].items(), key=lambda stage: -stage[1])[:5]
+    return {"rows": rows, "streamOutput": streamOutput, "fastReader": fastReader, "repeat": repeat,
+            "seconds": statistics.median(run["seconds"] for run in runs),
+            "peakRssKB": max(peakRssValues) if peakRssValues else None,
+            "success": all(run["success"] for run in runs),
+            "slowestStages": dict(slowestStages)}
+
+def slowestImports(count=5):
+    #Parses python -X importtime (3.7+), returns the slowest top level imports of excelConverter as {module: seconds}
+    if sys.version_info < (3, 7):
+        return dict()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import excelConverter"],
+                             cwd=os.path.dirname(BENCHMARK_DIR), stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+    #Lines look like "import time:  self [us] | cumulative | <two spaces per nesting level>package"
+    imports = dict()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        cumulative, name = line.split("|")[1:3]
+        if not cumulative.strip().isdigit():
+            continue
+        #Direct imports of excelConverter are nested one level
+        if name.startswith("   ") and not name.startswith("    "):
+            imports[name.strip()] = int(cumulative) / 1000000.0
+
+    return dict(sorted(imports.items(), key=lambda item: -item[1])[:count])
+
+def benchmarkStartup(repeat):
+    runs = list()
+    loadedModules = set()
+    for i in range(repeat):
+        process = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=os.path.dirname(BENCHMARK_DIR),
+                                 stdout=subprocess.PIPE, universal_newlines=True)
+        lines = process.stdout.splitlines()
+        if process.returncode != 0 or len(lines) < 2:
+            print("  ERROR: import excelConverter failed")
+            return {"seconds": None, "success": False, "eagerModules": list(), "slowestImports": dict()}
+        runs.append(float(lines[0]))
+        loadedModules.update(lines[1].split(","))
+        print("  import excelConverter  run %d: %8.3fs" % (i + 1, runs[-1]))
+
+    eagerModules = [name for name in DEFERRED_MODULES if name in loadedModules]
+    for name in eagerModules:
+        print("  ERROR: %s is imported at startup" % (name))
+
+    return {"seconds": statistics.median(runs), "success": not eagerModules, "eagerModules": eagerModules,
+            "slowestImports": slowestImports()}
+
+def compareStartupToBaseline(startup, baselines, tolerance):
+    #Returns the number of regressions found
+    baseline = baselines.get("startup")
+
+    status = "OK"
+    timeChange = ""
+    baselineSeconds = ""
+    if not startup["success"]:
+        status = "FAILED" if startup["seconds"] is None else "REGRESSION (eager %s)" % (", ".join(startup["eagerModules"]))
+    elif baseline is None:
+        status = "NO BASELINE"
+    else:
+        baselineSeconds = "%.3f" % (baseline["seconds"])
+        timeChange = "%+.0f%%" % (100.0 * (startup["seconds"] / baseline["seconds"] - 1))
+        if startup["seconds"] > baseline["seconds"] * (1 + tolerance):
+            status = "REGRESSION (time)"
+
+    seconds = "-" if startup["seconds"] is None else "%.3f" % (startup["seconds"])
+    print("  %-16s %10s %10s %8s %12s %12s  %s" % ("startup", seconds, baselineSeconds, timeChange, "-", "", status))
+    for name, seconds in startup["slowestImports"].items():
+        print("    import %-24s %8.3fs" % (name, seconds))
+
+    return 0 if status in ("OK", "NO BASELINE") else 1
+
+def caseName(rows, streamOutput, fastReader=False):
+    return "%d%s%s" % (rows, "-stream" if streamOutput else "", "-fast" if fastReader else "")
+
+def loadBaselines(baselinePath):
+    if not os.path.exists(baselinePath):
+        return dict()
+    with open(baselinePath) as baselineFile:
+        return json.load(baselineFile)
+
+def compareToBaseline(results, baselines, tolerance):
+    #Returns the number of regressions found
+    numRegressions = 0
+    print("\n### BENCHMARK RESULTS ###")
+    print("  %-16s %10s %10s %8s %12s %12s  %s" % ("Case", "Seconds", "Baseline", "Change", "Peak RSS KB", "Baseline", "Status"))
+    for result in results:
+        name = caseName(result["rows"], result["streamOutput"], result["fastReader"])
+        baseline = baselines.get("cases", dict()).get(name)
+
+        status = "OK"
+        timeChange = ""
+        baselineSeconds = ""
+        baselineRss = ""
+        if not result["success"]:
+            status = "FAILED"
+            numRegressions += 1
+        elif baseline is None:
+            status = "NO BASELINE"
+        else:
+            baselineSeconds = "%.3f" % (baseline["seconds"])
+            timeChange = "%+.0f%%" % (100.0 * (result["seconds"] / baseline["seconds"] - 1))
+            if result["seconds"] > baseline["seconds"] * (1 + tolerance):
+                status = "REGRESSION (time)"
+                numRegressions += 1
+
+            if baseline.get("peakRssKB") and result["peakRssKB"]:
+                baselineRss = "%d" % (baseline["peakRssKB"])
+                if result["peakRssKB"] > baseline["peakRssKB"] * (1 + tolerance):
+                    status = "REGRESSION (memory)" if status == "OK" else status + " (memory)"
+                    numRegressions += 1
+
+        peakRss = "-" if result["peakRssKB"] is None else "%d" % (result["peakRssKB"])
+        print("  %-16s %10.3f %10s %8s %12s %12s  %s" % (name, result["seconds"], baselineSeconds, timeChange, peakRss, baselineRss, status))
+
+    return numRegressions
+
+def saveBaselines(baselinePath, baselines, results, startup):
+    #Only the cases that were run are replaced, others are kept
+    baselines.setdefault("cases", dict())
+    baselines["machine"] = "%s %s, Python %s" % (platform.node(), platform.machine(), platform.python_version())
+    if startup["success"]:
+        baselines["startup"] = startup
+    for result in results:
+        if result["success"]:
+            baselines["cases"][caseName(result["rows"], result["streamOutput"], result["fastReader"])] = result
+
+    with open(baselinePath, "w") as baselineFile:
+        json.dump(baselines, baselineFile, indent=2, sort_keys=True)
+    print("\nSaved baselines to %s" % (baselinePath))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark full workbook conversions and flag regressions against stored baselines.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts to benchmark (default: %s)" % (DEFAULT_SIZES))
+    parser.add_argument("--all", action="store_true", help="Benchmark every size up to 1M rows: %s" % (ALL_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="Conversions per size, the median is reported")
+    parser.add_argument("--stream", action="store_true", help="Benchmark the streaming output backend")
+    parser.add_argument("--fast-reader", action="store_true", help="Benchmark the direct SpreadsheetML input reader")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown/growth before flagging a regression (0.2 = 20%%)")
+    parser.add_argument("--work-dir", default=None, help="Keep generated workbooks in this directory instead of a temporary one")
+    parser.add_argument("--startup-only", action="store_true", help="Only benchmark the import time of a fresh interpreter/worker process")
+    args = parser.parse_args(argv)
+
+    sizes = list() if args.startup_only else ALL_SIZES if args.all else args.sizes
+
+    print("Benchmarking startup..")
+    startup = benchmarkStartup(args.repeat)
+
+    workDir = args.work_dir or tempfile.mkdtemp(prefix="excelConverter_benchmark_")
+    os.makedirs(workDir, exist_ok=True)
+
+    results = list()
+    try:
+        for rows in sizes:
+            print("Benchmarking %d rows.." % (rows))
+            results.append(benchmarkSize(workDir, rows, args.repeat, args.stream, args.fast_reader))
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    baselines = loadBaselines(args.baseline)
+    numRegressions = compareToBaseline(results, baselines, args.tolerance)
+    numRegressions += compareStartupToBaseline(startup, baselines, args.tolerance)
+
+    if args.save_baseline:
+        saveBaselines(args.baseline, baselines, results, startup)
+    elif numRegressions > 0:
+        print("\nERROR: %d regression(s) against %s" % (numRegressions, args.baseline))
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -5,38 +5,148 @@
 ###############################
 
 #openpyxl imports
-import openpyxl
-from openpyxl import Workbook
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Protection, Font, numbers
+# Importing openpyxl takes longer than starting a worker process, so it is only imported by loadOpenpyxl()
+# the first time a workbook is opened (see GLOBALS)
+openpyxl = None
 
 #builtin imports
+import argparse
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import csv
 import datetime
+import decimal
+import functools
+import glob
+import hashlib
+import json
+import math
+import multiprocessing
 import os
+import posixpath
+import re
+import shutil
+import sys
+import tempfile
 import time
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ElementTree
 
-#tkinter for display windows
-from tkinter.filedialog import askopenfilename
-import tkinter.messagebox
+#Optional, only used for peak RSS in profiling reports (not available on Windows)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#Optional, only used by the Parquet export sink (see EXPORT_SINKS). Imported by loadPyarrow() when that sink runs.
+pyarrow = None
+pyarrowChecked = False
+
+#tkinter for display windows is imported by mainGUI(), batch runs and servers without Tk do not need it
 
 
 #### GLOBALS ####
+CONVERTER_VERSION = "0.11"
+
 NUMBER_FORMAT__CURRENCY = '"$"#,##0.00_-'
 NUMBER_FORMAT__ACCOUNTING = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
 NUMBER_FORMAT__DATE = "MM/DD/YYYY"
 NUMBER_FORMAT__STANDARD = '#,##0.00'
 
-BORDER__BOLD_UNDERLINE = Border(bottom=Side(border_style="thick"))
-BORDER__FINAL_SUM = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
-BORDER__BOLD_ABOVELINE = Border(top=Side(border_style="thick"))
-
-FONT__BOLD = Font(bold=True)
-FONT__NORMAL = Font()
-
-ALIGNMENT__WRAP_TEXT = Alignment(wrap_text=True)
-ALIGNMENT__HORIZONAL_CENTER = Alignment(horizontal="center")
-ALIGNMENT__HORIZONAL_LEFT = Alignment(horizontal="left")
+#Named cell styles (see StyleRegistry). A cell gets all of its formatting in one assignment.
+STYLE__PLAIN = "Plain"
+STYLE__BOLD = "Bold"
+STYLE__HEADER = "Column Header"
+STYLE__CENTERED_HEADER = "Centered Column Header"
+STYLE__SUBTOTAL = "Subtotal"
+STYLE__BOLD_SUBTOTAL = "Bold Subtotal"
+STYLE__FINAL_SUM = "Final Sum"
+STYLE__SUMMARY_TOTAL = "Summary Total"
+STYLE__TITLE_1 = "Page Title 1"
+STYLE__TITLE_2 = "Page Title 2"
+STYLE__TITLE_3 = "Page Title 3"
+STYLE__SUMMARY_TITLE_2 = "Summary Title 2"
+STYLE__SUMMARY_LABEL = "Summary Label"
+STYLE__ACCOUNTING = "Accounting"
+STYLE__DATE = "Date"
+STYLE__STANDARD = "Standard"
+STYLE__WRAP_TEXT = "Wrap Text"
+STYLE__FIX_ME = "Fix Me"
+
+#Cell styles by name, filled in by loadOpenpyxl()
+CELL_STYLES = dict()
+
+def loadOpenpyxl():
+    #Imports openpyxl and creates the formatting GLOBALS built from its classes, only the first call does anything
+    global openpyxl, Workbook, load_workbook, get_column_letter, column_index_from_string, coordinate_to_tuple
+    global Border, Side, Alignment, Font, NamedStyle, DEFAULT_FONT, WriteOnlyCell, MergedCell, Hyperlink
+    global Tokenizer, Token, TokenizerError, Translator
+    global BUILTIN_FORMATS, is_date_format, is_timedelta_format, from_excel, WINDOWS_EPOCH, CALENDAR_MAC_1904
+    global BORDER__BOLD_UNDERLINE, BORDER__FINAL_SUM, BORDER__BOLD_ABOVELINE, FONT__BOLD, FONT__NORMAL
+    global ALIGNMENT__WRAP_TEXT, ALIGNMENT__HORIZONAL_CENTER, ALIGNMENT__HORIZONAL_LEFT
+    if openpyxl is not None:
+        return
+
+    import openpyxl
+    from openpyxl import Workbook
+    from openpyxl import load_workbook
+    from openpyxl.utils import get_column_letter, column_index_from_string, coordinate_to_tuple
+    from openpyxl.styles import Border, Side, Alignment, Font, NamedStyle
+    from openpyxl.styles.fonts import DEFAULT_FONT
+    from openpyxl.cell import WriteOnlyCell, MergedCell
+    from openpyxl.worksheet.hyperlink import Hyperlink
+    from openpyxl.formula.tokenizer import Tokenizer, Token, TokenizerError
+    from openpyxl.formula.translate import Translator
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+    from openpyxl.utils.datetime import from_excel, WINDOWS_EPOCH, CALENDAR_MAC_1904
+
+    BORDER__BOLD_UNDERLINE = Border(bottom=Side(border_style="thick"))
+    BORDER__FINAL_SUM = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
+    BORDER__BOLD_ABOVELINE = Border(top=Side(border_style="thick"))
+
+    FONT__BOLD = Font(bold=True)
+    FONT__NORMAL = Font()
+
+    ALIGNMENT__WRAP_TEXT = Alignment(wrap_text=True)
+    ALIGNMENT__HORIZONAL_CENTER = Alignment(horizontal="center")
+    ALIGNMENT__HORIZONAL_LEFT = Alignment(horizontal="left")
+
+    CELL_STYLES.update({
+        STYLE__PLAIN: dict(font=FONT__NORMAL),
+        STYLE__BOLD: dict(font=FONT__BOLD),
+        STYLE__HEADER: dict(font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE),
+        STYLE__CENTERED_HEADER: dict(font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER),
+        STYLE__SUBTOTAL: dict(font=FONT__NORMAL, border=BORDER__BOLD_ABOVELINE, number_format=NUMBER_FORMAT__ACCOUNTING),
+        STYLE__BOLD_SUBTOTAL: dict(font=FONT__BOLD, border=BORDER__BOLD_ABOVELINE, number_format=NUMBER_FORMAT__ACCOUNTING),
+        STYLE__FINAL_SUM: dict(font=FONT__BOLD, border=BORDER__FINAL_SUM, number_format=NUMBER_FORMAT__ACCOUNTING),
+        STYLE__SUMMARY_TOTAL: dict(font=FONT__NORMAL, border=BORDER__FINAL_SUM, number_format=NUMBER_FORMAT__ACCOUNTING),
+        STYLE__TITLE_1: dict(font=Font(bold=True, size=12), alignment=ALIGNMENT__HORIZONAL_CENTER),
+        STYLE__TITLE_2: dict(font=Font(bold=True, size=14), alignment=ALIGNMENT__HORIZONAL_CENTER),
+        STYLE__TITLE_3: dict(font=Font(bold=True, size=11), alignment=ALIGNMENT__HORIZONAL_CENTER),
+        STYLE__SUMMARY_TITLE_2: dict(font=Font(bold=True, size=16), alignment=ALIGNMENT__HORIZONAL_CENTER),
+        STYLE__SUMMARY_LABEL: dict(font=Font(bold=True, size=11), alignment=ALIGNMENT__HORIZONAL_LEFT),
+        STYLE__ACCOUNTING: dict(number_format=NUMBER_FORMAT__ACCOUNTING),
+        STYLE__DATE: dict(number_format=NUMBER_FORMAT__DATE),
+        STYLE__STANDARD: dict(number_format=NUMBER_FORMAT__STANDARD),
+        STYLE__WRAP_TEXT: dict(alignment=ALIGNMENT__WRAP_TEXT),
+        STYLE__FIX_ME: dict(font=Font(color='00FF0000')),
+    })
+
+def loadPyarrow():
+    #pyarrow module with its parquet writer loaded, or None if it is not installed
+    global pyarrow, pyarrowChecked
+    if not pyarrowChecked:
+        pyarrowChecked = True
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            pyarrow = None
+    return pyarrow
 
 COLUMN_WIDTH__DATE = 12
 COLUMN_WIDTH__CURRENCY = 20
@@ -47,113 +157,1754 @@ COLUMN_WIDTH__EMPTY_ROW = 1
 MIN_PAGE_WIDTH = 88
 IDEAL_PAGE_WIDTH = 90
 MAX_PAGE_WIDTH = 92
+
+#Input sheet title (cell A2) -> output sheet name, see extractSheetNameMappings
+INPUT_TITLE_TO_SHEET_NAME = {
+    "Property on Hand at Beginning of Account": "Beginning",
+    "Property on Hand at Beginning of Account - Investment Detail": "Beginning Detail",
+    "Additional Property Received": "Additional",
+    "Schedule A - Receipts": "Sch A",
+    "Schedule B/E - For Export To Excel Only": "Sch B",
+    "Schedule C - Net Income from Trade or Business": "Sch C",
+    "Schedule D - Disbursements": "Sch D",
+    "Schedule F - Net Loss from Trade or Business": "Sch F",
+    "Schedule G - Distributions": "Sch G",
+    "Schedule H - Property on Hand at Close of Account": "Sch H",
+    "Schedule H - Investment Detail": "Sch H Detail",
+    "Estimated Market Value": "Market Value",
+    "Liability Detail": "Liability",
+}
+
+#Rows read from every input sheet to find its title before the whole sheet is loaded
+SHEET_PROBE_ROWS = 3
+
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 30
+
+#Log levels, see ConversionLog
+LOG_LEVEL__DEBUG = 10
+LOG_LEVEL__INFO = 20
+LOG_LEVEL__WARNING = 30
+LOG_LEVEL__ERROR = 40
+LOG_LEVELS = {"debug": LOG_LEVEL__DEBUG, "info": LOG_LEVEL__INFO, "warning": LOG_LEVEL__WARNING, "error": LOG_LEVEL__ERROR}
 #### END GLOBALS ####
 
-def print_debug(line):
-    if 0:
-        zprint(line)
+class ConversionLog:
+    #Leveled conversion log. "message % args" is only formatted when the level is enabled, so disabled debug
+    # messages in hot loops cost one comparison. Every record remembers the output sheet being worked on.
+    def __init__(self, level=LOG_LEVEL__INFO, buffered=False):
+        #Unbuffered logs print each message right away. Buffered logs keep (level, sheetName, message) records
+        # until formatText()/writeFile(), so conversions running in parallel do not interleave their output.
+        self.level = level
+        self.buffered = buffered
+        self.records = list()
+        self.sheetName = None
+
+    def addRecord(self, record):
+        if self.buffered:
+            self.records.append(record)
+        else:
+            print(record[2])
+
+    def addRecords(self, records):
+        #Adds records logged by another ConversionLog, e.g. in a sheet worker process
+        for record in records:
+            if record[0] >= self.level:
+                self.addRecord(record)
+
+    def log(self, level, message, *args):
+        if level < self.level:
+            return
+        if args:
+            message = message % args
+        self.addRecord((level, self.sheetName, message))
+
+    def debug(self, message, *args):
+        if self.level <= LOG_LEVEL__DEBUG:
+            self.log(LOG_LEVEL__DEBUG, message, *args)
+
+    def info(self, message, *args):
+        if self.level <= LOG_LEVEL__INFO:
+            self.log(LOG_LEVEL__INFO, message, *args)
+
+    def warning(self, message, *args):
+        if self.level <= LOG_LEVEL__WARNING:
+            self.log(LOG_LEVEL__WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(LOG_LEVEL__ERROR, message, *args)
+
+    @contextlib.contextmanager
+    def sheetContext(self, sheetName):
+        previousSheetName = self.sheetName
+        self.sheetName = sheetName
+        try:
+            yield
+        finally:
+            self.sheetName = previousSheetName
+
+    def messages(self, minLevel=LOG_LEVEL__DEBUG):
+        return [message for level, sheetName, message in self.records if level >= minLevel]
+
+    def formatText(self):
+        #Same text an unbuffered log would have printed
+        return "".join(message + "\n" for message in self.messages())
+
+    def writeFile(self, path):
+        #Per workbook log file, every line carries its level and sheet
+        levelNames = dict((level, name.upper()) for name, level in LOG_LEVELS.items())
+        with open(path, "w", encoding="utf-8") as logFile:
+            for level, sheetName, message in self.records:
+                for line in message.split("\n"):
+                    if line.strip():
+                        logFile.write("%-7s  %-16s  %s\n" % (levelNames.get(level, level), sheetName or "-", line.rstrip()))
+
+#Log of the running conversion. The GUI prints straight to the console, batch conversions and
+# sheet workers swap in a buffered log with activeLog()
+log = ConversionLog()
+
+@contextlib.contextmanager
+def activeLog(conversionLog):
+    global log
+    previousLog = log
+    log = conversionLog
+    try:
+        yield conversionLog
+    finally:
+        log = previousLog
+
+def xmlLocalName(tag):
+    #Strip the namespace from an ElementTree tag ("{ns}c" -> "c")
+    return tag.rsplit("}", 1)[-1]
+
+def xmlAttrib(element, localName):
+    #Get an attribute by local name regardless of its namespace prefix
+    for key, value in element.attrib.items():
+        if xmlLocalName(key) == localName:
+            return value
+    return None
+
+def readWorkbookRelationships(archive):
+    #Relationship id -> (part name, relationship type) of xl/workbook.xml
+    relationships = dict()
+    relsXml = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in relsXml:
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join("xl", target))
+        relationships[rel.get("Id")] = (target, rel.get("Type", ""))
+    return relationships
+
+def readWorkbookSheetParts(archive):
+    #(sheet name, part name, relationship type) of every sheet in workbook.xml, in workbook order
+    relationships = readWorkbookRelationships(archive)
+
+    sheetParts = list()
+    workbookXml = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    for element in workbookXml.iter():
+        if xmlLocalName(element.tag) == "sheet":
+            partName, relType = relationships.get(xmlAttrib(element, "id"), (None, ""))
+            sheetParts.append((element.get("name"), partName, relType))
+
+    return sheetParts
+
+def readSharedStrings(archive):
+    #Plain text of the shared strings, like openpyxl reads them: rich text runs joined, phonetic runs left out
+    sharedStrings = list()
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return sharedStrings
+
+    with archive.open("xl/sharedStrings.xml") as sharedStringsPart:
+        for event, element in ElementTree.iterparse(sharedStringsPart):
+            if xmlLocalName(element.tag) == "si":
+                sharedStrings.append(stringItemText(element).replace("x005F_", ""))
+                element.clear()
+
+    return sharedStrings
+
+def stringItemText(element):
+    #Text of a shared string <si> or inline string <is>: its own <t> plus the <t> of each rich text run <r>
+    texts = list()
+    for child in element:
+        childName = xmlLocalName(child.tag)
+        if childName == "t":
+            texts.append(child.text or "")
+        elif childName == "r":
+            for run in child:
+                if xmlLocalName(run.tag) == "t":
+                    texts.append(run.text or "")
+    return "".join(texts)
+
+class InputCell:
+    #Stand-in for an openpyxl cell when reading the input store, only the value is kept
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+class InputSheet:
+    #Compact, read-only store of one input worksheet: one tuple of values per row, no Cell objects or styles.
+    # Mirrors the small part of the openpyxl worksheet API the migrators use on input sheets.
+    def __init__(self, title, rows, maxRow, maxColumn):
+        self.title = title
+        self.rows = rows
+        self.max_row = maxRow
+        self.max_column = maxColumn
+
+    def getValue(self, row, col):
+        if row < 1 or row > len(self.rows):
+            return None
+        values = self.rows[row-1]
+        if col < 1 or col > len(values):
+            return None
+        return values[col-1]
+
+    def __getitem__(self, coordinate):
+        row, col = coordinate_to_tuple(coordinate)
+        return InputCell(self.getValue(row, col))
+
+    def iter_rows(self, min_row=1, max_row=None, min_col=1, max_col=None, values_only=True):
+        if not values_only:
+            raise ValueError("Input sheets only hold values, use values_only=True")
+
+        if max_row is None:
+            max_row = self.max_row
+        if max_col is None:
+            max_col = self.max_column
+
+        width = max_col - min_col + 1
+        for row in range(min_row, max_row+1):
+            if row <= len(self.rows):
+                values = self.rows[row-1][min_col-1:max_col]
+            else:
+                values = ()
+            #Pad rows back out to the requested width like openpyxl does
+            yield values + (None,) * (width - len(values))
+
+    def fingerprint(self):
+        #Hash of everything the migrators can read from this sheet: its values and its extents
+        sheetHash = hashlib.sha256(repr((self.max_row, self.max_column)).encode())
+        for values in self.rows:
+            sheetHash.update(repr(values).encode())
+        return sheetHash.hexdigest()
+
+    def iterValues(self):
+        #Yields ((row, col), value) for every non-empty cell
+        for rowIndex, values in enumerate(self.rows):
+            for colIndex, value in enumerate(values):
+                if value is not None:
+                    yield (rowIndex+1, colIndex+1), value
+
+class InputWorkbook:
+    #Input workbook loaded through openpyxl's streaming read-only reader (or SpreadsheetMLReader) into per-sheet InputSheet stores
+    def __init__(self, workbookPath=None, fastReader=False, sheetFilter=None):
+        #sheetFilter(probe) sees the first SHEET_PROBE_ROWS rows of each sheet and returns whether to load the whole sheet
+        self.sheets = dict()
+        self.sheetnames = list()
+        self.cellCount = 0
+
+        #Every sheet of the input in workbook order, with the probes of the ones sheetFilter did not load
+        self.allSheetNames = list()
+        self.probes = dict()
+
+        #No path gives an empty store, sheets can then be added one by one (sheet worker processes)
+        if workbookPath is None:
+            return
+
+        loadOpenpyxl()
+        if fastReader:
+            try:
+                SpreadsheetMLReader(workbookPath).readSheets(functools.partial(self.loadSheet, sheetFilter=sheetFilter))
+                return
+            except (UnsupportedWorkbookFeature, zipfile.BadZipFile, ElementTree.ParseError) as e:
+                log.info("  Fast reader can not read this workbook (%s), loading it with openpyxl", str(e))
+                self.sheets = dict()
+                self.sheetnames = list()
+                self.cellCount = 0
+                self.allSheetNames = list()
+                self.probes = dict()
+
+        workbook = load_workbook(workbookPath, read_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                #Ignore the stored <dimension>, it can be stale. Rows then come back at their natural length.
+                worksheet.reset_dimensions()
+                self.loadSheet(worksheet.title, functools.partial(worksheet.iter_rows, values_only=True), sheetFilter)
+        finally:
+            #Read-only workbooks keep the zip open until closed
+            workbook.close()
+
+    def __getitem__(self, sheetName):
+        return self.sheets[sheetName]
+
+    def addSheet(self, inputSheet):
+        self.sheetnames.append(inputSheet.title)
+        self.allSheetNames.append(inputSheet.title)
+        self.sheets[inputSheet.title] = inputSheet
+
+    def probe(self, sheetName):
+        #First rows of any input sheet, loaded or not
+        if sheetName in self.probes:
+            return self.probes[sheetName]
+        return self.sheets[sheetName]
+
+    def loadSheet(self, title, openRows, sheetFilter=None):
+        #openRows() starts reading the rows of the sheet. Sheets rejected by sheetFilter are not parsed past their first rows.
+        if sheetFilter is not None:
+            probeRows = list()
+            for values in openRows():
+                probeRows.append(tuple(values))
+                if len(probeRows) == SHEET_PROBE_ROWS:
+                    break
+            probe = InputSheet(title, probeRows, len(probeRows), max([len(values) for values in probeRows] + [0]))
+
+            if not sheetFilter(probe):
+                self.allSheetNames.append(title)
+                self.probes[title] = probe
+                return
+
+        self.addSheet(self.storeSheet(title, openRows()))
+
+    def storeSheet(self, title, rowValues):
+        #rowValues yields the values of every row from row 1 on, missing rows as empty tuples
+        rows = list()
+        maxRow = 0
+        maxColumn = 0
+        for values in rowValues:
+            values = tuple(values)
+            rows.append(values)
+            self.cellCount += len(values) - values.count(None)
+
+            #Same extents openpyxl reports in normal mode: any row/col holding a cell, even if only styled
+            if len(values) > 0:
+                maxRow = len(rows)
+                maxColumn = max(maxColumn, len(values))
+
+        #Drop trailing empty rows and trailing empty values to keep the store small
+        del rows[maxRow:]
+        for i in range(len(rows)):
+            values = rows[i]
+            end = len(values)
+            while end > 0 and values[end-1] is None:
+                end -= 1
+            if end != len(values):
+                rows[i] = values[:end]
+
+        return InputSheet(title, rows, maxRow, maxColumn)
+
+class UnsupportedWorkbookFeature(Exception):
+    #Workbook content SpreadsheetMLReader does not understand, the workbook is loaded with openpyxl instead
+    pass
+
+class SpreadsheetMLReader:
+    #Fast input reader for the accounting software exports. Streams the worksheet XML parts of the .xlsx with
+    # iterparse straight into InputSheet stores, no openpyxl workbook, style or cell objects are built.
+    # Values come out exactly as openpyxl's read-only reader returns them. Anything past plain values, dates
+    # and simple or shared formulas raises UnsupportedWorkbookFeature.
+    MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    SHEET_DATA_TAG = MAIN_NS + "sheetData"
+    ROW_TAG = MAIN_NS + "row"
+    CELL_TAG = MAIN_NS + "c"
+    VALUE_TAG = MAIN_NS + "v"
+    FORMULA_TAG = MAIN_NS + "f"
+    INLINE_STRING_TAG = MAIN_NS + "is"
+
+    def __init__(self, workbookPath):
+        self.workbookPath = workbookPath
+        self.sharedStrings = list()
+        self.epoch = None
+
+        #Cell style indexes (the s attribute) whose number format shows a date or a duration
+        self.dateStyles = set()
+        self.timedeltaStyles = set()
+
+    def readSheets(self, loadSheet):
+        #Calls loadSheet(title, openRows) for every worksheet in workbook order, openRows() yields the values of each row
+        loadOpenpyxl()
+        with zipfile.ZipFile(self.workbookPath) as archive:
+            try:
+                sheetParts = readWorkbookSheetParts(archive)
+                self.readWorkbookProperties(archive)
+                self.readDateStyles(archive)
+                self.sharedStrings = readSharedStrings(archive)
+            except KeyError as e:
+                raise UnsupportedWorkbookFeature("missing part %s" % (str(e)))
+
+            for sheetName, partName, relType in sheetParts:
+                #Chart sheets and the like are not worksheets, openpyxl skips them too
+                if not relType.endswith("/worksheet"):
+                    continue
+                if partName not in archive.namelist():
+                    raise UnsupportedWorkbookFeature("missing worksheet part for sheet %s" % (sheetName))
+                loadSheet(sheetName, functools.partial(self.iterRows, archive, partName))
+
+    def readWorkbookProperties(self, archive):
+        self.epoch = WINDOWS_EPOCH
+        workbookXml = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        for element in workbookXml:
+            if xmlLocalName(element.tag) == "workbookPr" and element.get("date1904") in ("1", "true"):
+                self.epoch = CALENDAR_MAC_1904
+
+    def readDateStyles(self, archive):
+        #Same date detection as openpyxl: by the number format of each cellXfs entry
+        stylesPart = None
+        for partName, relType in readWorkbookRelationships(archive).values():
+            if relType.endswith("/styles"):
+                stylesPart = partName
+        if stylesPart is None:
+            return
+
+        stylesXml = ElementTree.fromstring(archive.read(stylesPart))
+        customFormats = dict()
+        cellFormats = list()
+        for element in stylesXml:
+            elementName = xmlLocalName(element.tag)
+            if elementName == "numFmts":
+                for numFmt in element:
+                    customFormats[int(numFmt.get("numFmtId"))] = numFmt.get("formatCode")
+            elif elementName == "cellXfs":
+                cellFormats = [int(xf.get("numFmtId", 0)) for xf in element]
+
+        for styleIndex, numFmtId in enumerate(cellFormats):
+            numberFormat = customFormats.get(numFmtId, BUILTIN_FORMATS.get(numFmtId))
+            if is_date_format(numberFormat):
+                self.dateStyles.add(styleIndex)
+            if is_timedelta_format(numberFormat):
+                self.timedeltaStyles.add(styleIndex)
+
+    def iterRows(self, archive, partName):
+        #Yields a tuple of values per row, missing rows as empty tuples
+        sharedFormulas = dict()
+        rowCount = 0
+        sawSheetData = False
+        with archive.open(partName) as sheetPart:
+            for event, element in ElementTree.iterparse(sheetPart):
+                if element.tag != self.ROW_TAG:
+                    if element.tag == self.SHEET_DATA_TAG:
+                        sawSheetData = True
+                    continue
 
-def zprint(line):
+                rowNumber = element.get("r")
+                if rowNumber is None:
+                    rowNumber = rowCount + 1
+                elif rowNumber.isdigit():
+                    rowNumber = int(rowNumber)
+                else:
+                    raise UnsupportedWorkbookFeature("row number %s in %s" % (rowNumber, partName))
+                if rowNumber <= rowCount:
+                    raise UnsupportedWorkbookFeature("rows out of order in %s" % (partName))
+                while rowCount < rowNumber - 1:
+                    rowCount += 1
+                    yield ()
+                rowCount = rowNumber
+
+                values = list()
+                for cell in element:
+                    if cell.tag != self.CELL_TAG:
+                        continue
+                    coordinate = cell.get("r")
+                    if coordinate is None:
+                        col = len(values) + 1
+                    else:
+                        col = column_index_from_string(coordinate.rstrip("0123456789"))
+                    if col <= len(values):
+                        raise UnsupportedWorkbookFeature("cells out of order in %s" % (partName))
+                    while len(values) < col - 1:
+                        values.append(None)
+                    values.append(self.cellValue(cell, coordinate, sharedFormulas))
+
+                #Drop the parsed row right away to keep memory flat on large sheets
+                element.clear()
+                yield values
+
+        if not sawSheetData:
+            raise UnsupportedWorkbookFeature("no SpreadsheetML sheetData in %s" % (partName))
+
+    def cellValue(self, cell, coordinate, sharedFormulas):
+        rawValue = None
+        formula = None
+        inlineString = None
+        for child in cell:
+            if child.tag == self.VALUE_TAG:
+                rawValue = child.text
+            elif child.tag == self.FORMULA_TAG:
+                formula = child
+            elif child.tag == self.INLINE_STRING_TAG:
+                inlineString = child
+
+        valueType = cell.get("t", "n")
+        if formula is not None:
+            return self.formulaValue(formula, coordinate, sharedFormulas)
+        if valueType == "inlineStr":
+            return None if inlineString is None else stringItemText(inlineString)
+        if not rawValue:
+            return None
+
+        if valueType == "n":
+            if "." in rawValue or "E" in rawValue or "e" in rawValue:
+                value = float(rawValue)
+            else:
+                value = int(rawValue)
+            styleIndex = int(cell.get("s", 0))
+            if styleIndex in self.dateStyles:
+                try:
+                    value = from_excel(value, self.epoch, timedelta=styleIndex in self.timedeltaStyles)
+                except (OverflowError, ValueError):
+                    raise UnsupportedWorkbookFeature("date out of range in cell %s" % (coordinate))
+            return value
+        if valueType == "s":
+            return self.sharedStrings[int(rawValue)]
+        if valueType == "b":
+            return bool(int(rawValue))
+        if valueType in ("str", "e"):
+            return rawValue
+
+        raise UnsupportedWorkbookFeature("cell type %s in cell %s" % (valueType, coordinate))
+
+    def formulaValue(self, formula, coordinate, sharedFormulas):
+        formulaType = formula.get("t")
+        value = "=" + (formula.text or "")
+        if formulaType is None or formulaType == "normal":
+            return value
+        if formulaType != "shared" or coordinate is None:
+            raise UnsupportedWorkbookFeature("%s formula in cell %s" % (formulaType, coordinate))
+
+        #The first cell of a shared formula holds its text, the others translate it to their own position
+        sharedIndex = formula.get("si")
+        if sharedIndex in sharedFormulas:
+            return sharedFormulas[sharedIndex].translate_formula(coordinate)
+        if value != "=":
+            sharedFormulas[sharedIndex] = Translator(value, coordinate)
+        return value
+
+class CachedValueReader:
+    #Reads the cached (last calculated) values of formula cells straight out of the .xlsx zip.
+    # This replaces a second load_workbook(data_only=True) pass over the whole input workbook:
+    # the formula view is already parsed by openpyxl, so only the formula cells of the sheets
+    # that are actually asked for get read here, and only once per sheet.
+    def __init__(self, workbookPath, workbook):
+        self.workbookPath = workbookPath
+        self.workbook = workbook
+
+        self.sheetNameToPart = None
+        self.sharedStrings = None
+        self.sheetCachedValues = dict()
+
+    def getValue(self, sheetName, cellID):
+        row, col = coordinate_to_tuple(cellID)
+        value = self.workbook[sheetName].getValue(row, col)
+
+        #Plain values are the same in both views, no need to touch the zip
+        if not (isinstance(value, str) and value.startswith("=")):
+            return value
+
+        if sheetName not in self.sheetCachedValues:
+            self.sheetCachedValues[sheetName] = self.readCachedFormulaValues(sheetName)
+
+        return self.sheetCachedValues[sheetName].get(cellID.upper())
+
+    def readCachedFormulaValues(self, sheetName):
+        cachedValues = dict()
+
+        with zipfile.ZipFile(self.workbookPath) as archive:
+            if self.sheetNameToPart is None:
+                self.sheetNameToPart = self.readSheetParts(archive)
+
+            partName = self.sheetNameToPart.get(sheetName)
+            if partName is None:
+                log.warning("  WARNING: Unable to find worksheet part for sheet %s. Cached values unavailable.", sheetName)
+                return cachedValues
+
+            with archive.open(partName) as sheetPart:
+                for event, element in ElementTree.iterparse(sheetPart):
+                    if xmlLocalName(element.tag) != "c":
+                        continue
+
+                    formula = None
+                    rawValue = None
+                    for child in element:
+                        childName = xmlLocalName(child.tag)
+                        if childName == "f":
+                            formula = child
+                        elif childName == "v":
+                            rawValue = child.text
+
+                    if formula is not None:
+                        cachedValues[element.get("r")] = self.castCachedValue(archive, element.get("t", "n"), rawValue)
+
+                    #Drop the parsed cell right away to keep memory flat on large sheets
+                    element.clear()
+
+        log.debug("  Read %d cached formula values from sheet %s", len(cachedValues), sheetName)
+        return cachedValues
+
+    def castCachedValue(self, archive, valueType, rawValue):
+        if rawValue is None:
+            return None
+
+        if valueType == "n":
+            try:
+                return int(rawValue)
+            except ValueError:
+                pass
+            try:
+                return float(rawValue)
+            except ValueError:
+                return rawValue
+        if valueType == "b":
+            return rawValue == "1"
+        if valueType == "s":
+            if self.sharedStrings is None:
+                self.sharedStrings = readSharedStrings(archive)
+            return self.sharedStrings[int(rawValue)]
+
+        #"str", "e" and "inlineStr" are already text
+        return rawValue
+
+    def readSheetParts(self, archive):
+        #Map sheet names in workbook.xml to their worksheet part through the workbook relationships
+        return dict((sheetName, partName) for sheetName, partName, relType in readWorkbookSheetParts(archive))
+
+class UnsupportedFormula(Exception):
+    #Formula outside the subset SheetFormulaEvaluator understands, or one that would be an error in Excel
     pass
-    print(line)
+
+def excelRound(value, digits):
+    #ROUND() rounds halves away from zero, Python's round() rounds them to even
+    if isinstance(value, float) and not math.isfinite(value):
+        return value
+    try:
+        rounded = decimal.Decimal(repr(value)).quantize(decimal.Decimal(1).scaleb(-int(digits)), rounding=decimal.ROUND_HALF_UP)
+    except decimal.InvalidOperation:
+        #more digits than the decimal context holds, a float that large has no fraction left to round
+        return value
+    if isinstance(value, int) and digits >= 0:
+        return int(rounded)
+    return float(rounded)
+
+class SheetFormulaEvaluator:
+    #Calculates the formulas the converter writes (SUM, ROUND, +, -, cell references and ranges) on one
+    # in-memory output sheet, so the saved workbook can carry their values like one saved by Excel does.
+    # Formulas are calculated in dependency order. Range sums come from per-column prefix sums of the plain
+    # numbers plus the (few) formula cells inside the range, so each range costs a lookup, not a scan.
+    # Formulas it cannot calculate itself (references to other sheets) can be given as knownValues, {coordinate: value}.
+    TOKEN_PATTERN = re.compile(r"\s*(?:(?P<range>\$?[A-Z]{1,3}\$?\d+:\$?[A-Z]{1,3}\$?\d+)|(?P<func>[A-Z]+)\(|"
+                               r"(?P<ref>\$?[A-Z]{1,3}\$?\d+)|(?P<number>\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+)|(?P<op>[-+,)]))")
+
+    def __init__(self, sheet, knownValues=None):
+        self.sheet = sheet
+        self.knownValues = knownValues or dict()
+        self.formulas = dict()
+        self.values = dict()
+        self.columnFormulaRows = dict()
+        self.columnNumberRows = None
+        self.columnPrefixSums = dict()
+
+    def calculate(self):
+        #Returns {coordinate: value} for every formula that could be calculated
+        for (row, col), cell in self.sheet._cells.items():
+            if isinstance(cell.value, str) and cell.value.startswith("="):
+                try:
+                    if cell.coordinate in self.knownValues:
+                        self.formulas[(row, col)] = ("number", self.knownValues[cell.coordinate])
+                    else:
+                        self.formulas[(row, col)] = self.parse(cell.value[1:])
+                except UnsupportedFormula:
+                    log.debug("  Not calculating %s!%s: %s", self.sheet.title, cell.coordinate, cell.value)
+                    continue
+                self.columnFormulaRows.setdefault(col, list()).append(row)
+        for formulaRows in self.columnFormulaRows.values():
+            formulaRows.sort()
+
+        for key in self.dependencyOrder():
+            try:
+                self.values[key] = self.evaluate(self.formulas[key])
+            except UnsupportedFormula:
+                continue
+
+        return {"%s%d" % (get_column_letter(col), row): value for (row, col), value in self.values.items()}
+
+    #### Parsing ####
+    def parse(self, formula):
+        tokens = list()
+        position = 0
+        while position < len(formula.rstrip()):
+            match = self.TOKEN_PATTERN.match(formula, position)
+            if match is None:
+                raise UnsupportedFormula(formula)
+            tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        tokens.append(("end", None))
+
+        self.tokens = tokens
+        self.position = 0
+        node = self.parseExpression()
+        if self.tokens[self.position][0] != "end":
+            raise UnsupportedFormula(formula)
+        return node
+
+    def nextToken(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parseExpression(self):
+        node = self.parseTerm()
+        while self.tokens[self.position] in (("op", "+"), ("op", "-")):
+            operator = self.nextToken()[1]
+            node = ("add", node, self.parseTerm()) if operator == "+" else ("add", node, ("neg", self.parseTerm()))
+        return node
+
+    def parseTerm(self):
+        kind, text = self.nextToken()
+        if kind == "op" and text in ("-", "+"):
+            term = self.parseTerm()
+            return ("neg", term) if text == "-" else term
+        if kind == "number":
+            return ("number", float(text) if any(c in text for c in ".eE") else int(text))
+        if kind == "ref":
+            row, col = coordinate_to_tuple(text.replace("$", ""))
+            return ("ref", row, col)
+        if kind == "range":
+            start, end = text.replace("$", "").split(":")
+            startRow, startCol = coordinate_to_tuple(start)
+            endRow, endCol = coordinate_to_tuple(end)
+            return ("range", min(startRow, endRow), min(startCol, endCol), max(startRow, endRow), max(startCol, endCol))
+        if kind == "func" and text in ("SUM", "ROUND"):
+            args = [self.parseExpression()]
+            while self.tokens[self.position] == ("op", ","):
+                self.position += 1
+                args.append(self.parseExpression())
+            if self.nextToken() != ("op", ")"):
+                raise UnsupportedFormula(text)
+            if text == "ROUND" and len(args) != 2:
+                raise UnsupportedFormula(text)
+            return ("sum", args) if text == "SUM" else ("round", args[0], args[1])
+        raise UnsupportedFormula(text)
+
+    #### Ordering ####
+    def dependencies(self, node):
+        #Formula cells a parsed formula reads
+        kind = node[0]
+        if kind == "ref":
+            if (node[1], node[2]) in self.formulas:
+                yield (node[1], node[2])
+        elif kind == "range":
+            startRow, startCol, endRow, endCol = node[1:]
+            for col in range(startCol, endCol+1):
+                formulaRows = self.columnFormulaRows.get(col, [])
+                for i in range(bisect.bisect_left(formulaRows, startRow), bisect.bisect_right(formulaRows, endRow)):
+                    yield (formulaRows[i], col)
+        elif kind == "sum":
+            for arg in node[1]:
+                yield from self.dependencies(arg)
+        elif kind in ("add", "round"):
+            yield from self.dependencies(node[1])
+            yield from self.dependencies(node[2])
+        elif kind == "neg":
+            yield from self.dependencies(node[1])
+
+    def dependencyOrder(self):
+        #Topological order of the formula cells, cells on a reference cycle are left out
+        dependents = {key: list() for key in self.formulas}
+        waitingOn = dict()
+        for key, node in self.formulas.items():
+            dependencies = set(self.dependencies(node))
+            waitingOn[key] = len(dependencies)
+            for dependency in dependencies:
+                dependents[dependency].append(key)
+
+        ready = collections.deque(key for key, count in waitingOn.items() if count == 0)
+        order = list()
+        while ready:
+            key = ready.popleft()
+            order.append(key)
+            for dependent in dependents[key]:
+                waitingOn[dependent] -= 1
+                if waitingOn[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.formulas):
+            log.warning("  WARNING: %d circular formulas on sheet %s were not calculated.", len(self.formulas) - len(order), self.sheet.title)
+        return order
+
+    #### Evaluation ####
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == "number":
+            return node[1]
+        if kind == "ref":
+            value = self.cellValue(node[1], node[2])
+            if value is None:
+                return 0
+            if not isinstance(value, (int, float)):
+                #Text in arithmetic is #VALUE! in Excel
+                raise UnsupportedFormula(value)
+            return int(value) if isinstance(value, bool) else value
+        if kind == "range":
+            return self.rangeSum(*node[1:])
+        if kind == "add":
+            return self.evaluate(node[1]) + self.evaluate(node[2])
+        if kind == "neg":
+            return -self.evaluate(node[1])
+        if kind == "round":
+            return excelRound(self.evaluate(node[1]), self.evaluate(node[2]))
+
+        #SUM skips text in the cells it references
+        total = 0
+        for arg in node[1]:
+            if arg[0] == "ref":
+                total += self.rangeSum(arg[1], arg[2], arg[1], arg[2])
+            else:
+                total += self.evaluate(arg)
+        return total
+
+    def cellValue(self, row, col):
+        if (row, col) in self.formulas:
+            if (row, col) not in self.values:
+                raise UnsupportedFormula("%s%d" % (get_column_letter(col), row))
+            return self.values[(row, col)]
+        cell = self.sheet._cells.get((row, col))
+        return None if cell is None else cell.value
+
+    def rangeSum(self, startRow, startCol, endRow, endCol):
+        total = 0
+        for col in range(startCol, endCol+1):
+            rows, sums = self.prefixSums(col)
+            total += sums[bisect.bisect_right(rows, endRow)] - sums[bisect.bisect_left(rows, startRow)]
+
+            formulaRows = self.columnFormulaRows.get(col, [])
+            for i in range(bisect.bisect_left(formulaRows, startRow), bisect.bisect_right(formulaRows, endRow)):
+                value = self.cellValue(formulaRows[i], col)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    total += value
+        return total
+
+    def prefixSums(self, col):
+        #Rows holding plain numbers in a column and the running sums in front of each of them, built once per column
+        if self.columnNumberRows is None:
+            self.columnNumberRows = dict()
+            for (row, cellCol), cell in self.sheet._cells.items():
+                if isinstance(cell.value, (int, float)) and not isinstance(cell.value, bool):
+                    self.columnNumberRows.setdefault(cellCol, list()).append(row)
+
+        if col not in self.columnPrefixSums:
+            rows = sorted(self.columnNumberRows.get(col, []))
+            sums = [0]
+            for row in rows:
+                sums.append(sums[-1] + self.sheet._cells[(row, col)].value)
+            self.columnPrefixSums[col] = (rows, sums)
+        return self.columnPrefixSums[col]
+
+#Formula cells as openpyxl saves them: the formula followed by an empty value
+SAVED_FORMULA_CELL_PATTERN = re.compile(rb'(<c r="([A-Z]+[0-9]+)"[^>]*><f>[^<]*</f>)(?:<v\s*/>|<v></v>)')
+
+def writeCachedFormulaValues(workbookPath, sheetValues):
+    #Fills the empty cached values of formula cells in a saved workbook with calculated ones, {sheet: {cell: value}}.
+    # Sheet parts are rewritten in chunks so large sheets are never held in memory as a whole.
+    if not any(len(values) > 0 for values in sheetValues.values()):
+        return
+
+    tempPath = workbookPath + ".tmp"
+    with zipfile.ZipFile(workbookPath) as archive:
+        sheetParts = CachedValueReader(workbookPath, None).readSheetParts(archive)
+        partValues = {sheetParts.get(sheetName): values for sheetName, values in sheetValues.items() if len(values) > 0}
+
+        with zipfile.ZipFile(tempPath, "w", zipfile.ZIP_DEFLATED) as patchedArchive:
+            for item in archive.infolist():
+                values = partValues.get(item.filename)
+                if values is None:
+                    patchedArchive.writestr(item, archive.read(item.filename))
+                    continue
+
+                def fillValue(match):
+                    value = values.get(match.group(2).decode())
+                    #NaN and inf have no SpreadsheetML form, those cells keep their empty value
+                    if value is None or not math.isfinite(value):
+                        return match.group(0)
+                    return match.group(1) + b"<v>" + repr(value).encode() + b"</v>"
+
+                with archive.open(item) as sheetPart, patchedArchive.open(item, "w") as patchedPart:
+                    pending = b""
+                    for chunk in iter(lambda: sheetPart.read(1024 * 1024), b""):
+                        pending += chunk
+                        #Only cut behind a closed cell, a formula cell never spans two pieces
+                        cut = pending.rfind(b"</c>") + 4
+                        if cut > 3:
+                            patchedPart.write(SAVED_FORMULA_CELL_PATTERN.sub(fillValue, pending[:cut]))
+                            pending = pending[cut:]
+                    patchedPart.write(SAVED_FORMULA_CELL_PATTERN.sub(fillValue, pending))
+    os.replace(tempPath, workbookPath)
+
+class SheetLayout:
+    #Final placement of a range of input rows on an output sheet.
+    # The row/column moves a migrator needs (dropped title rows, extra header rows, empty columns
+    # removed, new columns added) are applied to these maps instead of to the output sheet, so the
+    # cells are written once to their final coordinates rather than shuffled by insert/delete calls.
+    # The move methods take current output coordinates, the same as openpyxl insert_*/delete_*.
+    def __init__(self, rowValues, maxCol):
+        self.rowValues = rowValues
+        self.maxCol = maxCol
+
+        self.rowMap = dict()
+        for inputRow in rowValues:
+            self.rowMap[inputRow] = inputRow
+
+        self.colMap = dict()
+        for inputCol in range(1, maxCol+1):
+            self.colMap[inputCol] = inputCol
+
+    def deleteRow(self, outputRow):
+        for inputRow, row in list(self.rowMap.items()):
+            if row == outputRow:
+                del self.rowMap[inputRow]
+            elif row > outputRow:
+                self.rowMap[inputRow] = row - 1
+
+    def insertRow(self, outputRow):
+        for inputRow, row in self.rowMap.items():
+            if row >= outputRow:
+                self.rowMap[inputRow] = row + 1
+
+    def deleteCol(self, outputCol):
+        for inputCol, col in list(self.colMap.items()):
+            if col == outputCol:
+                del self.colMap[inputCol]
+            elif col > outputCol:
+                self.colMap[inputCol] = col - 1
+
+    def insertCol(self, outputCol):
+        for inputCol, col in self.colMap.items():
+            if col >= outputCol:
+                self.colMap[inputCol] = col + 1
+
+    def isEmptyInputCol(self, inputCol):
+        for inputRow in self.rowMap:
+            if self.rowValues[inputRow][inputCol-1] is not None:
+                return False
+        return True
+
+    def deleteEmptyCols(self, minCol=2):
+        emptyCols = list()
+        for inputCol, col in self.colMap.items():
+            if col >= minCol and self.isEmptyInputCol(inputCol):
+                emptyCols.append(col)
+
+        #Delete highest to lowest so the remaining output columns stay put
+        for col in sorted(emptyCols, reverse=True):
+            self.deleteCol(col)
+
+        return emptyCols
+
+    def referenceMaps(self):
+        #Row and column maps for moving the references of the formulas in this layout
+        return (ReferenceMap(self.rowMap, min(self.rowValues), max(self.rowValues)),
+                ReferenceMap(self.colMap, 1, self.maxCol))
+
+    def findCol(self, outputRow, searchValue):
+        #Output column of the last cell on outputRow whose text matches searchValue, or -1
+        foundCol = -1
+        for inputRow, row in self.rowMap.items():
+            if row != outputRow:
+                continue
+            for inputCol, col in self.colMap.items():
+                value = self.rowValues[inputRow][inputCol-1]
+                if isinstance(value, str) and value.lower() == searchValue.lower() and col > foundCol:
+                    foundCol = col
+        return foundCol
+
+class ReferenceMap:
+    #Where the rows (or columns) first..last of a moved block end up, {input index: output index}.
+    # Indexes missing from the mapping were removed from the block.
+    def __init__(self, mapping, first, last):
+        self.mapping = mapping
+        self.first = first
+        self.last = last
+        self.keptIndexes = sorted(mapping)
+
+    def isOutside(self, index):
+        return index < self.first or index > self.last
+
+    def exact(self, index):
+        #Output index of a single reference, None if it was removed
+        if self.isOutside(index):
+            return index
+        return self.mapping.get(index)
+
+    def rangeStart(self, index):
+        #Output index of the first row/column of a range, a removed one moves to the next kept one
+        if self.isOutside(index):
+            return index
+        i = bisect.bisect_left(self.keptIndexes, index)
+        if i == len(self.keptIndexes):
+            return self.last + 1
+        return self.mapping[self.keptIndexes[i]]
+
+    def rangeEnd(self, index):
+        #Output index of the last row/column of a range, a removed one moves to the previous kept one
+        if self.isOutside(index):
+            return index
+        i = bisect.bisect_right(self.keptIndexes, index)
+        if i == 0:
+            return self.first - 1
+        return self.mapping[self.keptIndexes[i-1]]
+
+class FormulaRewriter:
+    #Moves the references of copied formulas along with the cells they point to. Each distinct formula text is
+    # tokenized once with openpyxl's Tokenizer and every reference is remapped in a single pass over the tokens.
+    # References outside the moved block and to other sheets are left as they are. A reference to a removed
+    # cell becomes #REF! while ranges shrink to the cells that are left, the same as deleting rows in Excel.
+    CELL_PATTERN = re.compile(r"^(\$?)([A-Z]{1,3})(\$?)(\d+)$")
+    COLUMN_PATTERN = re.compile(r"^(\$?)([A-Z]{1,3})$")
+    ROW_PATTERN = re.compile(r"^(\$?)(\d+)$")
+
+    def __init__(self):
+        self.parsedFormulas = dict()
+
+    def parse(self, formula):
+        #Token texts of a formula, each with a flag telling if it is a reference
+        parsed = self.parsedFormulas.get(formula)
+        if parsed is None:
+            parsed = [(token.value, token.type == Token.OPERAND and token.subtype == Token.RANGE)
+                      for token in Tokenizer(formula).items]
+            self.parsedFormulas[formula] = parsed
+        return parsed
+
+    def relocate(self, formula, rowMap, colMap):
+        try:
+            parsed = self.parse(formula)
+        except TokenizerError:
+            log.warning("  WARNING: Unable to parse formula %s, copied as is.", formula)
+            return formula
+
+        return "=" + "".join(self.relocateReference(text, rowMap, colMap) if isReference else text for text, isReference in parsed)
+
+    def relocateReference(self, reference, rowMap, colMap):
+        #Other sheets did not move, defined names have nothing to move
+        if "!" in reference:
+            return reference
+
+        endpoints = reference.split(":")
+        if len(endpoints) == 1:
+            match = self.CELL_PATTERN.match(reference)
+            if match is None:
+                return reference
+            colAbsolute, colLetter, rowAbsolute, row = match.groups()
+            col, row = colMap.exact(column_index_from_string(colLetter)), rowMap.exact(int(row))
+            if col is None or row is None:
+                return "#REF!"
+            return "%s%s%s%d" % (colAbsolute, get_column_letter(col), rowAbsolute, row)
+
+        if len(endpoints) != 2:
+            return reference
+        start = self.relocateEndpoint(endpoints[0], rowMap.rangeStart, colMap.rangeStart)
+        end = self.relocateEndpoint(endpoints[1], rowMap.rangeEnd, colMap.rangeEnd)
+        if start is None or end is None:
+            return reference
+        if start[1] > end[1] or start[2] > end[2]:
+            return "#REF!"
+        return "%s:%s" % (start[0], end[0])
+
+    def relocateEndpoint(self, endpoint, mapRow, mapCol):
+        #(text, row, col) of a moved range endpoint, whole rows/columns compare as 0 on the missing part
+        match = self.CELL_PATTERN.match(endpoint)
+        if match is not None:
+            colAbsolute, colLetter, rowAbsolute, row = match.groups()
+            col, row = mapCol(column_index_from_string(colLetter)), mapRow(int(row))
+            return ("%s%s%s%d" % (colAbsolute, get_column_letter(col), rowAbsolute, row), row, col)
+
+        match = self.COLUMN_PATTERN.match(endpoint)
+        if match is not None:
+            colAbsolute, colLetter = match.groups()
+            col = mapCol(column_index_from_string(colLetter))
+            return ("%s%s" % (colAbsolute, get_column_letter(col)), 0, col)
+
+        match = self.ROW_PATTERN.match(endpoint)
+        if match is not None:
+            rowAbsolute, row = match.groups()
+            row = mapRow(int(row))
+            return ("%s%d" % (rowAbsolute, row), row, 0)
+
+        return None
+
+class LedgerSide:
+    #Gains or losses of the split Sch B/E ledger. Records are (date, qty, item, proceeds, carrying value,
+    # gain/loss) and the totals are the proceeds, carrying value and gain/loss sums rounded like the
+    # ROUND(SUM(),5) formulas the sheet gets, so those can be checked.
+    def __init__(self, records):
+        self.records = records
+        self.totals = tuple(round(sum(record[col] for record in records), 5) for col in (3, 4, 5))
+
+class SectionTotals:
+    #Section totals the migrators publish for the Summary page, by output sheet name. Each total is the
+    # number the migrator computed while writing the sheet and the cell on that sheet holding it.
+    def __init__(self):
+        self.totals = dict()
+
+    def publish(self, owbSheetName, total, cell):
+        self.totals[owbSheetName] = (total, cell)
+
+    def get(self, owbSheetName):
+        #Returns (total, cell) or None if the sheet has no published total
+        return self.totals.get(owbSheetName)
+
+class ScheduleTable:
+    #Typed columnar copy of one migrated schedule for the export sinks (see EXPORT_SINKS). Rows are tuples in
+    # column order, the first column is the output sheet row the values are on. Columns are (name, type) with
+    # type "integer" (the row), "number", "date" or "text". A column holding more than one kind of value is text,
+    # its values are exported as strings.
+    def __init__(self, name, columnNames, rows):
+        self.name = name
+        self.columns = [(columnNames[0], "integer")]
+        for index, columnName in enumerate(columnNames[1:], 1):
+            self.columns.append((columnName, scheduleColumnType(row[index] for row in rows)))
+
+        textColumns = [index for index, (columnName, columnType) in enumerate(self.columns) if columnType == "text"]
+        self.rows = list()
+        for row in rows:
+            row = list(row)
+            for index in textColumns:
+                if row[index] is not None and not isinstance(row[index], str):
+                    row[index] = str(row[index])
+            self.rows.append(tuple(row))
+
+    def columnNames(self):
+        return [columnName for columnName, columnType in self.columns]
+
+    def exportRows(self):
+        #Rows with dates as ISO strings (no time when it is midnight), for sinks without a date type
+        dateColumns = [index for index, (columnName, columnType) in enumerate(self.columns) if columnType == "date"]
+        for row in self.rows:
+            if dateColumns:
+                row = list(row)
+                for index in dateColumns:
+                    if row[index] is not None:
+                        row[index] = isoDate(row[index])
+            yield tuple(row)
+
+def scheduleColumnType(values):
+    #Type of an exported value column, empty cells do not count. Whole numbers are numbers too, so a column
+    # keeps its type whether or not a workbook has cents in it.
+    columnType = None
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            valueType = "number"
+        elif isinstance(value, datetime.date):
+            valueType = "date"
+        else:
+            valueType = "text"
+
+        if columnType is None:
+            columnType = valueType
+        elif columnType != valueType:
+            return "text"
+    return columnType or "text"
+
+def isLabel(value):
+    #Text the label lookups can find, formulas never match a label
+    return isinstance(value, str) and not value.startswith("=")
+
+def isNumberOrFormula(value):
+    if isinstance(value, str):
+        return value.startswith("=")
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def isoDate(value):
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+        return value.date().isoformat()
+    return value.isoformat()
+
+def readScheduleTable(owbSheetName, sheet, headerRow, firstCol=1):
+    #Schedule table of the rows below headerRow of a migrated output sheet. Every value in headerRow from firstCol
+    # on is a column, a row with a number or date in one of them is a data row. Text rows without values are the
+    # section headings the following rows are under (nested by column), total rows and formula rows are left out.
+    cellsByRow = dict()
+    for (row, col), cell in sheet._cells.items():
+        if row >= headerRow and cell.value is not None and cell.value != "":
+            cellsByRow.setdefault(row, dict())[col] = cell.value
+
+    headers = list()
+    for col, value in sorted(cellsByRow.get(headerRow, dict()).items()):
+        if col < firstCol or (isinstance(value, str) and value.startswith("=")):
+            continue
+        headers.append((col, isoDate(value) if isinstance(value, datetime.date) else str(value).strip()))
+    headerCols = [col for col, header in headers]
+
+    columnNames = ["Row", "Section", "Label"]
+    for col, header in headers:
+        columnName = header
+        suffix = 2
+        while columnName in columnNames:
+            columnName = "%s %d" % (header, suffix)
+            suffix += 1
+        columnNames.append(columnName)
+
+    #Text left of the headers (ASSETS on Beginning and Sch H) is the first section heading
+    sections = dict()
+    for col, value in cellsByRow.get(headerRow, dict()).items():
+        if col < firstCol and isinstance(value, str):
+            sections[col] = value.strip()
+
+    rows = list()
+    for row in sorted(cellsByRow):
+        if row == headerRow:
+            continue
+        values = cellsByRow[row]
+        texts = [(col, value.strip()) for col, value in sorted(values.items()) if isinstance(value, str)]
+        if any(text.startswith("=") for col, text in texts):
+            continue
+
+        #A total closes its section and the ones nested in it
+        totalCols = [col for col, text in texts if text.lower().startswith("total")]
+        if totalCols:
+            for col in [col for col in sections if col >= totalCols[0]]:
+                del sections[col]
+            continue
+
+        isDataRow = False
+        for col in headerCols:
+            value = values.get(col)
+            if isinstance(value, (int, float, datetime.date)) and not isinstance(value, bool):
+                isDataRow = True
+                break
+
+        if not isDataRow:
+            if texts:
+                headingCol, heading = texts[0]
+                for col in [col for col in sections if col >= headingCol]:
+                    del sections[col]
+                sections[headingCol] = heading
+            continue
+
+        section = " / ".join(sections[col] for col in sorted(sections)) or None
+        label = " ".join(str(value) for col, value in sorted(values.items()) if col not in headerCols) or None
+        rows.append((row, section, label) + tuple(values.get(col) for col in headerCols))
+
+    return ScheduleTable(owbSheetName, columnNames, rows)
+
+class ColumnWidthTracker:
+    #Automatic column widths of one output sheet, updated on every write instead of found by scanning the
+    # finished sheet. Every width is counted per column, so overwriting a value drops the width of the old one.
+    FIRST_ROW = 4
+
+    def __init__(self):
+        self.columnWidthCounts = dict()
+
+    def displayWidth(self, value):
+        #Numbers get extra room, formulas and empty values do not count
+        if not value:
+            return None
+        if isinstance(value, (int, float)):
+            return 1.8 * len(str(value))
+        if isinstance(value, str) and "=" in value:
+            return None
+        return len(str(value))
+
+    def update(self, row, col, oldValue, newValue):
+        if row < self.FIRST_ROW:
+            return
+
+        oldWidth = self.displayWidth(oldValue)
+        if oldWidth is not None:
+            widthCounts = self.columnWidthCounts[col]
+            widthCounts[oldWidth] -= 1
+            if widthCounts[oldWidth] == 0:
+                del widthCounts[oldWidth]
+
+        newWidth = self.displayWidth(newValue)
+        if newWidth is not None:
+            widthCounts = self.columnWidthCounts.setdefault(col, dict())
+            widthCounts[newWidth] = widthCounts.get(newWidth, 0) + 1
+
+    def widths(self):
+        #{column letter: width} of the columns holding anything
+        return {get_column_letter(col): max(widthCounts) for col, widthCounts in sorted(self.columnWidthCounts.items()) if widthCounts}
+
+class StyleRegistry:
+    #The CELL_STYLES of one workbook. Each style is added to the workbook the first time it is used, after that
+    # styling a cell is just a copy of the style's index array (one xf in styles.xml per style, not per cell).
+    # NamedStyle objects remember the workbook they were bound to, so every workbook gets its own.
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.styleArrays = dict()
+
+    def styleArray(self, styleName):
+        styleArray = self.styleArrays.get(styleName)
+        if styleArray is None:
+            styleParts = dict(CELL_STYLES[styleName])
+            #Format-only styles keep the workbook's default font, like cells that only had number_format set
+            styleParts.setdefault("font", DEFAULT_FONT)
+            namedStyle = NamedStyle(name=styleName, **styleParts)
+            self.workbook.add_named_style(namedStyle)
+            styleArray = namedStyle.as_tuple()
+            self.styleArrays[styleName] = styleArray
+        return styleArray
+
+    def apply(self, cell, styleName):
+        cell._style = copy.copy(self.styleArray(styleName))
+
+    def applyFormat(self, cell, styleName):
+        #Like apply(), but a cell that already has formatting only gets the parts this style defines
+        # (a bold total in a money column stays bold and just gains the number format)
+        if not cell.has_style:
+            self.apply(cell, styleName)
+            return
+        for attribute, value in CELL_STYLES[styleName].items():
+            setattr(cell, attribute, value)
+
+def cellStyleParts(cell):
+    #Workbook independent copy of a cell's style. Cell._style only holds indexes into its own workbook's style tables.
+    return (copy.copy(cell.font), copy.copy(cell.border), copy.copy(cell.fill), cell.number_format,
+            copy.copy(cell.alignment), copy.copy(cell.protection))
+
+def applyCellStyleParts(cell, styleParts):
+    cell.font, cell.border, cell.fill, cell.number_format, cell.alignment, cell.protection = styleParts
+
+def snapshotSheet(sheet):
+    #Picklable copy of an output sheet (values, styles, merges, widths) to hand it between processes.
+    # Styles are stored once each and referenced by index.
+    styleIndexes = dict()
+    styles = list()
+    cells = list()
+    for (row, col), cell in sheet._cells.items():
+        styleIndex = None
+        if cell.has_style:
+            styleKey = tuple(cell._style)
+            styleIndex = styleIndexes.get(styleKey)
+            if styleIndex is None:
+                styleIndex = len(styles)
+                styleIndexes[styleKey] = styleIndex
+                styles.append(cellStyleParts(cell))
+        cells.append((row, col, cell.value, styleIndex))
+
+    columnWidths = dict()
+    columnStyles = dict()
+    for key, dimension in sheet.column_dimensions.items():
+        columnWidths[key] = dimension.width
+        if dimension.has_style:
+            columnStyles[key] = cellStyleParts(dimension)
+
+    return {"title": sheet.title, "cells": cells, "styles": styles, "columnWidths": columnWidths,
+            "columnStyles": columnStyles, "mergedRanges": [mergedRange.coord for mergedRange in sheet.merged_cells.ranges]}
+
+def restoreSheet(workbook, snapshot, widthTracker=None):
+    #Rebuilds a sheet from snapshotSheet() in another workbook, widthTracker gets the restored values
+    loadOpenpyxl()
+    sheet = workbook.create_sheet(title=snapshot["title"])
+
+    for key, width in snapshot["columnWidths"].items():
+        sheet.column_dimensions[key].width = width
+    for key, styleParts in snapshot["columnStyles"].items():
+        applyCellStyleParts(sheet.column_dimensions[key], styleParts)
+
+    #Merge first, covered cells then only get their style back (their value always is None)
+    for mergedRange in snapshot["mergedRanges"]:
+        sheet.merge_cells(mergedRange)
+
+    #Register each style with this workbook once, then reuse its style indexes
+    styles = snapshot["styles"]
+    styleArrays = dict()
+    for row, col, value, styleIndex in snapshot["cells"]:
+        cell = sheet._cells.get((row, col))
+        if not isinstance(cell, MergedCell):
+            cell = sheet.cell(row=row, column=col, value=value)
+            if widthTracker is not None:
+                widthTracker.update(row, col, None, value)
+        if styleIndex is None:
+            continue
+
+        styleArray = styleArrays.get(styleIndex)
+        if styleArray is None:
+            applyCellStyleParts(cell, styles[styleIndex])
+            styleArrays[styleIndex] = copy.copy(cell._style)
+        else:
+            cell._style = copy.copy(styleArray)
+
+    return sheet
+
+class StreamingOutputWriter:
+    #Output backend built on openpyxl's write-only mode. Finished sheets are streamed to temporary files
+    # in row order as soon as they are handed over, so only the sheets still being migrated stay in memory.
+    def __init__(self):
+        loadOpenpyxl()
+        self.workbook = Workbook(write_only=True)
+
+        #Style of a cell in the in-memory output workbook -> equivalent style in the streamed workbook
+        self.styleCache = dict()
+
+    def writeSheet(self, sheet):
+        streamedSheet = self.workbook.create_sheet(title=sheet.title)
+
+        #Column widths and merged title cells have to be set before any row is written
+        for key, dimension in sheet.column_dimensions.items():
+            streamedSheet.column_dimensions[key].width = dimension.width
+            if dimension.has_style:
+                applyCellStyleParts(streamedSheet.column_dimensions[key], cellStyleParts(dimension))
+        for mergedRange in sheet.merged_cells.ranges:
+            streamedSheet.merged_cells.add(mergedRange.coord)
+
+        rowNum = 1
+        rowCells = list()
+        for (row, col) in sorted(sheet._cells):
+            if row != rowNum:
+                streamedSheet.append(rowCells)
+                rowNum += 1
+                #Keep row numbers lined up across empty rows
+                while rowNum < row:
+                    streamedSheet.append([])
+                    rowNum += 1
+                rowCells = list()
+
+            #Pad up to this column, the writer skips the Nones
+            while len(rowCells) < col - 1:
+                rowCells.append(None)
+            rowCells.append(self.streamedCell(streamedSheet, sheet._cells[(row, col)]))
+
+        if len(rowCells) > 0:
+            streamedSheet.append(rowCells)
+
+    def streamedCell(self, streamedSheet, cell):
+        streamedCell = WriteOnlyCell(streamedSheet, value=cell.value)
+        if cell.hyperlink is not None:
+            streamedCell.hyperlink = Hyperlink(ref=cell.coordinate, location=cell.hyperlink.location, target=cell.hyperlink.target)
+        if not cell.has_style:
+            return streamedCell
+
+        styleKey = tuple(cell._style)
+        style = self.styleCache.get(styleKey)
+        if style is None:
+            #First time this style shows up, register its parts with the streamed workbook once
+            applyCellStyleParts(streamedCell, cellStyleParts(cell))
+            style = copy.copy(streamedCell._style)
+            self.styleCache[styleKey] = style
+        else:
+            streamedCell._style = copy.copy(style)
+
+        return streamedCell
+
+    def save(self, filename):
+        self.workbook.save(filename)
+
+def defaultOutputPath(inputWorkbookPath):
+    return os.path.join(os.path.dirname(inputWorkbookPath), "final_modified_" + os.path.basename(inputWorkbookPath))
+
+def uniqueOutputPath(outputPath):
+    #Prefix "final_" until the name is free, old outputs are never overwritten
+    while os.path.exists(outputPath):
+        outputPath = os.path.join(os.path.dirname(outputPath), "final_" + os.path.basename(outputPath))
+    return outputPath
+
+def peakRssKB():
+    #Peak resident set size of this process in KB, None when the platform cant report it
+    if resource is None:
+        return None
+    peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        #macOS reports bytes, Linux reports KB
+        peakRss = peakRss // 1024
+    return peakRss
+
+class StageProfiler:
+    #Records wall time, CPU time, cell counts and memory of each conversion stage
+    def __init__(self, traceMemory=False):
+        self.stages = list()
+        self.openStages = list()
+        self.nextOrder = 0
+        self.startTime = time.perf_counter()
+
+        #tracemalloc slows the conversion down noticeably, so it is opt-in
+        self.traceMemory = traceMemory
+        self.startedTracing = False
+        if traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.startedTracing = True
+
+    def foldTracedPeak(self):
+        #Stages can nest, so fold the peak seen so far into every open stage before resetting it
+        tracedPeak = tracemalloc.get_traced_memory()[1]
+        for stage in self.openStages:
+            stage["_tracedPeak"] = max(stage["_tracedPeak"], tracedPeak)
+        #reset_peak needs Python 3.9+, older versions keep one peak for the whole run
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def startStage(self, stageName, sheetName=None):
+        stage = {"stage": stageName, "sheet": sheetName, "depth": len(self.openStages), "_order": self.nextOrder}
+        self.nextOrder += 1
+        if self.traceMemory:
+            self.foldTracedPeak()
+            stage["_tracedStart"] = tracemalloc.get_traced_memory()[0]
+            stage["_tracedPeak"] = stage["_tracedStart"]
+        stage["_peakRss"] = peakRssKB()
+        stage["_cpu"] = time.process_time()
+        stage["_wall"] = time.perf_counter()
+
+        self.openStages.append(stage)
+        return stage
+
+    def endStage(self, stage, cells, failed=False):
+        wallSeconds = time.perf_counter() - stage.pop("_wall")
+        cpuSeconds = time.process_time() - stage.pop("_cpu")
+
+        stage["wallSeconds"] = round(wallSeconds, 6)
+        stage["cpuSeconds"] = round(cpuSeconds, 6)
+        stage["cells"] = cells
+        stage["failed"] = failed
+
+        startPeakRss = stage.pop("_peakRss")
+        endPeakRss = peakRssKB()
+        stage["peakRssKB"] = endPeakRss
+        stage["peakRssDeltaKB"] = None if endPeakRss is None else endPeakRss - startPeakRss
+
+        if self.traceMemory:
+            self.foldTracedPeak()
+            stage["tracedPeakDeltaKB"] = (stage.pop("_tracedPeak") - stage.pop("_tracedStart")) // 1024
+        else:
+            stage["tracedPeakDeltaKB"] = None
+
+        self.openStages.remove(stage)
+        self.stages.append(stage)
+
+    def addStages(self, stages):
+        #Adds stages recorded by another profiler, e.g. in a sheet worker process
+        for stage in stages:
+            stage = dict(stage)
+            stage["depth"] += len(self.openStages)
+            stage["_order"] = self.nextOrder
+            self.nextOrder += 1
+            self.stages.append(stage)
+
+    def stop(self):
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+
+    def orderedStages(self):
+        #Stages are recorded as they finish (nested ones first), list them in the order they started
+        stages = list()
+        for stage in sorted(self.stages, key=lambda stage: stage["_order"]):
+            stages.append({key: value for key, value in stage.items() if not key.startswith("_")})
+        return stages
+
+    def report(self, inputPath=None, outputPath=None):
+        return {"input": inputPath, "output": outputPath, "totalSeconds": round(time.perf_counter() - self.startTime, 6),
+                "peakRssKB": peakRssKB(), "traceMemory": self.traceMemory, "stages": self.orderedStages()}
+
+    def writeReport(self, reportPath, inputPath=None, outputPath=None):
+        with open(reportPath, "w") as reportFile:
+            json.dump(self.report(inputPath, outputPath), reportFile, indent=2)
+
+    def formatTable(self):
+        def formatKB(value):
+            return "-" if value is None else "%d" % (value)
+
+        lines = ["  %-44s %9s %9s %9s %11s %11s" % ("Stage", "Wall (s)", "CPU (s)", "Cells", "dRSS (KB)", "dTrace (KB)")]
+        for stage in self.orderedStages():
+            stageName = "  " * stage["depth"] + stage["stage"]
+            if stage["sheet"] is not None:
+                stageName += " (%s)" % (stage["sheet"])
+            if stage["failed"]:
+                stageName += " FAILED"
+            lines.append("  %-44s %9.3f %9.3f %9d %11s %11s" % (stageName, stage["wallSeconds"], stage["cpuSeconds"], stage["cells"],
+                                                              formatKB(stage["peakRssDeltaKB"]), formatKB(stage["tracedPeakDeltaKB"])))
+        return "\n".join(lines)
+
+def profiledStage(stageFunction):
+    #Wraps a MigrateExcel stage so it is recorded when a profiler is attached, costs nothing otherwise
+    @functools.wraps(stageFunction)
+    def profiledStageWrapper(self, *args, **kwargs):
+        if self.profiler is None:
+            return stageFunction(self, *args, **kwargs)
+
+        #Migrators are called with (iwbSheetName, owbSheetName)
+        sheetName = args[1] if len(args) > 1 else None
+        stage = self.profiler.startStage(stageFunction.__name__, sheetName)
+        failed = True
+        try:
+            returnValue = stageFunction(self, *args, **kwargs)
+            failed = False
+            return returnValue
+        finally:
+            self.profiler.endStage(stage, self.countStageCells(stageFunction.__name__, sheetName), failed)
+
+    return profiledStageWrapper
+
+class SheetMigrator:
+    #Registry entry: the migrate steps run for one input sheet. Each step is (migrate method name, output sheet it creates).
+    def __init__(self, steps):
+        self.steps = steps
+
+    def outputSheetNames(self):
+        return [owbSheetName for methodName, owbSheetName in self.steps]
+
+#Output sheet name (see extractSheetNameMappings) -> migrator. None of the schedules read another
+# schedule's output, so they are all independent and can run in parallel. The Summary page reads their
+# published totals, it is built by startMigration after all of them are done.
+SHEET_MIGRATORS = {
+    "Beginning":        SheetMigrator([("migrateBeginning", "Beginning")]),
+    "Beginning Detail": SheetMigrator([("migrateBeginningDetail", "Beginning Detail")]),
+    "Additional":       SheetMigrator([("migrateAdditional", "Additional")]),
+    "Sch A":            SheetMigrator([("migrateSchA", "Sch A")]),
+    #Sch B input holds both gains and losses, it produces Sch B and Sch E
+    "Sch B":            SheetMigrator([("migrateSchB", "Sch B"), ("migrateSchB_E", "Sch E")]),
+    "Sch C":            SheetMigrator([("migrateSchC", "Sch C")]),
+    "Sch D":            SheetMigrator([("migrateSchD", "Sch D")]),
+    "Sch F":            SheetMigrator([("migrateSchF", "Sch F")]),
+    "Sch G":            SheetMigrator([("migrateSchG", "Sch G")]),
+    "Sch H":            SheetMigrator([("migrateSchH", "Sch H")]),
+    "Sch H Detail":     SheetMigrator([("migrateSchHDetail", "Sch H Detail")]),
+    "Market Value":     SheetMigrator([("migrateMarketValue", "Market Value")]),
+    "Liability":        SheetMigrator([("migrateLiability", "Liability")]),
+}
+
+def migrateSheetInWorker(inputWorkbookPath, inputSheet, steps, profile=False, logLevel=LOG_LEVEL__INFO, exportTables=False):
+    #Process pool entry point: migrates one input sheet into a private output workbook and sends
+    # the finished sheets and log records back. Module level so it can be pickled.
+    with activeLog(ConversionLog(buffered=True)):
+        migrateExcel = MigrateExcel(inputWorkbookPath, profiler=StageProfiler() if profile else None, exportTables=exportTables)
+
+    migrateExcel.iwb = InputWorkbook()
+    migrateExcel.iwb.addSheet(inputSheet)
+    migrateExcel.iwb_do = CachedValueReader(inputWorkbookPath, migrateExcel.iwb)
+    migrateExcel.openOWB()
+
+    with activeLog(ConversionLog(logLevel, buffered=True)) as migrationLog:
+        migrationStatus = migrateExcel.runMigratorSteps(inputSheet.title, steps)
+
+    sheets = list()
+    totals = dict()
+    tables = dict()
+    for methodName, owbSheetName in steps:
+        if owbSheetName in migrateExcel.owb.sheetnames:
+            sheets.append(snapshotSheet(migrateExcel.owb[owbSheetName]))
+        if migrateExcel.sectionTotals.get(owbSheetName) is not None:
+            totals[owbSheetName] = migrateExcel.sectionTotals.get(owbSheetName)
+        if owbSheetName in migrateExcel.scheduleTables:
+            tables[owbSheetName] = migrateExcel.scheduleTables[owbSheetName]
+
+    stages = list()
+    if migrateExcel.profiler is not None:
+        stages = migrateExcel.profiler.orderedStages()
+
+    return {"status": migrationStatus, "log": migrationLog.records, "sheets": sheets, "totals": totals, "tables": tables, "stages": stages}
 
 class MigrateExcel:
-    def __init__(self, inputWorkbookPath):
+    def __init__(self, inputWorkbookPath, streamOutput=False, profiler=None, sheetWorkers=1, incrementalStateDir=None, fastReader=False,
+                 exportTables=False):
+        loadOpenpyxl()
         self.iwb_path = inputWorkbookPath;
 
         #Derive output file based on input file
-        self.owb_path = os.path.join(os.path.dirname(inputWorkbookPath), "modified_" + os.path.basename(inputWorkbookPath))
-        zprint("Output workbook will be: \"%s\"" % (self.owb_path))
+        self.owb_path = defaultOutputPath(inputWorkbookPath)
+        log.info("Output workbook will be: \"%s\"", self.owb_path)
 
         #Initialize the pointers to the workbook variables to use later
         self.iwb = None
         self.owb = None
         self.iwb_do = None
 
-        self.iwbSheetNameToActualName = dict()
+        #Named cell styles of the output workbook
+        self.styles = None
 
-        self.owbActualNameToSheetName = dict()
+        #Sch B/E ledgers split into (gains, losses) by splitSchBLedger, shared by the Sch B and Sch E migrators
+        self.schBLedgers = dict()
 
-    #######################
-    #  Starter Functions  #
-    #######################
-    def extractSheetNameMappings(self):
-        #Build dictionary for mappings between iwb.sheetName -> actualName -> owb.sheetName
-        for sheetName in self.iwb.sheetnames:
-            currSheet = self.iwb[sheetName]
-            actualName = currSheet["A2"].value
+        #Totals published by the migrators for the Summary page
+        self.sectionTotals = SectionTotals()
 
-            self.iwbSheetNameToActualName[sheetName] = actualName
+        #Schedule tables for the export sinks by output sheet name, only collected when exporting
+        self.exportTables = exportTables
+        self.scheduleTables = dict()
+
+        #Calculated values of the output formulas by sheet, saved along with the formulas
+        self.calculatedValues = dict()
 
-            if "Property on Hand at Beginning of Account" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Beginning"
+        #Values of formulas referencing other sheets by sheet, {sheet: {cell: value}}, the evaluator takes them as given
+        self.linkedValues = dict()
 
-            if "Property on Hand at Beginning of Account - Investment Detail" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Beginning Detail"
+        #Moves the references of copied formulas, keeps every formula it parsed
+        self.formulaRewriter = FormulaRewriter()
 
-            if "Additional Property Received" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Additional"
+        #Automatic column widths of each output sheet, kept up to date by every write
+        self.columnWidthTrackers = dict()
 
-            if "Schedule A - Receipts" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch A"
+        #Write-only output backend, only used when streaming output sheets straight to disk
+        self.streamOutput = streamOutput
+        self.outputStreamer = None
 
-            if "Schedule B/E - For Export To Excel Only" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch B"
+        #Optional StageProfiler, records timing and memory of every stage
+        self.profiler = profiler
 
-            if "Schedule C - Net Income from Trade or Business" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch C"
+        #Worker processes used to migrate sheets in parallel. 1 migrates in this process, 0/None uses one per CPU.
+        self.sheetWorkers = sheetWorkers
 
-            if "Schedule D - Disbursements" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch D"
+        #Read the input with SpreadsheetMLReader instead of openpyxl, falls back to openpyxl on anything it does not know
+        self.fastReader = fastReader
 
-            if "Schedule F - Net Loss from Trade or Business" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch F"
+        #Incremental conversion: output sheets whose input sheet is unchanged are reused from the previous output
+        self.previousConversion = None
+        if incrementalStateDir is not None:
+            self.previousConversion = PreviousConversion(incrementalStateDir, inputWorkbookPath)
+        self.sheetStates = dict()
 
-            if "Schedule G - Distributions" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch G"
+        self.iwbSheetNameToActualName = dict()
 
-            if "Schedule H - Property on Hand at Close of Account" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch H"
+        self.owbActualNameToSheetName = dict()
 
-            if "Schedule H - Investment Detail" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Sch H Detail"
+        #Lazily built per-sheet text -> cell positions index used by the string lookup helpers
+        self.labelIndexes = dict()
 
-            if "Estimated Market Value" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Market Value"
+    #######################
+    #  Starter Functions  #
+    #######################
+    @profiledStage
+    def extractSheetNameMappings(self):
+        #Build dictionary for mappings between iwb.sheetName -> actualName -> owb.sheetName
+        for sheetName in self.iwb.allSheetNames:
+            actualName = self.iwb.probe(sheetName).getValue(2, 1)
 
-            if "Liability Detail" == actualName:
-                self.owbActualNameToSheetName[actualName] = "Liability"
+            self.iwbSheetNameToActualName[sheetName] = actualName
 
-        zprint("\n### Mapping of input sheet to output sheet: ###")
-        foundError = False
-        for sheetName in self.iwb.sheetnames:
-            try:
-                zprint("%8s   --> %-65s --> %s" % (sheetName, self.iwbSheetNameToActualName[sheetName], self.owbActualNameToSheetName[self.iwbSheetNameToActualName[sheetName]]))
-            except:
-                zprint("ERROR: failed to map input sheet name: %s" % (sheetName))
-                foundError = True
+            if actualName in INPUT_TITLE_TO_SHEET_NAME:
+                self.owbActualNameToSheetName[actualName] = INPUT_TITLE_TO_SHEET_NAME[actualName]
+
+        #Unknown sheets (e.g. unrelated tabs attached by the client) were not loaded, startMigration reports them
+        log.info("\n### Mapping of input sheet to output sheet: ###")
+        numMappedSheets = 0
+        for sheetName in self.iwb.allSheetNames:
+            actualName = self.iwbSheetNameToActualName[sheetName]
+            if actualName in self.owbActualNameToSheetName:
+                log.info("%8s   --> %-65s --> %s", sheetName, actualName, self.owbActualNameToSheetName[actualName])
+                numMappedSheets += 1
+            else:
+                log.error("ERROR: failed to map input sheet name: %s (%s), it is skipped", sheetName, actualName)
 
-        if foundError:
-            zprint("ERROR: Failed to map all input sheets! Cant continue.")
+        if numMappedSheets == 0:
+            log.error("ERROR: Failed to map any input sheet! Cant continue.")
             exit(1)
 
-        zprint("\n")
+        log.info("\n")
 
     def startMigration(self):
         self.unknownInputSheetNames = list()
         self.migrationFailedSheets = list()
 
-        zprint("#################################")
-        zprint("#   STARTING SHEET MIGRATIONS   #")
-        zprint("#################################\n")
+        log.info("#################################")
+        log.info("#   STARTING SHEET MIGRATIONS   #")
+        log.info("#################################\n")
 
-        #Kick off all sheet conversions one by one
-        for iwbSheetName in self.iwb.sheetnames:
+        #Look up the registered migrator of every input sheet
+        migrationTasks = list()
+        for iwbSheetName in self.iwb.allSheetNames:
             #Get actual sheet name from input sheet name
             try:
                 actualName = self.iwbSheetNameToActualName[iwbSheetName]
             except:
-                zprint("ERROR: Unable to map input sheet name (%s) to actual sheet name" % (iwbSheetName))
+                log.error("ERROR: Unable to map input sheet name (%s) to actual sheet name", iwbSheetName)
                 self.unknownInputSheetNames.append(iwbSheetName)
                 continue
 
@@ -161,361 +1912,188 @@ class MigrateExcel:
             try:
                 owbSheetName = self.owbActualNameToSheetName[actualName]
             except:
-                zprint("ERROR: Unable to find actual sheet name mapping to output sheet mapping.")
+                log.error("ERROR: Unable to find actual sheet name mapping to output sheet mapping.")
                 self.unknownInputSheetNames.append(iwbSheetName)
                 continue
 
-            migrationStatus = 0
-
-            if owbSheetName == "Beginning":
-                zprint("#Migrating Beginning")
-                try:
-                    migrationStatus = self.migrateBeginning(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % (owbSheetName))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Beginning Detail":
-                zprint("#Migrating Beginning Detail")
-                try:
-                    migrationStatus = self.migrateBeginningDetail(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % (owbSheetName))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Additional":
-                zprint("#Migrating Beginning Detail")
-                try:
-                    migrationStatus = self.migrateAdditional(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % (owbSheetName))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Sch A":
-                zprint("#Migrating Schedule A")
-                try:
-                    migrationStatus = self.migrateSchA(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % (owbSheetName))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Sch B":
-                zprint("#Migrating Schedule B")
-                #Custom migration, Create output sheets B and E
-                try:
-                    migrationStatus = self.migrateSchB(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % (owbSheetName))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-                zprint("#Migrating Schedule E")
-                try:
-                    migrationStatus = self.migrateSchB_E(iwbSheetName, "Sch E")
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
+            migrator = SHEET_MIGRATORS.get(owbSheetName)
+            if migrator is None:
+                log.error("ERROR: Could not map input sheet (%s) to an ouptut sheet. Migration failed", iwbSheetName)
+                self.unknownInputSheetNames.append(iwbSheetName)
+                continue
 
+            migrationTasks.append((iwbSheetName, owbSheetName, migrator))
 
-            elif owbSheetName == "Sch C":
-                zprint("#Migrating Schedule C")
-                try:
-                    migrationStatus = self.migrateSchC(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
+        #Output sheets of unchanged input sheets are taken over from the previous output
+        if self.previousConversion is not None:
+            migrationTasks = self.reuseUnchangedSheets(migrationTasks)
 
-            elif owbSheetName == "Sch D":
-                zprint("#Migrating Schedule D")
-                try:
-                    migrationStatus = self.migrateSchD(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Sch F":
-                zprint("#Migrating Schedule F")
-                try:
-                    migrationStatus = self.migrateSchF(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
+        #Kick off all sheet conversions, one by one or spread over worker processes
+        #Daemon processes (batch workers on older Pythons) can not start sheet workers of their own
+        if self.sheetWorkers != 1 and len(migrationTasks) > 1 and not multiprocessing.current_process().daemon:
+            self.runMigrationTasksInWorkers(migrationTasks)
+        else:
+            for iwbSheetName, owbSheetName, migrator in migrationTasks:
+                migrationStatus = self.runMigratorSteps(iwbSheetName, migrator.steps)
+                self.finishMigrationTask(iwbSheetName, owbSheetName, migrator, migrationStatus)
 
-            elif owbSheetName == "Sch G":
-                zprint("#Migrating Schedule G")
-                try:
-                    migrationStatus = self.migrateSchG(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
+        #Create summary page details
+        self.createSummaryPage()
 
-            elif owbSheetName == "Sch H":
-                zprint("#Migrating Schedule H")
-                try:
-                    migrationStatus = self.migrateSchH(iwbSheetName, owbSheetName)
-                except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
+        log.info("########################################")
+        log.info("#   FINSHED STARTING SHEET MIGRATION   #")
+        log.info("########################################\n")
 
-            elif owbSheetName == "Sch H Detail":
-                zprint("#Migrating Schedule H Detail")
+        #Check if any input sheets were unknown
+        if len(self.unknownInputSheetNames) > 0:
+            log.error("ERROR: Found %d unkonown input sheets: %s", len(self.unknownInputSheetNames), ", ".join(self.unknownInputSheetNames))
+
+    def runMigratorSteps(self, iwbSheetName, steps):
+        #Runs the migrate steps of one input sheet, returns 0 when all of them succeeded
+        migrationStatus = 0
+        for methodName, owbSheetName in steps:
+            with log.sheetContext(owbSheetName):
+                log.info("#Migrating %s", owbSheetName)
                 try:
-                    migrationStatus = self.migrateSchHDetail(iwbSheetName, owbSheetName)
+                    stepStatus = getattr(self, methodName)(iwbSheetName, owbSheetName)
                 except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Market Value":
-                zprint("#Migrating Market Value")
+                    log.error("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required.", owbSheetName)
+                    log.info("   Fatal Error details: %s", str(e))
+                    stepStatus = -1
+
+            if stepStatus != 0:
+                migrationStatus = stepStatus
+
+        return migrationStatus
+
+    def runMigrationTasksInWorkers(self, migrationTasks):
+        #Each input sheet is migrated in a worker process into its own workbook. Finished sheets are
+        # merged back in task order so the output and log do not depend on which worker finishes first.
+        log.info("Migrating %d sheets using %s worker processes..\n", len(migrationTasks), self.sheetWorkers or os.cpu_count())
+
+        #A result of None means the task is migrated in this process when its turn to merge comes
+        results = dict()
+        nextTaskToMerge = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.sheetWorkers or None) as executor:
+            futureToTaskNum = dict()
+            for taskNum, (iwbSheetName, owbSheetName, migrator) in enumerate(migrationTasks):
+                future = executor.submit(migrateSheetInWorker, self.iwb_path, self.iwb[iwbSheetName], migrator.steps,
+                                         self.profiler is not None, log.level, self.exportTables)
+                futureToTaskNum[future] = taskNum
+
+            for future in concurrent.futures.as_completed(futureToTaskNum):
+                taskNum = futureToTaskNum[future]
                 try:
-                    migrationStatus = self.migrateMarketValue(iwbSheetName, owbSheetName)
+                    results[taskNum] = future.result()
                 except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            elif owbSheetName == "Liability":
-                zprint("#Migrating Liability")
+                    log.warning("WARNING: Sheet worker failed (%s), migrating %s in this process instead", str(e), migrationTasks[taskNum][0])
+                    results[taskNum] = None
+
+                #A task is only merged after the ones before it
+                while nextTaskToMerge in results:
+                    self.mergeWorkerResult(migrationTasks[nextTaskToMerge], results.pop(nextTaskToMerge))
+                    nextTaskToMerge += 1
+
+        #Tasks left after the last worker finished all run in this process
+        while nextTaskToMerge < len(migrationTasks):
+            self.mergeWorkerResult(migrationTasks[nextTaskToMerge], results.pop(nextTaskToMerge))
+            nextTaskToMerge += 1
+
+    def mergeWorkerResult(self, migrationTask, result):
+        iwbSheetName, owbSheetName, migrator = migrationTask
+        if result is None:
+            migrationStatus = self.runMigratorSteps(iwbSheetName, migrator.steps)
+        else:
+            log.addRecords(result["log"])
+            for snapshot in result["sheets"]:
+                restoreSheet(self.owb, snapshot, self.widthTracker(snapshot["title"]))
+            for totalSheetName, (total, cell) in result["totals"].items():
+                self.sectionTotals.publish(totalSheetName, total, cell)
+            self.scheduleTables.update(result["tables"])
+            if self.profiler is not None:
+                self.profiler.addStages(result["stages"])
+            migrationStatus = result["status"]
+
+        self.finishMigrationTask(iwbSheetName, owbSheetName, migrator, migrationStatus)
+
+    def reuseUnchangedSheets(self, migrationTasks):
+        #Copies the output sheets of unchanged input sheets from the previous output, returns the tasks still to migrate
+        remainingTasks = list()
+        for iwbSheetName, owbSheetName, migrator in migrationTasks:
+            fingerprint = self.iwb[iwbSheetName].fingerprint()
+            self.sheetStates[owbSheetName] = {"inputSheet": iwbSheetName, "fingerprint": fingerprint, "status": 0}
+
+            previousSheets = None
+            if self.previousConversion.reusableSheet(owbSheetName, fingerprint):
                 try:
-                    migrationStatus = self.migrateLiability(iwbSheetName, owbSheetName)
+                    previousSheets = [self.previousConversion.getOutputSheet(name) for name in migrator.outputSheetNames()]
                 except Exception as e:
-                    zprint("ERROR: Fatal error occurred while migrating %s sheet. Manual port will be required." % ("Sch E"))
-                    zprint("   Fatal Error details: %s" % (str(e)))
-
-            else:
-                zprint("ERROR: Could not map input sheet (%s) to an ouptut sheet. Migration failed" % (iwbSheetName))
-                self.unknownInputSheetNames.append(iwbSheetName)
-
-            #Check if any sheet migrations failed
-            if migrationStatus != 0:
-                zprint("ERROR: Migration failed for sheet: %s (%s)\n" % (iwbSheetName, owbSheetName))
-                self.migrationFailedSheets.append(iwbSheetName)
-
-        #Create summary page details
-        self.createSummaryPage()
-
-        zprint("########################################")
-        zprint("#   FINSHED STARTING SHEET MIGRATION   #")
-        zprint("########################################\n")
-
-        #Check if any input sheets were unknown
-        if len(self.unknownInputSheetNames) > 0:
-            zprint("ERROR: Found %d unkonown input sheets: %s" % (len(self.unknownInputSheetNames), ", ".join(self.unknownInputSheetNames)))
-
-    def finalPolishing(self):
-        print_debug("Opening workbook: %s" % (self.owb_path))
+                    log.warning("WARNING: Unable to read previous output %s: %s", self.previousConversion.outputPath, str(e))
 
-        #Overwrite pointer to self.owb to allow helper functions to still work here
-        self.owb = load_workbook(self.owb_path)
-
-
-        ##############################
-        #    Fix Header Alignment    #
-        ##############################
-        for sheetName in self.owb.sheetnames:
-            if sheetName == "Summary":
+            if previousSheets is None or None in previousSheets:
+                remainingTasks.append((iwbSheetName, owbSheetName, migrator))
                 continue
-            currSheet = self.owb[sheetName]
 
-            if sheetName == "Sch D":
-                headerRow = 4
-            else:
-                headerRow = 5
+            log.info("#Reusing unchanged %s from %s", ", ".join(migrator.outputSheetNames()), self.previousConversion.outputPath)
+            for previousSheet in previousSheets:
+                restoreSheet(self.owb, snapshotSheet(previousSheet), self.widthTracker(previousSheet.title))
+            for totalSheetName, (total, cell) in self.previousConversion.sectionTotals(owbSheetName).items():
+                self.sectionTotals.publish(totalSheetName, total, cell)
+            self.finishMigrationTask(iwbSheetName, owbSheetName, migrator, 0)
 
-            for row in currSheet.iter_rows(min_row=headerRow, max_row=headerRow):
-                for cell in row:
-                    cell.alignment = ALIGNMENT__HORIZONAL_CENTER
+        return remainingTasks
 
-        ##############################
-        #      Fix Column Widths     #
-        ##############################
-        zprint("\nFixing column widths for all sheets..")
-        for sheetName in self.owb.sheetnames:
-            currSheet = self.owb[sheetName]
-            ##################################################
-            #  Auto set width of each column based on data   #
-            ##################################################
-            dims = {}
-            for row in currSheet.iter_rows(min_row=4, max_row=currSheet.max_row):
-                for cell in row:
-                    if cell.value:
-                        if isinstance(cell.value, (int, float)):
-                            # If its an int, increase its size
-                            dims[cell.column_letter] = max(
-                                (dims.get(cell.column_letter, 0), 1.8 * len(str(cell.value))))
-                        else:
-                            #If formula, ignore length
-                            if isinstance(cell.value, str) and "=" in cell.value:
-                                continue
-                            # If its a string, pad it slightly
-                            dims[cell.column_letter] = max((dims.get(cell.column_letter, 0), len(str(cell.value))))
-
-            print_debug("\nAuto Align column width for Sheet: %s" % (sheetName))
-            for col, value in dims.items():
-                print_debug("  Col %s width %d" % (col, value))
-                currSheet.column_dimensions[col].width = value
-
-            #########################
-            #  Custom Page Widths   #
-            #########################
-            if sheetName == "Summary":
-                currSheet.column_dimensions["A"].width = 2
-                currSheet.column_dimensions["B"].width = 16
-                currSheet.column_dimensions["C"].width = 56
-                currSheet.column_dimensions["D"].width = 16
-
-            if sheetName == "Beginning":
-                currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
-
-                numOfTitleCols = 0
-                for i in range(1, currSheet.max_column-2):
-                    currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
-                    numOfTitleCols += 1
-
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
-
-            if sheetName == "Beginning Detail":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = 12
-                currSheet.column_dimensions["C"].width = 40
-                currSheet.column_dimensions["D"].width = 18
-                currSheet.column_dimensions["E"].width = 18
-
-            if sheetName == "Additional":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["C"].width = 22
-                currSheet.column_dimensions["D"].width = 35
-                currSheet.column_dimensions["E"].width = 18
-
-            if sheetName == "Sch A":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["B"].width = 18
-                currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["D"].width = 30
-                currSheet.column_dimensions["E"].width = 15
-                currSheet.column_dimensions["F"].width = 15
-
-            if sheetName == "Sch B":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["C"].width = 10
-                currSheet.column_dimensions["D"].width = 23
-                currSheet.column_dimensions["E"].width = 14
-                currSheet.column_dimensions["F"].width = 14
-                currSheet.column_dimensions["G"].width = 14
-
-            if sheetName == "Sch E":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["C"].width = 10
-                currSheet.column_dimensions["D"].width = 23
-                currSheet.column_dimensions["E"].width = 14
-                currSheet.column_dimensions["F"].width = 14
-                currSheet.column_dimensions["G"].width = 14
-
-            if sheetName == "Sch C":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["D"].width = 20
-                currSheet.column_dimensions["E"].width = 30
-                currSheet.column_dimensions["G"].width = 16
-
-            if sheetName == "Sch D":
-                dataHeaderRow = 4
-                nameCol = self.getColNumByString(dataHeaderRow, "Name", owbSheetName=sheetName)
-                for i in range(1,nameCol):
-                    currSheet.column_dimensions["%c" % (get_column_letter(i))].width = COLUMN_WIDTH__EMPTY_ROW
-
-                #Get rest of column numbers
-                dateCol = nameCol + 1
-                memoCol = nameCol + 2
-                chkCol = nameCol + 3
-                principalCol = nameCol + 4
-                incomeCol = nameCol + 5
-
-                currSheet.column_dimensions["%c" % (get_column_letter(nameCol))].width = 18
-                currSheet.column_dimensions["%c" % (get_column_letter(dateCol))].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["%c" % (get_column_letter(memoCol))].width = 22
-                currSheet.column_dimensions["%c" % (get_column_letter(chkCol))].width = 6
-                currSheet.column_dimensions["%c" % (get_column_letter(principalCol))].width = 14
-                currSheet.column_dimensions["%c" % (get_column_letter(incomeCol))].width = 14
-
-            if sheetName == "Sch F":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["D"].width = 20
-                currSheet.column_dimensions["E"].width = 28
-                currSheet.column_dimensions["F"].width = 8
-                currSheet.column_dimensions["G"].width = 16
-
-            if sheetName == "Sch G":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["C"].width = 16
-                currSheet.column_dimensions["D"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["E"].width = 24
-                currSheet.column_dimensions["F"].width = 8
-                currSheet.column_dimensions["G"].width = 14
-                currSheet.column_dimensions["H"].width = 14
-
-            if sheetName == "Sch H":
-                currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
-
-                numOfTitleCols = 0
-                for i in range(1, currSheet.max_column-2):
-                    currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
-                    numOfTitleCols += 1
-
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
-
-            if sheetName == "Sch H Detail":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
-                currSheet.column_dimensions["B"].width = 12
-                currSheet.column_dimensions["C"].width = 40
-                currSheet.column_dimensions["D"].width = 18
-                currSheet.column_dimensions["E"].width = 18
-
-            if sheetName == "Market Value":
-                currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
-
-                numOfTitleCols = 0
-                for i in range(1, currSheet.max_column-2):
-                    currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
-                    numOfTitleCols += 1
-
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
-                currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
-
-            if sheetName == "Liability":
-                currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["B"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["C"].width = COLUMN_WIDTH__EMPTY_ROW
-                currSheet.column_dimensions["D"].width = 30
-                currSheet.column_dimensions["E"].width = COLUMN_WIDTH__DATE
-                currSheet.column_dimensions["F"].width = 10
-                currSheet.column_dimensions["G"].width = 18
-                currSheet.column_dimensions["H"].width = 18
-
-        zprint("  Finished Fixing column widths for all sheets.")
-
-        ##############################
-        #     Check Page Width       #
-        ##############################
-        zprint("\nChecking page widths..")
+    def saveConversionState(self):
+        #Remembers which input sheets produced this output, for the next incremental conversion
+        try:
+            self.previousConversion.save(self.owb_path, self.sheetStates)
+        except OSError as e:
+            log.warning("WARNING: Failed to save incremental conversion state: %s", str(e))
+
+    def finishMigrationTask(self, iwbSheetName, owbSheetName, migrator, migrationStatus):
+        if owbSheetName in self.sheetStates:
+            self.sheetStates[owbSheetName]["status"] = migrationStatus
+
+            #Reused sheets are not migrated again, their Summary totals come from the saved state
+            sectionTotals = dict()
+            for finishedSheetName in migrator.outputSheetNames():
+                if self.sectionTotals.get(finishedSheetName) is not None:
+                    sectionTotals[finishedSheetName] = list(self.sectionTotals.get(finishedSheetName))
+            self.sheetStates[owbSheetName]["totals"] = sectionTotals
+
+        #Stream finished output sheets to disk so they do not stay in memory until the end
+        if self.outputStreamer is not None:
+            for finishedSheetName in migrator.outputSheetNames():
+                with log.sheetContext(finishedSheetName):
+                    self.polishSheet(finishedSheetName)
+                    self.calculateSheet(finishedSheetName)
+                    self.streamSheet(finishedSheetName)
+
+        #Check if any sheet migrations failed
+        if migrationStatus != 0:
+            log.error("ERROR: Migration failed for sheet: %s (%s)\n", iwbSheetName, owbSheetName)
+            self.migrationFailedSheets.append(iwbSheetName)
+
+    @profiledStage
+    def finalPolishing(self):
+        #NOTE: Polishing is done on the in-memory output workbook, nothing is saved or reloaded here.
+        #      openpyxl does not shift column_dimensions on insert_cols/delete_cols, so widths are only
+        #      assigned here, after every migration is done moving columns around.
+        #      When streaming, sheets were already polished and written as their migration finished,
+        #      only the remaining ones (Summary) are handled here.
+        log.info("\nFixing column widths for all sheets..")
         for sheetName in self.owb.sheetnames:
-            currSheet = self.owb[sheetName]
-            totalWidth = 0
-            for i in range(1, currSheet.max_column+1):
-                totalWidth += currSheet.column_dimensions[get_column_letter(i)].width
-
-            if totalWidth < MIN_PAGE_WIDTH or totalWidth > MAX_PAGE_WIDTH:
-                zprint("  WARNING: Page width of sheet %18s is %d. Desired page width: %d < pageWidth < %d" % (sheetName, totalWidth, MIN_PAGE_WIDTH, MAX_PAGE_WIDTH))
+            with log.sheetContext(sheetName):
+                self.polishSheet(sheetName)
+                self.calculateSheet(sheetName)
+                if self.outputStreamer is not None:
+                    self.streamSheet(sheetName)
+        log.info("  Finished Fixing column widths for all sheets.")
+
+        if self.outputStreamer is not None:
+            orderedWorkbook = self.outputStreamer.workbook
+        else:
+            orderedWorkbook = self.owb
 
         #########################
         #    Fix Sheet Order    #
@@ -523,113 +2101,502 @@ class MigrateExcel:
         sheetOrder = ["Summary", "Beginning", "Beginning Detail", "Additional", "Sch A", "Sch B", "Sch C",
                       "Sch D", "Sch E", "Sch F", "Sch G", "Sch H", "Sch H Detail", "Market Value", "Liability"]
 
-        print_debug("\nFixing Sheet order..")
-        for i in range(0, len(self.owb._sheets)):
-            currentSheetName = self.owb._sheets[i].title
+        log.debug("\nFixing Sheet order..")
+        for i in range(0, len(orderedWorkbook._sheets)):
+            currentSheetName = orderedWorkbook._sheets[i].title
             desiredSheetName = sheetOrder[i]
             if currentSheetName != desiredSheetName:
                 #Find where desired sheet currently is and swap them
                 indexOfDesiredSheet = -1
-                for j in range(0, len(self.owb._sheets)):
-                    sheetName = self.owb._sheets[j].title
+                for j in range(0, len(orderedWorkbook._sheets)):
+                    sheetName = orderedWorkbook._sheets[j].title
                     if sheetName == desiredSheetName:
                         indexOfDesiredSheet = j
                         break
 
                 #Swap sheets if it was found
                 if indexOfDesiredSheet != -1:
-                    print_debug("  Swapping sheet indexes %d <--> %d" % (i, j))
-                    self.owb._sheets[i], self.owb._sheets[j] = self.owb._sheets[j], self.owb._sheets[i]
+                    log.debug("  Swapping sheet indexes %d <--> %d", i, j)
+                    orderedWorkbook._sheets[i], orderedWorkbook._sheets[j] = orderedWorkbook._sheets[j], orderedWorkbook._sheets[i]
 
-        zprint("\nDouble Checking that all %d sheets are in order.." % (len(self.owb._sheets)))
+        log.info("\nDouble Checking that all %d sheets are in order..", len(orderedWorkbook._sheets))
         numOutOfOrder = 0
-        for i in range(0, len(self.owb._sheets)):
-            currentSheetName = self.owb._sheets[i].title
+        for i in range(0, len(orderedWorkbook._sheets)):
+            currentSheetName = orderedWorkbook._sheets[i].title
             desiredSheetName = sheetOrder[i]
             if currentSheetName != desiredSheetName:
                 numOutOfOrder += 1
-                zprint("  WARNING: Sheet order does not match for sheet %s" % (currentSheetName))
-                zprint("    Current = %18s -- Desired = %s" % (currentSheetName, desiredSheetName))
+                log.warning("  WARNING: Sheet order does not match for sheet %s", currentSheetName)
+                log.info("    Current = %18s -- Desired = %s", currentSheetName, desiredSheetName)
         if numOutOfOrder == 0:
-            zprint("  All sheets are in order!")
+            log.info("  All sheets are in order!")
 
+    def polishSheet(self, sheetName):
+        #Polishes one finished output sheet: header alignment, column widths and the page width check
+        if sheetName not in self.owb.sheetnames:
+            return
+        currSheet = self.owb[sheetName]
 
-        #########################
-        #    Save new output    #
-        #########################
-        outputFilename = os.path.join(os.path.dirname(self.owb_path), "final_" + os.path.basename(self.owb_path))
+        #Drop empty cells left over from lookups/inserts so max_row/max_column match what gets saved
+        self.trimUnusedCells(sheetName)
 
-        while os.path.exists(outputFilename):
-            outputFilename = os.path.join(os.path.dirname(outputFilename), "final_" + os.path.basename(outputFilename))
-
-        zprint("\n### COMPLETED MIGRATION! ###")
-        zprint("   Final output sheet: %s" % (outputFilename))
-        try:
-            self.owb.save(filename=outputFilename)
+        ##############################
+        #    Fix Header Alignment    #
+        ##############################
+        if sheetName != "Summary":
+            if sheetName == "Sch D":
+                headerRow = 4
+            else:
+                headerRow = 5
 
+            for row in currSheet.iter_rows(min_row=headerRow, max_row=headerRow):
+                for cell in row:
+                    cell.alignment = ALIGNMENT__HORIZONAL_CENTER
 
-        except:
-            zprint("ERROR: Failed to save final output file (%s). Most likey because output file already exists" % (outputFilename))
-            return -1
-        else:
-            print_debug("Removed intermediary file: %s" % (self.owb_path))
-            os.remove(self.owb_path)
+        ##############################
+        #      Fix Column Widths     #
+        ##############################
+        ##################################################
+        #  Auto set width of each column based on data   #
+        ##################################################
+        self.autoAlignColumnWidth(sheetName)
 
-            directoryOfOutputFilename = os.path.dirname(outputFilename)
-            os.startfile(directoryOfOutputFilename)
+        #########################
+        #  Custom Page Widths   #
+        #########################
+        if sheetName == "Summary":
+            currSheet.column_dimensions["A"].width = 2
+            currSheet.column_dimensions["B"].width = 16
+            currSheet.column_dimensions["C"].width = 56
+            currSheet.column_dimensions["D"].width = 16
+
+        if sheetName == "Beginning":
+            currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
+
+            numOfTitleCols = 0
+            for i in range(1, currSheet.max_column-2):
+                currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
+                numOfTitleCols += 1
+
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
+
+        if sheetName == "Beginning Detail":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = 12
+            currSheet.column_dimensions["C"].width = 40
+            currSheet.column_dimensions["D"].width = 18
+            currSheet.column_dimensions["E"].width = 18
+
+        if sheetName == "Additional":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["C"].width = 22
+            currSheet.column_dimensions["D"].width = 35
+            currSheet.column_dimensions["E"].width = 18
+
+        if sheetName == "Sch A":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["B"].width = 18
+            currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["D"].width = 30
+            currSheet.column_dimensions["E"].width = 15
+            currSheet.column_dimensions["F"].width = 15
+
+        if sheetName == "Sch B":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["C"].width = 10
+            currSheet.column_dimensions["D"].width = 23
+            currSheet.column_dimensions["E"].width = 14
+            currSheet.column_dimensions["F"].width = 14
+            currSheet.column_dimensions["G"].width = 14
+
+        if sheetName == "Sch E":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["C"].width = 10
+            currSheet.column_dimensions["D"].width = 23
+            currSheet.column_dimensions["E"].width = 14
+            currSheet.column_dimensions["F"].width = 14
+            currSheet.column_dimensions["G"].width = 14
+
+        if sheetName == "Sch C":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["D"].width = 20
+            currSheet.column_dimensions["E"].width = 30
+            currSheet.column_dimensions["G"].width = 16
+
+        if sheetName == "Sch D":
+            dataHeaderRow = 4
+            nameCol = self.getColNumByString(dataHeaderRow, "Name", owbSheetName=sheetName)
+            for i in range(1,nameCol):
+                currSheet.column_dimensions["%c" % (get_column_letter(i))].width = COLUMN_WIDTH__EMPTY_ROW
+
+            #Get rest of column numbers
+            dateCol = nameCol + 1
+            memoCol = nameCol + 2
+            chkCol = nameCol + 3
+            principalCol = nameCol + 4
+            incomeCol = nameCol + 5
+
+            currSheet.column_dimensions["%c" % (get_column_letter(nameCol))].width = 18
+            currSheet.column_dimensions["%c" % (get_column_letter(dateCol))].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["%c" % (get_column_letter(memoCol))].width = 22
+            currSheet.column_dimensions["%c" % (get_column_letter(chkCol))].width = 6
+            currSheet.column_dimensions["%c" % (get_column_letter(principalCol))].width = 14
+            currSheet.column_dimensions["%c" % (get_column_letter(incomeCol))].width = 14
+
+        if sheetName == "Sch F":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["C"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["D"].width = 20
+            currSheet.column_dimensions["E"].width = 28
+            currSheet.column_dimensions["F"].width = 8
+            currSheet.column_dimensions["G"].width = 16
+
+        if sheetName == "Sch G":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["C"].width = 16
+            currSheet.column_dimensions["D"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["E"].width = 24
+            currSheet.column_dimensions["F"].width = 8
+            currSheet.column_dimensions["G"].width = 14
+            currSheet.column_dimensions["H"].width = 14
+
+        if sheetName == "Sch H":
+            currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
+
+            numOfTitleCols = 0
+            for i in range(1, currSheet.max_column-2):
+                currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
+                numOfTitleCols += 1
+
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
+
+        if sheetName == "Sch H Detail":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__ROW_TITLE_SMALL
+            currSheet.column_dimensions["B"].width = 12
+            currSheet.column_dimensions["C"].width = 40
+            currSheet.column_dimensions["D"].width = 18
+            currSheet.column_dimensions["E"].width = 18
+
+        if sheetName == "Market Value":
+            currSheet["A5"].alignment = ALIGNMENT__HORIZONAL_LEFT
+
+            numOfTitleCols = 0
+            for i in range(1, currSheet.max_column-2):
+                currSheet.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH__ROW_TITLE
+                numOfTitleCols += 1
+
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-2))].width = IDEAL_PAGE_WIDTH - ((numOfTitleCols * COLUMN_WIDTH__ROW_TITLE) + (2 * COLUMN_WIDTH__CURRENCY))
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column-1))].width = COLUMN_WIDTH__CURRENCY
+            currSheet.column_dimensions["%c" % (get_column_letter(currSheet.max_column))].width = COLUMN_WIDTH__CURRENCY
+
+        if sheetName == "Liability":
+            currSheet.column_dimensions["A"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["B"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["C"].width = COLUMN_WIDTH__EMPTY_ROW
+            currSheet.column_dimensions["D"].width = 30
+            currSheet.column_dimensions["E"].width = COLUMN_WIDTH__DATE
+            currSheet.column_dimensions["F"].width = 10
+            currSheet.column_dimensions["G"].width = 18
+            currSheet.column_dimensions["H"].width = 18
 
-            #Open window printing that the conversion is complete
-            #window = tkinter.Tk()
-            #window.wm_withdraw()
-            #tkinter.messagebox.showinfo(parent=window, title="Conversion Complete!", message="The conversion is complete. Final file can be found here:\n%s" % (outputFilename))
+        ##############################
+        #     Check Page Width       #
+        ##############################
+        totalWidth = 0
+        for i in range(1, currSheet.max_column+1):
+            totalWidth += currSheet.column_dimensions[get_column_letter(i)].width
 
+        if totalWidth < MIN_PAGE_WIDTH or totalWidth > MAX_PAGE_WIDTH:
+            log.warning("  WARNING: Page width of sheet %18s is %d. Desired page width: %d < pageWidth < %d", sheetName, totalWidth, MIN_PAGE_WIDTH, MAX_PAGE_WIDTH)
 
 
     ################################
     #     Workbook Functions       #
     ################################
+    @profiledStage
     def openIWB_dataOnly(self):
-        zprint("Opening input workbook as data only: %s" % (self.iwb_path))
-        self.iwb_do = load_workbook(self.iwb_path, data_only=True)
-
+        #NOTE: The input workbook is only parsed once (openIWB). Cached values of formula cells
+        #      are pulled from the file on demand, only for the sheets that ask for them.
+        log.info("Opening input workbook cached values: %s", self.iwb_path)
+        if self.iwb is None:
+            self.openIWB()
+        self.iwb_do = CachedValueReader(self.iwb_path, self.iwb)
+
+    @profiledStage
     def openIWB(self):
-        zprint("Opening input workbook: %s" % (self.iwb_path))
-        self.iwb = load_workbook(self.iwb_path)
+        #Stream the input workbook (read-only, values only) into a compact per-sheet store.
+        # Sheets whose title does not map to a migrator are only read up to their title rows.
+        log.info("Opening input workbook: %s", self.iwb_path)
+        self.iwb = InputWorkbook(self.iwb_path, self.fastReader, self.isMappedSheet)
+
+    def isMappedSheet(self, probe):
+        #Only input sheets with a known title are loaded past their first rows
+        return probe.getValue(2, 1) in INPUT_TITLE_TO_SHEET_NAME
 
     def openOWB(self):
+        #Sheets are always built in a regular workbook. When streaming, each finished sheet is handed
+        # to the write-only backend and dropped from it.
         self.owb = Workbook()
-
-    def writeOWB(self):
-        newOutPath = self.owb_path
-        oldOutPath = newOutPath
-
+        self.styles = StyleRegistry(self.owb)
+        if self.streamOutput:
+            self.outputStreamer = StreamingOutputWriter()
+
+    def calculateSheet(self, sheetName):
+        #Calculates the formulas of a finished output sheet and checks its total against the published one
+        if sheetName not in self.owb.sheetnames:
+            return
+        values = SheetFormulaEvaluator(self.owb[sheetName], self.linkedValues.get(sheetName)).calculate()
+        for cell in sorted(cell for cell, value in values.items() if not math.isfinite(value)):
+            log.warning("  WARNING: %s formula in %s calculates to %s, it is saved without a value.", sheetName, cell, values.pop(cell))
+        self.calculatedValues[sheetName] = values
+
+        #The Summary page links to the total cell, it has to show the published total
+        sectionTotal = self.sectionTotals.get(sheetName)
+        if sectionTotal is not None:
+            total, totalCell = sectionTotal
+            cellValue = self.owb[sheetName][totalCell].value
+            if not isNumberOrFormula(cellValue):
+                log.warning("  WARNING: %s total cell %s holds %r instead of the total %s.", sheetName, totalCell, cellValue, total)
+            elif isinstance(cellValue, (int, float)) and abs(cellValue - total) > 0.00001:
+                log.warning("  WARNING: %s total cell %s holds %s, but the sheet adds up to %s.", sheetName, totalCell, cellValue, total)
+            elif values.get(totalCell) is not None and abs(values[totalCell] - total) > 0.00001:
+                log.warning("  WARNING: %s total formula in %s gives %s, but the sheet adds up to %s.", sheetName, totalCell, values[totalCell], total)
+
+    def streamSheet(self, sheetName):
+        #Writes a polished output sheet to the streaming backend and frees it from the output workbook
+        if sheetName not in self.owb.sheetnames:
+            return
+        currSheet = self.owb[sheetName]
+        self.outputStreamer.writeSheet(currSheet)
+        self.invalidateLabelIndex(currSheet)
+        self.owb.remove(currSheet)
+
+    @profiledStage
+    def writeOWB(self, openOutputFolder=True):
         # Make sure output file name is unique, and do not overwrite old one.
-        while os.path.exists(newOutPath):
-            oldOutPath = newOutPath
-            newOutPath = os.path.join(os.path.dirname(newOutPath), "new_" + os.path.basename(newOutPath))
-            #zprint("WARNING: %s already exists. Renaming output file to: %s" % (oldOutPath, newOutPath))
+        self.owb_path = uniqueOutputPath(self.owb_path)
+
+        log.info("\n### COMPLETED MIGRATION! ###")
+        log.info("   Final output sheet: %s", self.owb_path)
 
-        self.owb_path = newOutPath
-        # Write workbook to new excel doc's unique name
+        # Write polished workbook to new excel doc's unique name. This is the only save.
         try:
-            self.owb.save(filename=self.owb_path)
-            print_debug("\nMigrated excel document created (no column width fixing yet): %s" % (self.owb_path))
+            if self.outputStreamer is not None:
+                self.outputStreamer.save(self.owb_path)
+            else:
+                self.owb.save(filename=self.owb_path)
         except:
-            zprint("ERROR: Failed to write to output workbook: %s" % (self.owb_path))
-            zprint("       -- Most likely due to workbook being open already.")
+            log.error("ERROR: Failed to write to output workbook: %s", self.owb_path)
+            log.info("       -- Most likely due to workbook being open already.")
+            return -1
+
+        #The saved formulas get the values calculated for them, the workbook is complete without this
+        try:
+            writeCachedFormulaValues(self.owb_path, self.calculatedValues)
+        except (OSError, zipfile.BadZipFile) as e:
+            log.warning("WARNING: Failed to write calculated formula values: %s", str(e))
+
+        if self.previousConversion is not None:
+            self.saveConversionState()
+
+        if openOutputFolder:
+            directoryOfOutputFilename = os.path.dirname(self.owb_path)
+            os.startfile(directoryOfOutputFilename)
+
+        #Open window printing that the conversion is complete
+        #window = tkinter.Tk()
+        #window.wm_withdraw()
+        #tkinter.messagebox.showinfo(parent=window, title="Conversion Complete!", message="The conversion is complete. Final file can be found here:\n%s" % (self.owb_path))
 
+        return 0
+
+    @profiledStage
+    def writeExports(self, exportFormats):
+        #Writes the schedule tables next to the output workbook in every export format, returns the paths written
+        basePath = os.path.splitext(self.owb_path)[0]
+        tables = list(self.scheduleTables.values())
+        log.info("\nExporting %d schedules (%s)..", len(tables), ", ".join(exportFormats))
+
+        paths = list()
+        for exportFormat in exportFormats:
+            try:
+                paths.extend(EXPORT_SINKS[exportFormat](tables, basePath))
+            except OSError as e:
+                log.error("ERROR: Failed to export %s: %s", exportFormat, str(e))
+        return paths
+
+
+    def countStageCells(self, stageName, sheetName=None):
+        #Cells a stage produced: the migrated sheet, the parsed input, or everything in the output workbook
+        if stageName.startswith("migrate"):
+            if self.owb is not None and sheetName in self.owb.sheetnames:
+                return len(self.owb[sheetName]._cells)
+            return 0
+
+        if stageName in ("openIWB", "openIWB_dataOnly", "extractSheetNameMappings"):
+            if self.iwb is None:
+                return 0
+            return self.iwb.cellCount
+
+        if self.owb is None:
+            return 0
+        return sum(len(sheet._cells) for sheet in self.owb.worksheets)
+
+    def writeProfileReport(self):
+        #JSON report is written next to the output workbook
+        reportPath = os.path.splitext(self.owb_path)[0] + "_profile.json"
+        self.profiler.stop()
+        self.profiler.writeReport(reportPath, self.iwb_path, self.owb_path)
+        log.info("   Profile report: %s", reportPath)
+        return reportPath
 
     ################################
     #       Helper Functions       #
     ################################
-    def writeCell(self, sheet, cell, value, font=Font(), alignment=Alignment(), border=Border()):
-        sheet[cell] = value
-        sheet[cell].font = font
-        sheet[cell].alignment = alignment
-        sheet[cell].border = border
+    def writeCell(self, sheet, cell, value, style=STYLE__PLAIN):
+        currCell = sheet[cell]
+        self.setCellValue(currCell, value)
+        self.styles.apply(currCell, style)
+
+    def setCellValue(self, cell, value):
+        #Every value written to an output sheet goes through here to keep its column widths and label index current
+        oldValue = cell.value
+        self.widthTracker(cell.parent.title).update(cell.row, cell.column, oldValue, value)
+        cell.value = value
+        if oldValue != cell.value and (isinstance(oldValue, str) or isinstance(cell.value, str)):
+            self.updateLabelIndex(cell.parent, (cell.row, cell.column), oldValue, cell.value)
+
+    def writeCellAt(self, sheet, row, col, value):
+        cell = sheet.cell(row=row, column=col)
+        self.setCellValue(cell, value)
+        return cell
+
+    def widthTracker(self, sheetName):
+        tracker = self.columnWidthTrackers.get(sheetName)
+        if tracker is None:
+            tracker = self.columnWidthTrackers[sheetName] = ColumnWidthTracker()
+        return tracker
+
+    def styleCell(self, sheet, cell, style):
+        self.styles.apply(sheet[cell], style)
+
+    def formatColumnRange(self, sheet, columns, minRow, maxRow, style):
+        #Applies a number format/alignment style to rows minRow..maxRow of the given columns. Only cells
+        # holding a value are styled and no empty cells get created. The columns also get the style as their
+        # default, so values typed into the blank cells later on are formatted the same way.
+        for column in columns:
+            self.styles.apply(sheet.column_dimensions[column], style)
+
+            colNum = column_index_from_string(column)
+            for row in range(minRow, maxRow+1):
+                cell = sheet._cells.get((row, colNum))
+                if cell is not None and cell.value is not None:
+                    self.styles.applyFormat(cell, style)
+
+    def sectionTotalRows(self, sheet, column, minRow, maxRow):
+        #Rows minRow..maxRow of a column whose numbers add up to the section total. Rows labelled "Total ..."
+        # left of the column are sub-totals of the rows above and are not counted again, formulas and text are skipped.
+        colNum = column_index_from_string(column)
+        rows = list()
+        for row in range(minRow, maxRow+1):
+            cell = sheet._cells.get((row, colNum))
+            if cell is None or isinstance(cell.value, bool) or not isinstance(cell.value, (int, float)):
+                continue
+
+            isSubTotalRow = False
+            for labelCol in range(1, colNum):
+                labelCell = sheet._cells.get((row, labelCol))
+                if labelCell is not None and isinstance(labelCell.value, str) and labelCell.value.lower().startswith("total"):
+                    isSubTotalRow = True
+                    break
+            if not isSubTotalRow:
+                rows.append(row)
+        return rows
+
+    def sumColumnValues(self, sheet, column, minRow, maxRow):
+        #Sum of the numbers in rows minRow..maxRow of a column (see sectionTotalRows), rounded like the ROUND(SUM(),5) formulas
+        colNum = column_index_from_string(column)
+        return round(sum(sheet._cells[(row, colNum)].value for row in self.sectionTotalRows(sheet, column, minRow, maxRow)), 5)
+
+    def writeSumFormula(self, sheet, column, totalRow, minRow, maxRow, style):
+        #Writes a ROUND(SUM()) of the rows of minRow..maxRow counted by sectionTotalRows into the cell of a column in totalRow
+        rows = self.sectionTotalRows(sheet, column, minRow, maxRow)
+
+        #Consecutive rows become one range
+        ranges = list()
+        for row in rows:
+            if ranges and ranges[-1][1] == row-1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        if ranges:
+            formula = "=ROUND(SUM(%s),5)" % (",".join("%s%d:%s%d" % (column, first, column, last) if last > first else "%s%d" % (column, first)
+                                                      for first, last in ranges))
+        else:
+            formula = 0
+        self.writeCell(sheet, "%s%d" % (column, totalRow), formula, style)
+
+    def writeSubTotals(self, owbSheetName, valueColumn, lastLabelCol, minRow, maxRow):
+        #Every "Total X" label in the label columns of rows minRow..maxRow gets the sum of its section in the value column,
+        # the section being the rows below the closest "X" heading above it in the same label column
+        owbCurrSheet = self.owb[owbSheetName]
+        for labelCol in range(1, lastLabelCol+1):
+            for totalRow in range(minRow, maxRow+1):
+                labelCell = owbCurrSheet._cells.get((totalRow, labelCol))
+                if labelCell is None or not isinstance(labelCell.value, str) or not labelCell.value.lower().startswith("total"):
+                    continue
+
+                sectionName = labelCell.value[len("total"):].strip().lower()
+                headingRow = totalRow - 1
+                while headingRow >= minRow:
+                    headingCell = owbCurrSheet._cells.get((headingRow, labelCol))
+                    if headingCell is not None and isinstance(headingCell.value, str) and headingCell.value.strip().lower() == sectionName:
+                        break
+                    headingRow -= 1
+
+                if headingRow < minRow:
+                    log.warning("  WARNING: No heading found for \"%s\" on %s, its total is left as FIX_ME.", labelCell.value, owbSheetName)
+                    continue
+                self.writeSumFormula(owbCurrSheet, valueColumn, totalRow, headingRow+1, totalRow-1, STYLE__BOLD_SUBTOTAL)
+
+    def writeSectionTotal(self, owbSheetName, column, totalRow, minRow, maxRow):
+        #Publishes the total of rows minRow..maxRow of a column for the Summary page with the cell in totalRow as its
+        # link. When that cell has no number or formula yet (empty or FIX_ME) it gets a ROUND(SUM()) of the counted rows.
+        owbCurrSheet = self.owb[owbSheetName]
+        totalCell = "%s%d" % (column, totalRow)
+        rows = self.sectionTotalRows(owbCurrSheet, column, minRow, maxRow)
+        colNum = column_index_from_string(column)
+
+        cell = owbCurrSheet._cells.get((totalRow, colNum))
+        if cell is None or not isNumberOrFormula(cell.value):
+            self.writeSumFormula(owbCurrSheet, column, totalRow, minRow, maxRow, STYLE__FINAL_SUM)
+
+        self.publishSectionTotal(owbSheetName, round(sum(owbCurrSheet._cells[(row, colNum)].value for row in rows), 5), totalCell)
+
+    def publishSectionTotal(self, owbSheetName, total, cell):
+        #Total of this sheet for the Summary page, cell is where the sheet shows it
+        log.debug("  %s section total: %s (cell %s)", owbSheetName, total, cell)
+        self.sectionTotals.publish(owbSheetName, total, cell)
+
+    def publishScheduleTable(self, owbSheetName, headerRow, firstCol=1):
+        #Schedule table of the migrated sheet for the export sinks, read from the cells just written (see readScheduleTable)
+        if self.exportTables:
+            self.scheduleTables[owbSheetName] = readScheduleTable(owbSheetName, self.owb[owbSheetName], headerRow, firstCol)
+            log.debug("  %s schedule table: %d rows", owbSheetName, len(self.scheduleTables[owbSheetName].rows))
 
     def migratePageTitle(self, iwbSheetName, owbSheetName, titleColWidth, rowCount=3):
-        print_debug("Migrating title for sheet: %10s to %s" % (iwbSheetName, owbSheetName))
+        log.debug("Migrating title for sheet: %10s to %s", iwbSheetName, owbSheetName)
         iwbCurrSheet = self.iwb[iwbSheetName]
         owbCurrSheet = self.owb[owbSheetName]
 
@@ -640,7 +2607,7 @@ class MigrateExcel:
 
         #Merge first %c columns of first three rows
         for i in range(1,rowCount+1):
-            print_debug("  Column widths to merge for %s: A%d:%c%d" % (owbSheetName, i, titleColWidth, i))
+            log.debug("  Column widths to merge for %s: A%d:%c%d", owbSheetName, i, titleColWidth, i)
             owbCurrSheet.merge_cells("A%d:%c%d" % (i, titleColWidth, i))
 
         #######################
@@ -648,59 +2615,83 @@ class MigrateExcel:
         #######################
         for i in range(1, rowCount+1):
             if i == 1:
-                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value,
-                               font=Font(bold=True, size=12), alignment=Alignment(horizontal="center"))
+                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value, STYLE__TITLE_1)
             if i == 2:
-                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value,
-                               font=Font(bold=True, size=14), alignment=Alignment(horizontal="center"))
+                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value, STYLE__TITLE_2)
             if i == 3:
-                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value,
-                               font=Font(bold=True, size=11), alignment=Alignment(horizontal="center"))
+                self.writeCell(owbCurrSheet, "A%d" % (i), iwbCurrSheet['A%d' % (i)].value, STYLE__TITLE_3)
 
     def getRowRangeGeneric(self, iwbSheetName, col_letter, startString, endString):
         iwbCurrSheet = self.iwb[iwbSheetName]
 
-        startRow = -1
-        endRow = -1
         #Find Start/End of Current Assets
-        for i in range(1, iwbCurrSheet.max_row+1):
-            colData = iwbCurrSheet["%c%d" % (col_letter, i)].value
-            if colData is None:
-                continue
-
-            if colData.lower() == startString.lower():
-                startRow = i
-            if colData.lower() == endString.lower():
-                endRow = i
+        startRow = self.findLastLabelRow(iwbCurrSheet, column_index_from_string(col_letter), startString)
+        endRow = self.findLastLabelRow(iwbCurrSheet, column_index_from_string(col_letter), endString)
 
         if startRow == -1 or endRow == -1:
-            zprint("ERORR: (getRowRangeGeneric) Unable to find start or end index for startString: %s, endString: %s on input page: %s (%s)" %
-                  (startString, endString, iwbSheetName, self.iwbSheetNameToActualName[iwbSheetName]))
+            log.error("ERORR: (getRowRangeGeneric) Unable to find start or end index for startString: %s, endString: %s on input page: %s (%s)",
+                      startString, endString, iwbSheetName, self.iwbSheetNameToActualName[iwbSheetName])
             return -1, -1
         else:
             return startRow, endRow
-            print_debug("(getRowRangeGeneric) startString: %s, endString %s,    startRow: %s  -- endRow: %s" % (startString, endString, startRow, endRow))
+            log.debug("(getRowRangeGeneric) startString: %s, endString %s,    startRow: %s  -- endRow: %s", startString, endString, startRow, endRow)
 
-    def findEmptyCols(self, owbSheetName):
+    def trimUnusedCells(self, owbSheetName):
         owbCurrSheet = self.owb[owbSheetName]
-        emptyCols = list()
 
-        colNum = 2
-        for col in owbCurrSheet.iter_cols(min_col=colNum):
-            isEmptyCol = True
-            for cell in col:
-                if cell.value is not None:
-                    isEmptyCol = False
-                    break
-            if isEmptyCol:
-                emptyCols.append(colNum)
+        #Cells inside merged ranges are recreated when the file is opened, keep them
+        mergedCells = set()
+        for mergedRange in owbCurrSheet.merged_cells.ranges:
+            for row in range(mergedRange.min_row, mergedRange.max_row+1):
+                for col in range(mergedRange.min_col, mergedRange.max_col+1):
+                    mergedCells.add((row, col))
 
-            colNum += 1
+        #Empty, unstyled cells are never written by openpyxl, so they only inflate max_row/max_column
+        unusedCells = list()
+        for position, cell in owbCurrSheet._cells.items():
+            if cell.value is None and not cell.has_style and position not in mergedCells:
+                if getattr(cell, "comment", None) is None and getattr(cell, "hyperlink", None) is None:
+                    unusedCells.append(position)
 
-        #Reverse list to aid in deletion
-        emptyCols = emptyCols[::-1]
+        for position in unusedCells:
+            del owbCurrSheet._cells[position]
 
-        return emptyCols
+        log.debug("  Trimmed %d unused cells from sheet %s", len(unusedCells), owbSheetName)
+
+    def planLayout(self, iwbSheetName, startRow, endRow):
+        #Read the input rows once and start with every cell at its input coordinates
+        iwbCurrSheet = self.iwb[iwbSheetName]
+        maxCol = iwbCurrSheet.max_column
+
+        rowValues = dict()
+        inputRow = startRow
+        for values in iwbCurrSheet.iter_rows(min_row=startRow, max_row=endRow, max_col=maxCol, values_only=True):
+            rowValues[inputRow] = values
+            inputRow += 1
+
+        return SheetLayout(rowValues, maxCol)
+
+    def emitLayout(self, owbSheetName, layout, keepFormulas=False):
+        #Write every non-empty input cell straight to its final output coordinates. Kept formulas have their
+        # references moved along with the cells they point to.
+        owbCurrSheet = self.owb[owbSheetName]
+        rowReferenceMap, colReferenceMap = layout.referenceMaps()
+
+        for inputRow, outputRow in layout.rowMap.items():
+            values = layout.rowValues[inputRow]
+            for inputCol, outputCol in layout.colMap.items():
+                value = values[inputCol-1]
+                if value is None:
+                    continue
+
+                if isinstance(value, str) and "=" in value and not keepFormulas:
+                    cell = self.writeCellAt(owbCurrSheet, outputRow, outputCol, "FIX_FORMULA")
+                    self.styles.apply(cell, STYLE__FIX_ME)
+                elif isinstance(value, str) and value.startswith("="):
+                    self.writeCellAt(owbCurrSheet, outputRow, outputCol,
+                                     self.formulaRewriter.relocate(value, rowReferenceMap, colReferenceMap))
+                else:
+                    self.writeCellAt(owbCurrSheet, outputRow, outputCol, value)
 
     def getRowNumByString(self, col_letter, searchValue, owbSheetName=None, iwbSheetName=None):
         if owbSheetName is not None and iwbSheetName is None:
@@ -708,23 +2699,13 @@ class MigrateExcel:
         elif owbSheetName is None and iwbSheetName is not None:
             currSheet = self.iwb[iwbSheetName]
         else:
-            zprint("ERROR: Invalid use of this function!")
+            log.error("ERROR: Invalid use of this function!")
             return -1
 
-        foundRow = -1
-        for i in range(1, currSheet.max_row+1):
-            colData = currSheet["%c%d" % (col_letter, i)].value
-            if colData is None:
-                continue
-
-            try:
-                if colData.lower() == searchValue.lower():
-                    foundRow = i
-            except:
-                pass
+        foundRow = self.findLastLabelRow(currSheet, column_index_from_string(col_letter), searchValue)
 
         if foundRow == -1:
-            zprint("  ERROR: Failed to find desired string: %s" % (searchValue))
+            log.error("  ERROR: Failed to find desired string: %s", searchValue)
             return -1
         else:
             return foundRow
@@ -735,84 +2716,124 @@ class MigrateExcel:
         elif owbSheetName is None and iwbSheetName is not None:
             currSheet = self.iwb[iwbSheetName]
         else:
-            zprint("ERROR: Invalid use of this function!")
+            log.error("ERROR: Invalid use of this function!")
             return -1
 
-        foundCol = -1
-        for row in currSheet.iter_rows(min_row=row_num, max_row=row_num):
-            colNum = 1
-            for cell in row:
-                #Skip empty cells
-                if cell.value is None:
-                    colNum += 1
-                    continue
-
-                #String match the value to the desired string
-                try:
-                    if searchValue.lower() == cell.value.lower():
-                        foundCol = colNum
-                except:
-                    pass
-
-                colNum += 1
+        foundCol = self.findLastLabelCol(currSheet, row_num, searchValue)
 
         if foundCol == -1:
-            zprint("  ERROR: Failed to find desired string: %s" % (searchValue))
+            log.error("  ERROR: Failed to find desired string: %s", searchValue)
             return -1
         else:
             return foundCol
 
+    ################################
+    #         Label Index          #
+    ################################
+    def getLabelIndex(self, currSheet):
+        #Build (once per sheet) a lower-cased text -> [(row, col), ...] index of every text cell.
+        # Formulas are skipped, they never match a label.
+        labelIndex = self.labelIndexes.get(currSheet)
+        if labelIndex is None:
+            if isinstance(currSheet, InputSheet):
+                sheetValues = currSheet.iterValues()
+            else:
+                sheetValues = ((position, cell.value) for position, cell in currSheet._cells.items())
+
+            labelIndex = dict()
+            for position, value in sheetValues:
+                if isLabel(value):
+                    labelIndex.setdefault(value.lower(), set()).add(position)
+
+            self.labelIndexes[currSheet] = labelIndex
+
+        return labelIndex
+
+    def updateLabelIndex(self, sheet, position, oldValue, newValue):
+        #Moves one cell's entry when its text changes (see setCellValue), an index not built yet is built later
+        labelIndex = self.labelIndexes.get(sheet)
+        if labelIndex is None:
+            return
+        if isLabel(oldValue):
+            positions = labelIndex.get(oldValue.lower())
+            if positions is not None:
+                positions.discard(position)
+        if isLabel(newValue):
+            labelIndex.setdefault(newValue.lower(), set()).add(position)
+
+    def invalidateLabelIndex(self, sheet):
+        #Must be called when cells of an output sheet change without setCellValue (moved or removed with their sheet)
+        self.labelIndexes.pop(sheet, None)
+
+    def findLastLabelRow(self, currSheet, colNum, searchValue):
+        #Last row in column colNum whose text matches searchValue (case insensitive), or -1
+        foundRow = -1
+        for row, col in self.getLabelIndex(currSheet).get(searchValue.lower(), ()):
+            if col == colNum and row > foundRow:
+                foundRow = row
+        return foundRow
+
+    def findLastLabelCol(self, currSheet, rowNum, searchValue):
+        #Last column in row rowNum whose text matches searchValue (case insensitive), or -1
+        foundCol = -1
+        for row, col in self.getLabelIndex(currSheet).get(searchValue.lower(), ()):
+            if row == rowNum and col > foundCol:
+                foundCol = col
+        return foundCol
+
     def dumbCopy(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb[owbSheetName]
         #Get sheet from input workbook
         iwbCurrSheet = self.iwb[iwbSheetName]
 
-        for row in iwbCurrSheet.iter_rows(min_row=4):
-            for cell in row:
-                cellID = "%c%d" % (cell.column_letter, cell.row)
-                #zprint("cellID: %s" % (cellID))
-                #zprint("iwbValue: %s" % (cell.value))
-                owbCurrSheet[cellID] = cell.value
+        rowNum = 4
+        for values in iwbCurrSheet.iter_rows(min_row=4, values_only=True):
+            colNum = 1
+            for value in values:
+                if value is not None:
+                    self.writeCellAt(owbCurrSheet, rowNum, colNum, value)
+                colNum += 1
+            rowNum += 1
 
-    def dumbCopyWithRange(self, iwbSheetName, owbSheetName, startRow, endRow, keepFormulas=False):
+    def dumbCopyWithRange(self, iwbSheetName, owbSheetName, startRow, endRow, keepFormulas=False, outputStartRow=None):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb[owbSheetName]
         #Get sheet from input workbook
         iwbCurrSheet = self.iwb[iwbSheetName]
 
-        for row in iwbCurrSheet.iter_rows(min_row=startRow, max_row=endRow):
-            for cell in row:
-                cellID = "%c%d" % (cell.column_letter, cell.row)
-                #zprint("cellID: %s" % (cellID))
-                #zprint("iwbValue: %s" % (cell.value))
-                value = cell.value
-                if isinstance(value, str) and "=" in value:
-                    if keepFormulas:
-                        owbCurrSheet[cellID].value = value
+        #Rows are copied to the same place unless told otherwise, kept formulas follow them
+        if outputStartRow is None:
+            outputStartRow = startRow
+        rowReferenceMap = ReferenceMap({row: row - startRow + outputStartRow for row in range(startRow, endRow+1)}, startRow, endRow)
+        colReferenceMap = ReferenceMap({col: col for col in range(1, iwbCurrSheet.max_column+1)}, 1, iwbCurrSheet.max_column)
+
+        rowNum = outputStartRow
+        for values in iwbCurrSheet.iter_rows(min_row=startRow, max_row=endRow, values_only=True):
+            colNum = 1
+            for value in values:
+                if value is None:
+                    pass
+                elif isinstance(value, str) and "=" in value:
+                    if keepFormulas and value.startswith("="):
+                        self.writeCellAt(owbCurrSheet, rowNum, colNum,
+                                         self.formulaRewriter.relocate(value, rowReferenceMap, colReferenceMap))
+                    elif keepFormulas:
+                        self.writeCellAt(owbCurrSheet, rowNum, colNum, value)
                     else:
-                        owbCurrSheet[cellID].value = "FIX_FORMULA"
-                        owbCurrSheet[cellID].font = Font(color='00FF0000')
+                        cell = self.writeCellAt(owbCurrSheet, rowNum, colNum, "FIX_FORMULA")
+                        self.styles.apply(cell, STYLE__FIX_ME)
                 else:
-                    owbCurrSheet[cellID].value = value
+                    self.writeCellAt(owbCurrSheet, rowNum, colNum, value)
+                colNum += 1
+            rowNum += 1
 
     def autoAlignColumnWidth(self, owbSheetName):
         owbCurrSheet = self.owb[owbSheetName]
-        #Auto set width of each column based on data
-        dims = {}
-        for row in owbCurrSheet.iter_rows(min_row=4, max_row=owbCurrSheet.max_row):
-            for cell in row:
-                if cell.value:
-                    if isinstance(cell.value, (int, float)):
-                        #If its an int, increase its size
-                        dims[cell.column_letter] = max((dims.get(cell.column_letter, 0), 1.8*len(str(cell.value))))
-                    else:
-                        #If its a string, pad it slightly
-                        dims[cell.column_letter] = max((dims.get(cell.column_letter, 0), 5+len(str(cell.value))))
-
-        print_debug("\nAuto Align column width for Sheet: %s" % (owbSheetName))
-        for col, value in dims.items():
-            print_debug("  Col %s width %d" % (col, value))
+        #Auto set width of each column based on data, the widths were tracked while the sheet was written
+        log.debug("\nAuto Align column width for Sheet: %s", owbSheetName)
+        for col, value in self.widthTracker(owbSheetName).widths().items():
+            log.debug("  Col %s width %d", col, value)
             owbCurrSheet.column_dimensions[col].width = value
 
     def getRowNumsForSubTotalRows(self, owbSheetName, colNumber, headerRowNum):
@@ -840,14 +2861,15 @@ class MigrateExcel:
                         #zprint("  Total: %s -- row Number: %d" % (title, rowNum))
                         listOfTotalRows.append((rowNum, title))
                     else:
-                        print_debug("Skipping title %s because its not actually a total row." % (cell.value))
+                        log.debug("Skipping title %s because its not actually a total row.", cell.value)
 
                 priorCellValue = cell.value
 
-        print_debug("  Found %d sub-total rows" % (len(listOfTotalRows)))
+        log.debug("  Found %d sub-total rows", len(listOfTotalRows))
 
         return listOfTotalRows
 
+    @profiledStage
     def migrateBeginning(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -862,38 +2884,40 @@ class MigrateExcel:
         if startRowOfAssets == -1 or endRowOfAssets == -1:
             return -1
 
-        #Copy over original contents to start with
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRowOfAssets, endRowOfAssets)
+        #Plan where the original contents go
+        layout = self.planLayout(iwbSheetName, startRowOfAssets, endRowOfAssets)
+        lastInputCol = iwbCurrSheet.max_column
 
-        #Insert new column for Carrying Value column
-        owbCurrSheet.insert_cols(owbCurrSheet.max_column-1)
+        #Make room for new Carrying Value column in front of the value column
+        layout.insertCol(lastInputCol)
+
+        #Copy over original contents to their final place
+        self.emitLayout(owbSheetName, layout)
 
         #Get column letter for Carrying Value and Market Value columns
-        carryingValueColLetter = get_column_letter(owbCurrSheet.max_column-2)
-        marketValueColLetter = get_column_letter(owbCurrSheet.max_column-1)
+        carryingValueColLetter = get_column_letter(lastInputCol)
+        marketValueColLetter = get_column_letter(lastInputCol+1)
 
         # Write new Value Titles
-        self.writeCell(owbCurrSheet, "%c5" % (carryingValueColLetter), "Carrying Value",
-                       font=Font(bold=True), border=Border(bottom=Side(border_style="thick")))
-        self.writeCell(owbCurrSheet, "%c5" % (marketValueColLetter), "Market Value",
-                       font=Font(bold=True), border=Border(bottom=Side(border_style="thick")))
+        self.writeCell(owbCurrSheet, "%c5" % (carryingValueColLetter), "Carrying Value", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "%c5" % (marketValueColLetter), "Market Value", STYLE__HEADER)
 
         #Traverse data format to set bold and write out formulas
         startColNum = 1
         startRowNum = 5
         startCell = "%c%d" % (get_column_letter(startColNum), startRowNum)
         if owbCurrSheet[startCell].value != "ASSETS":
-            zprint("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
-                   "Please fix this manually.")
+            log.error("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
+                      "Please fix this manually.")
             return -1
         else:
             #Find all column cells with "total" in them except overall total
             listOfTotalCells = list()
-            for col in owbCurrSheet.iter_cols(min_col=1, max_col=owbCurrSheet.max_column-3):
+            for col in owbCurrSheet.iter_cols(min_col=1, max_col=lastInputCol-1):
                 for cell in col:
                     if cell is not None and isinstance(cell.value, str):
                         #Hack to replace Checking/Savings with "Cash and Cash Equivalents
-                        cell.value = cell.value.replace("Checking/Savings", "Cash and Cash Equivalents")
+                        self.setCellValue(cell, cell.value.replace("Checking/Savings", "Cash and Cash Equivalents"))
 
                         if cell.value.lower().startswith("total"):
 
@@ -902,7 +2926,7 @@ class MigrateExcel:
                             totalCellCol = cell.column_letter
 
                             #Handle each total section
-                            cell.font = FONT__BOLD
+                            self.styles.apply(cell, STYLE__BOLD)
 
                             #Find start point of this total section
                             prevRow = totalCellRow - 1
@@ -920,25 +2944,29 @@ class MigrateExcel:
 
                             #Make sure start of data was found
                             if not foundStartOfTotalData:
-                                zprint("ERROR: Failed to find starting row for total cell: %s. Migration incomplete." % (cell.value))
+                                log.error("ERROR: Failed to find starting row for total cell: %s. Migration incomplete.", cell.value)
                                 return -1
                             else:
                                 #Set section title to bold
-                                owbCurrSheet["%c%d" % (totalCellCol, startOfTotalSectionRow)].font = FONT__BOLD
+                                self.styleCell(owbCurrSheet, "%c%d" % (totalCellCol, startOfTotalSectionRow), STYLE__BOLD)
 
                                 #Set formula
-                                self.writeCell(owbCurrSheet, "%c%d" % (marketValueColLetter, totalCellRow), "FIX_ME",
-                                               font=FONT__BOLD, border=BORDER__BOLD_ABOVELINE)
+                                self.writeCell(owbCurrSheet, "%c%d" % (marketValueColLetter, totalCellRow), "FIX_ME", STYLE__BOLD_SUBTOTAL)
 
         #Set number format for money columns
-        for row in range(startRowOfAssets+1, endRowOfAssets+1):
-            owbCurrSheet["%c%d" % (carryingValueColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["%c%d" % (marketValueColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.formatColumnRange(owbCurrSheet, [carryingValueColLetter, marketValueColLetter], startRowOfAssets+1, endRowOfAssets, STYLE__ACCOUNTING)
+
+        #Each total row sums its section, TOTAL ASSETS is the Summary total
+        self.writeSubTotals(owbSheetName, marketValueColLetter, lastInputCol-1, startRowOfAssets, endRowOfAssets)
+        self.writeSectionTotal(owbSheetName, marketValueColLetter, endRowOfAssets, startRowOfAssets+1, endRowOfAssets-1)
 
-        zprint("##Successfully migrated Beginning\n")
+        self.publishScheduleTable(owbSheetName, 5, firstCol=lastInputCol)
+
+        log.info("##Successfully migrated Beginning\n")
         return 0
 
     # Done
+    @profiledStage
     def migrateBeginningDetail(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -950,38 +2978,30 @@ class MigrateExcel:
         ########################
         ## Write table header ##
         ########################
-        self.writeCell(owbCurrSheet, "B5", "QTY", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "C5", "Investment", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "D5", "Carrying Value", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "E5", "Market Value", font=Font(bold=True))
-
-        #Set cells to have thick bottom border
-        owbCurrSheet["B5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["C5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["D5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["E5"].border = Border(bottom=Side(border_style="thick"))
+        self.writeCell(owbCurrSheet, "B5", "QTY", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "C5", "Investment", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "D5", "Carrying Value", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "E5", "Market Value", STYLE__HEADER)
 
         ##############################################
         ##  Find row range of table for input data  ##
         ##############################################
         startRowOfData = -1
         endRowOfInventory = -1
-        for i in range(1, iwbCurrSheet.max_row):
-            colData = iwbCurrSheet["B%d" % (i)].value
-            #zprint("colData: %s" % (colData))
-            if colData is None:
-                continue
 
-            if colData.lower() == "inventory":
-                startRowOfData = i+1
-                print_debug("(migrateBeginningDetail) Inventory starts on row %d" % (startRowOfData))
-            if colData.lower() == "total inventory":
-                endRowOfInventory = i-1
-                print_debug("(migrateBeginningDetail) End of inventory starts on row %d" % (endRowOfInventory))
+        inventoryRow = self.findLastLabelRow(iwbCurrSheet, 2, "inventory")
+        if inventoryRow != -1:
+            startRowOfData = inventoryRow+1
+            log.debug("(migrateBeginningDetail) Inventory starts on row %d", startRowOfData)
+
+        totalInventoryRow = self.findLastLabelRow(iwbCurrSheet, 2, "total inventory")
+        if totalInventoryRow != -1:
+            endRowOfInventory = totalInventoryRow-1
+            log.debug("(migrateBeginningDetail) End of inventory starts on row %d", endRowOfInventory)
 
         #Make sure data is extracted properly
         if startRowOfData == -1 or endRowOfInventory == -1:
-            zprint("ERROR: (migrateBeginningDetail) Failed to extract start and end rows for data on sheet %s" % (iwbSheetName))
+            log.error("ERROR: (migrateBeginningDetail) Failed to extract start and end rows for data on sheet %s", iwbSheetName)
             return -1
 
         finalTotalRow = endRowOfInventory+1
@@ -995,49 +3015,45 @@ class MigrateExcel:
         assetValueCol = self.getColNumByString(4, "Asset Value", iwbSheetName=iwbSheetName)
 
         if onHandCol == -1:
-            zprint("ERROR: Unable to find On Hand column from input sheet %s." % (iwbSheetName))
+            log.error("ERROR: Unable to find On Hand column from input sheet %s.", iwbSheetName)
             return -1
 
         if assetValueCol == -1:
-            zprint("ERROR: Unable to find Asset Value column from input sheet %s." % (iwbSheetName))
+            log.error("ERROR: Unable to find Asset Value column from input sheet %s.", iwbSheetName)
             return -1
 
         for i in range(startRowOfData, finalTotalRow):
             #Copy investments
-            owbCurrSheet["C%d" % i].value = iwbCurrSheet["C%d" % i].value
+            self.setCellValue(owbCurrSheet["C%d" % i], iwbCurrSheet["C%d" % i].value)
 
             #Copy On Hand -> QTY
-            owbCurrSheet["B%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(onHandCol), i)].value
-            owbCurrSheet["B%d" % i].number_format = NUMBER_FORMAT__STANDARD
+            self.setCellValue(owbCurrSheet["B%d" % i], iwbCurrSheet["%c%d" % (get_column_letter(onHandCol), i)].value)
 
             #Copy Asset Value -> Carrying Value
-            owbCurrSheet["D%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value
+            self.setCellValue(owbCurrSheet["D%d" % i], iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value)
             #owbCurrSheet["D%d" % i].font = Font(color='00FF0000')
-            owbCurrSheet["D%d" % i].number_format = NUMBER_FORMAT__ACCOUNTING
 
             #Copy Asset Value -> Market Value -- Write 0 instead
             #owbCurrSheet["E%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value
-            owbCurrSheet["E%d" % i].value = 0
-            owbCurrSheet["E%d" % i].number_format = NUMBER_FORMAT__ACCOUNTING
+            self.setCellValue(owbCurrSheet["E%d" % i], 0)
 
+        self.formatColumnRange(owbCurrSheet, ["B"], startRowOfData, finalTotalRow-1, STYLE__STANDARD)
+        self.formatColumnRange(owbCurrSheet, ["D", "E"], startRowOfData, finalTotalRow-1, STYLE__ACCOUNTING)
 
         ##########################
         ##   Write Final Row    ##
         ##########################
-        self.writeCell(owbCurrSheet, "A%d" % finalTotalRow, "TOTAL", font=Font(bold=True))
-
-        self.writeCell(owbCurrSheet, "D%d" % finalTotalRow, "=ROUND(SUM(D%d:D%d),5)" % (startRowOfData, endRowOfInventory), font=Font(bold=True))
-        owbCurrSheet["D%d" % finalTotalRow].number_format = NUMBER_FORMAT__ACCOUNTING
-        owbCurrSheet["D%d" % finalTotalRow].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
+        self.writeCell(owbCurrSheet, "A%d" % finalTotalRow, "TOTAL", STYLE__BOLD)
+        self.writeCell(owbCurrSheet, "D%d" % finalTotalRow, "=ROUND(SUM(D%d:D%d),5)" % (startRowOfData, endRowOfInventory), STYLE__FINAL_SUM)
+        self.writeCell(owbCurrSheet, "E%d" % finalTotalRow, "=ROUND(SUM(E%d:E%d),5)" % (startRowOfData, endRowOfInventory), STYLE__FINAL_SUM)
 
-        self.writeCell(owbCurrSheet, "E%d" % finalTotalRow, "=ROUND(SUM(E%d:E%d),5)" % (startRowOfData, endRowOfInventory), font=Font(bold=True))
-        owbCurrSheet["E%d" % finalTotalRow].number_format = NUMBER_FORMAT__ACCOUNTING
-        owbCurrSheet["E%d" % finalTotalRow].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
+        self.publishScheduleTable(owbSheetName, 5, firstCol=2)
 
-        zprint("##Successfully migrated Beginning Detail\n")
+        log.info("##Successfully migrated Beginning Detail\n")
         return 0
 
     # Completely Done
+    @profiledStage
     def migrateAdditional(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -1049,14 +3065,15 @@ class MigrateExcel:
         #Check if page is empty -- if so, create empty formatted page
         rowThresholdToBeEmpty = 7
         if iwbCurrSheet.max_row < rowThresholdToBeEmpty:
-            zprint("  INFO: Creating empty sheet for Additional page.")
-            self.writeCell(owbCurrSheet, "B5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "C5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "D5", "Memo", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "E5", "Amount", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "A6", "TOTAL", font=FONT__BOLD)
-            self.writeCell(owbCurrSheet, "E6", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-            zprint("##Successfully migrated Additional\n")
+            log.info("  INFO: Creating empty sheet for Additional page.")
+            self.writeCell(owbCurrSheet, "B5", "Date", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "C5", "Name", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "D5", "Memo", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "E5", "Amount", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "A6", "TOTAL", STYLE__BOLD)
+            self.writeCell(owbCurrSheet, "E6", 0, STYLE__FINAL_SUM)
+            self.publishSectionTotal(owbSheetName, 0, "E6")
+            log.info("##Successfully migrated Additional\n")
             return 0
 
         #Dumb copy contents on page
@@ -1064,30 +3081,32 @@ class MigrateExcel:
         if startRow == -1 or endRow == -1:
             return -1
 
-        #Copy data to new sheet
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRow-1, endRow+1)
+        #Plan where data goes on new sheet
+        layout = self.planLayout(iwbSheetName, startRow-1, endRow+1)
 
         ##########################
         #    Manipulate Rows     #
         ##########################
         #Delete row with row titles (Highest to lowest or else it will delete out of order
-        owbCurrSheet.delete_rows(endRow)
-        owbCurrSheet.delete_rows(startRow)
+        layout.deleteRow(endRow)
+        layout.deleteRow(startRow)
 
         #Insert extra row for data headers
-        owbCurrSheet.insert_rows(4)
+        layout.insertRow(4)
 
         ##########################
         #    Manipulate Cols     #
         ##########################
         #Delete empty columns
-        for col in self.findEmptyCols(owbSheetName):
-            owbCurrSheet.delete_cols(col)
+        layout.deleteEmptyCols()
+
+        #Copy data to its final place on new sheet
+        self.emitLayout(owbSheetName, layout)
 
         rowNumTOTAL = self.getRowNumByString("A", "TOTAL", owbSheetName=owbSheetName)
         if rowNumTOTAL == -1:
             return -1
-        owbCurrSheet["A%d" % (rowNumTOTAL)].font = Font(bold=True)
+        self.styleCell(owbCurrSheet, "A%d" % (rowNumTOTAL), STYLE__BOLD)
 
         rowNumPaidAmount = self.getRowNumByString("E", "Paid Amount", owbSheetName=owbSheetName)
         if rowNumPaidAmount == -1:
@@ -1101,28 +3120,30 @@ class MigrateExcel:
             for cell in row:
                 if cell.value is not None:
                     if cell.value == "Paid Amount":
-                        cell.value = "Amount"
-                    cell.font = Font(bold=True)
-                    cell.border = Border(bottom=Side(border_style="thick"))
+                        self.setCellValue(cell, "Amount")
+                    self.styles.apply(cell, STYLE__HEADER)
 
         #Set cell formatting
-        for i in range(rowNumPaidAmount+1, rowNumTOTAL):
-            owbCurrSheet["B%d" % (i)].number_format = NUMBER_FORMAT__DATE
-            owbCurrSheet["E%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.formatColumnRange(owbCurrSheet, ["B"], rowNumPaidAmount+1, rowNumTOTAL-1, STYLE__DATE)
+        self.formatColumnRange(owbCurrSheet, ["E"], rowNumPaidAmount+1, rowNumTOTAL-1, STYLE__ACCOUNTING)
 
         #Create Sum Formula
         if rowNumTOTAL != rowNumPaidAmount+1:
-            print_debug("Formula: =ROUND(SUM(E%d:E%d),5)" % ((rowNumPaidAmount+1, rowNumTOTAL-1)))
+            log.debug("Formula: =ROUND(SUM(E%d:E%d),5)", rowNumPaidAmount+1, rowNumTOTAL-1)
             self.writeCell(owbCurrSheet, "E%d" % (rowNumTOTAL), "=ROUND(SUM(E%d:E%d),5)" % (rowNumPaidAmount+1, rowNumTOTAL-1),
-                      border=BORDER__FINAL_SUM, font=FONT__BOLD)
-            owbCurrSheet["E%d" % (rowNumTOTAL)].number_format = NUMBER_FORMAT__ACCOUNTING
+                           STYLE__FINAL_SUM)
         else:
-            zprint("This sheet was empty. Not creating a final formula.")
+            log.info("This sheet was empty. Not creating a final formula.")
+
+        self.publishSectionTotal(owbSheetName, self.sumColumnValues(owbCurrSheet, "E", rowNumPaidAmount+1, rowNumTOTAL-1), "E%d" % (rowNumTOTAL))
 
-        zprint("##Successfully migrated Additional\n")
+        self.publishScheduleTable(owbSheetName, rowNumPaidAmount)
+
+        log.info("##Successfully migrated Additional\n")
         return 0
 
     # Completely Done
+    @profiledStage
     def migrateSchA(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -1138,29 +3159,32 @@ class MigrateExcel:
         if startRow == -1 or endRow == -1:
             return -1
 
-        #Copy data to new sheet
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRow, endRow+1)
+        #Plan where data goes on new sheet
+        layout = self.planLayout(iwbSheetName, startRow, endRow+1)
 
         ##########################
         #    Manipulate Rows     #
         ##########################
         #Insert extra row for data headers
-        owbCurrSheet.insert_rows(4)
+        layout.insertRow(4)
         dataHeaderRow = 5
 
         ##########################
         #    Manipulate Cols     #
         ##########################
         #Delete empty columns
-        for col in self.findEmptyCols(owbSheetName):
-            owbCurrSheet.delete_cols(col)
+        layout.deleteEmptyCols()
 
         #Insert Principal Column
-        owbCurrSheet.insert_cols(5)
-        self.writeCell(owbCurrSheet, "%c%d" % (get_column_letter(5), dataHeaderRow), "Principal", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
+        layout.insertCol(5)
+
+        #Copy data to its final place on new sheet
+        self.emitLayout(owbSheetName, layout)
+
+        self.writeCell(owbCurrSheet, "%c%d" % (get_column_letter(5), dataHeaderRow), "Principal", STYLE__HEADER)
 
         #Add column header
-        self.writeCell(owbCurrSheet, "B%d" % (dataHeaderRow), "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
+        self.writeCell(owbCurrSheet, "B%d" % (dataHeaderRow), "Name", STYLE__HEADER)
 
         #################################
         #  Manipulate Cell Formatting   #
@@ -1170,9 +3194,8 @@ class MigrateExcel:
             for cell in row:
                 if cell.value is not None:
                     if cell.value == "Paid Amount":
-                        cell.value = "Income"
-                    cell.font = Font(bold=True)
-                    cell.border = Border(bottom=Side(border_style="thick"))
+                        self.setCellValue(cell, "Income")
+                    self.styles.apply(cell, STYLE__HEADER)
 
         #Get Final Total row
         finalTotalRowNum = self.getRowNumByString("A", "total", owbSheetName=owbSheetName)
@@ -1184,19 +3207,15 @@ class MigrateExcel:
         PRINCIPAL_COLUMN = "E"
         INCOME_COLUMN = "F"
 
-        #Set cell formatting by column
+        #Bold first column
         for i in range(dataHeaderRow+1, finalTotalRowNum+1):
-            #Bold first column
             if owbCurrSheet["%c%d" % (NAME_COLUMN, i)].value is not None:
                 if "total" not in owbCurrSheet["%c%d" % (NAME_COLUMN, i)].value.lower():
-                    owbCurrSheet["%c%d" % (NAME_COLUMN, i)].font = FONT__BOLD
+                    self.styleCell(owbCurrSheet, "%c%d" % (NAME_COLUMN, i), STYLE__BOLD)
 
-            #Set date column format
-            owbCurrSheet["%c%d" % (MEMO_COLUMN, i)].number_format = NUMBER_FORMAT__DATE
-
-            #Set Amount column format
-            owbCurrSheet["%c%d" % (PRINCIPAL_COLUMN, i)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["%c%d" % (INCOME_COLUMN, i)].number_format = NUMBER_FORMAT__ACCOUNTING
+        #Set date and Amount column formats
+        self.formatColumnRange(owbCurrSheet, [MEMO_COLUMN], dataHeaderRow+1, finalTotalRowNum, STYLE__DATE)
+        self.formatColumnRange(owbCurrSheet, [PRINCIPAL_COLUMN, INCOME_COLUMN], dataHeaderRow+1, finalTotalRowNum, STYLE__ACCOUNTING)
 
         #################################
         #     Abbreviate Memo Names     #
@@ -1207,7 +3226,7 @@ class MigrateExcel:
                 for cell in col:
                     if cell.value is not None and isinstance(cell.value, str):
                         if "Dividends received" in cell.value:
-                            cell.value = "Dividends received"
+                            self.setCellValue(cell, "Dividends received")
 
 
         #################################
@@ -1217,7 +3236,7 @@ class MigrateExcel:
         listOfSubTotalRows = dict()
         listOfSubTotalRows = self.getRowNumsForSubTotalRows(owbSheetName, 2, dataHeaderRow)
         if len(listOfSubTotalRows) == 0:
-            zprint("ERROR: Failed to extract row numbers for sub-total lines")
+            log.error("ERROR: Failed to extract row numbers for sub-total lines")
             return -1
 
         #Specify which column has the formulas for totals
@@ -1232,14 +3251,13 @@ class MigrateExcel:
             sumRangeStart, sumRangeEnd = subTotalStartRowNum+2, subTotalEndRowNum-1
 
             #Write SUM formula to cell
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].value =  "=SUM(%s%d:%s%d)" % (formulasColLetter, sumRangeStart, formulasColLetter, sumRangeEnd)
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].border = BORDER__BOLD_ABOVELINE
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].font = FONT__NORMAL
+            self.setCellValue(owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)], "=SUM(%s%d:%s%d)" % (formulasColLetter, sumRangeStart, formulasColLetter, sumRangeEnd))
+            self.styleCell(owbCurrSheet, "%s%d" % (formulasColLetter, subTotalEndRowNum), STYLE__SUBTOTAL)
 
         ### Create final total formula: ###
         finalTotalRowFromSubTotals = listOfSubTotalRows[-1][0] + 1
         if finalTotalRowFromSubTotals != finalTotalRowNum:
-            zprint("ERROR: Final Total row number does not match with expected. Error in alogrithm.")
+            log.error("ERROR: Final Total row number does not match with expected. Error in alogrithm.")
             return -1
 
         #Create actual SUM formula
@@ -1251,44 +3269,31 @@ class MigrateExcel:
         finalSumFormula = finalSumFormula[:-1] + ")"
 
         #Write final total SUM formula
-        print_debug("  Final Total: cell %s%d %s" % (formulasColLetter, finalTotalRowFromSubTotals, finalSumFormula))
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].value = finalSumFormula
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].border = BORDER__BOLD_ABOVELINE
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].font = FONT__NORMAL
+        log.debug("  Final Total: cell %s%d %s", formulasColLetter, finalTotalRowFromSubTotals, finalSumFormula)
+        self.setCellValue(owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)], finalSumFormula)
+        self.styleCell(owbCurrSheet, "%s%d" % (formulasColLetter, finalTotalRowFromSubTotals), STYLE__SUBTOTAL)
+
+        self.publishSectionTotal(owbSheetName, self.sumColumnValues(owbCurrSheet, formulasColLetter, dataHeaderRow+1, finalTotalRowNum-1),
+                                 "%s%d" % (formulasColLetter, finalTotalRowNum))
 
         #Add TOTAL PRINCIPAL AND INCOME after total
-        self.writeCell(owbCurrSheet, "A%d" % (finalTotalRowNum+1), "TOTAL PRINCIPAL AND INCOME", font=FONT__BOLD)
+        self.writeCell(owbCurrSheet, "A%d" % (finalTotalRowNum+1), "TOTAL PRINCIPAL AND INCOME", STYLE__BOLD)
 
-        zprint("##Successfully migrated Schedule A\n")
-        return 0
+        self.publishScheduleTable(owbSheetName, dataHeaderRow)
 
-    # Splits into Sch B and Sch E sheets
-    def migrateSchB(self, iwbSheetName, owbSheetName):
-        #Create new sheet in output workbook
-        owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
-        #Get sheet from input workbook
-        iwbCurrSheet = self.iwb[iwbSheetName]
-
-        self.migratePageTitle(iwbSheetName, owbSheetName, titleColWidth="G")
-        owbCurrSheet["A2"].value = "Schedule B - Gains on Sales or Other Dispositions"
+        log.info("##Successfully migrated Schedule A\n")
+        return 0
 
-        ##########################
-        #     Write Headers      #
-        ##########################
-        #Insert extra row for data headers
-        owbCurrSheet.insert_rows(4)
-        dataHeaderRow = 5
+    def splitSchBLedger(self, iwbSheetName):
+        #Reads the paired Sch B/E ledger (a credit row followed by a debit row per item) once and splits it
+        # into gains and losses. Both migrateSchB and migrateSchB_E build their sheets from this result.
+        # Returns a (gains, losses) pair of LedgerSides or None on error.
+        if iwbSheetName in self.schBLedgers:
+            return self.schBLedgers[iwbSheetName]
 
-        self.writeCell(owbCurrSheet, "B%d" % (dataHeaderRow), "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "C%d" % (dataHeaderRow), "Qty", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "D%d" % (dataHeaderRow), "Investment", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "E%d" % (dataHeaderRow), "Proceeds", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "F%d" % (dataHeaderRow), "Carrying Value", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "G%d" % (dataHeaderRow), "Gain", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
+        self.schBLedgers[iwbSheetName] = None
+        iwbCurrSheet = self.iwb[iwbSheetName]
 
-        ##########################
-        #    Get IWB Columns     #
-        ##########################
         #Get input WB columns for data
         dateColNum = self.getColNumByString(4, "Date", iwbSheetName=iwbSheetName)
         qtyColNum = self.getColNumByString(4, "Qty", iwbSheetName=iwbSheetName)
@@ -1297,238 +3302,159 @@ class MigrateExcel:
         creditColNum = self.getColNumByString(4, "Credit", iwbSheetName=iwbSheetName)
 
         if dateColNum == -1 or qtyColNum == -1 or itemColNum == -1 or debitColNum == -1 or creditColNum == -1:
-            zprint("  ERROR: Failed to get columns for Qty/Item/Debit/Credit from input workbook.")
-            return -1
-
-        ######################################
-        #     Parse IWB and Copy to OWB      #
-        ######################################
-        #Begin parsing input WB and writing contents to output WB
-        currentOWBRow = dataHeaderRow+1
+            log.error("  ERROR: Failed to get columns for Date/Qty/Item/Debit/Credit from input workbook.")
+            return None
 
         startRowForInputData = 6
-        currIWBRow = startRowForInputData
+
+        ledger = self.splitSchBLedgerByRow(iwbCurrSheet, startRowForInputData, dateColNum, qtyColNum,
+                                           itemColNum, debitColNum, creditColNum)
+
+        self.schBLedgers[iwbSheetName] = ledger
+        return ledger
+
+    def splitSchBLedgerByRow(self, iwbCurrSheet, startRow, dateColNum, qtyColNum, itemColNum, debitColNum, creditColNum):
+        gains = list()
+        losses = list()
+
+        currIWBRow = startRow
 
         #Loop through all rows of input workbook
         while currIWBRow < iwbCurrSheet.max_row:
-            itemRowOne = iwbCurrSheet["%s%d" % (get_column_letter(itemColNum), currIWBRow)].value
-            itemRowTwo = iwbCurrSheet["%s%d" % (get_column_letter(itemColNum), currIWBRow+1)].value
-            qtyValue = iwbCurrSheet["%s%d" % (get_column_letter(qtyColNum), currIWBRow)].value
-            dateValue = iwbCurrSheet["%s%d" % (get_column_letter(dateColNum), currIWBRow)].value
+            itemRowOne = iwbCurrSheet.getValue(currIWBRow, itemColNum)
+            itemRowTwo = iwbCurrSheet.getValue(currIWBRow+1, itemColNum)
 
             #Make sure the two rows are for the same item
             if itemRowOne != itemRowTwo:
-                zprint("  ERROR: Consecutive rows didnt match for row %d! Skipping row to try and finish." % (currIWBRow))
+                log.error("  ERROR: Consecutive rows didnt match for row %d! Skipping row to try and finish.", currIWBRow)
                 currIWBRow += 1
                 continue
 
             try:
-                creditValue = float(iwbCurrSheet["%s%d" % (get_column_letter(creditColNum), currIWBRow)].value)
+                creditValue = float(iwbCurrSheet.getValue(currIWBRow, creditColNum))
             except:
-                zprint("  ERROR: Failed to extract value from credit: ",
-                      iwbCurrSheet["%s%d" % (get_column_letter(creditColNum), currIWBRow)].value)
-                return -1
+                log.error("  ERROR: Failed to extract value from credit: %s", iwbCurrSheet.getValue(currIWBRow, creditColNum))
+                return None
 
             try:
-                debitValue = float(iwbCurrSheet["%s%d" % (get_column_letter(debitColNum), currIWBRow+1)].value)
+                debitValue = float(iwbCurrSheet.getValue(currIWBRow+1, debitColNum))
             except:
-                zprint("  ERROR: Failed to extract value from debit: ",
-                      iwbCurrSheet["%s%d" % (get_column_letter(debitColNum), currIWBRow+1)].value)
-                return -1
+                log.error("  ERROR: Failed to extract value from debit: %s", iwbCurrSheet.getValue(currIWBRow+1, debitColNum))
+                return None
+
+            record = (iwbCurrSheet.getValue(currIWBRow, dateColNum), iwbCurrSheet.getValue(currIWBRow, qtyColNum),
+                      itemRowOne, creditValue, debitValue, creditValue-debitValue)
 
             #Check if it was a gain or a loss
             if creditValue >= debitValue:  #Gain
-                print_debug("  Found Gain on rows %d and %d: %s" % (currIWBRow, currIWBRow+1, itemRowOne))
-
-                #Write values to output workbook
-                self.writeCell(owbCurrSheet, "B%d" % (currentOWBRow), dateValue)
-                self.writeCell(owbCurrSheet, "C%d" % (currentOWBRow), qtyValue)
-                self.writeCell(owbCurrSheet, "D%d" % (currentOWBRow), itemRowOne)
-                self.writeCell(owbCurrSheet, "E%d" % (currentOWBRow), creditValue)
-                self.writeCell(owbCurrSheet, "F%d" % (currentOWBRow), debitValue)
-                self.writeCell(owbCurrSheet, "G%d" % (currentOWBRow), creditValue-debitValue)
-
-                currentOWBRow += 1
+                log.debug("  Found Gain on rows %d and %d: %s", currIWBRow, currIWBRow+1, itemRowOne)
+                gains.append(record)
             else: #loss
-                print_debug("  Skipping rows %d and %d because its a loss. (Credit: %.2f, Debit: %.2f)" % (currIWBRow, currIWBRow+1, creditValue, debitValue))
-                pass
+                log.debug("  Found loss on rows %d and %d: %s", currIWBRow, currIWBRow+1, itemRowOne)
+                losses.append(record)
 
             #Increment by two becuase input workbook has 2 lines per item
             currIWBRow += 2
 
-        #################################
-        #  Manipulate Cell Formatting   #
-        #################################
-        totalGainsRow = owbCurrSheet.max_row+2
-        #Write TOTAL GAINS line
-        self.writeCell(owbCurrSheet, "A%d" % (totalGainsRow), "TOTAL GAINS", font=FONT__BOLD)
-
-        endRow = totalGainsRow
+        return LedgerSide(gains), LedgerSide(losses)
 
-        #Set cell formatting by column
-        for i in range(dataHeaderRow+1, endRow+2):
-            #Set date column format
-            owbCurrSheet["B%d" % (i)].number_format = NUMBER_FORMAT__DATE
-            owbCurrSheet["C%d" % (i)].number_format = NUMBER_FORMAT__STANDARD
-
-            owbCurrSheet["D%d" % (i)].alignment = ALIGNMENT__WRAP_TEXT
-
-            #Set currency formats
-            owbCurrSheet["E%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["F%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["G%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-
-
-        #######################
-        #   Generate Totals   #
-        #######################
-        for colLetter in ["E", "F", "G"]:
-            self.writeCell(owbCurrSheet, "%s%d" % (colLetter, endRow-1), "=ROUND(SUM(%s%d:%s%d),5)"
-                           % (colLetter, dataHeaderRow+1, colLetter, endRow-2), border=BORDER__BOLD_ABOVELINE, font=FONT__BOLD)
-
-        self.writeCell(owbCurrSheet, "G%d" % (endRow), "=G%d" % (endRow-1), border=BORDER__FINAL_SUM, font=FONT__BOLD)
-
-
-        zprint("##Successfully migrated Schedule B\n")
-        return 0
-
-    # Splits into Sch B and Sch E sheets
-    def migrateSchB_E(self, iwbSheetName, owbSheetName):
-        #Create new sheet in output workbook
+    def writeSchBESheet(self, iwbSheetName, owbSheetName, title, amountHeader, totalLabel, ledgerSide):
+        #Writes one side of the split Sch B/E ledger (see splitSchBLedger) with its totals
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
-        #Get sheet from input workbook
-        iwbCurrSheet = self.iwb[iwbSheetName]
 
         self.migratePageTitle(iwbSheetName, owbSheetName, titleColWidth="G")
-        owbCurrSheet["A2"].value = "Schedule E - Losses on Sales or Other Dispositions"
+        self.setCellValue(owbCurrSheet["A2"], title)
 
         ##########################
         #     Write Headers      #
         ##########################
-        #Insert extra row for data headers
-        owbCurrSheet.insert_rows(4)
+        #Row 4 is left empty between title and data headers
         dataHeaderRow = 5
 
-        self.writeCell(owbCurrSheet, "B%d" % (dataHeaderRow), "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "C%d" % (dataHeaderRow), "Qty", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "D%d" % (dataHeaderRow), "Investment", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "E%d" % (dataHeaderRow), "Proceeds", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "F%d" % (dataHeaderRow), "Carrying Value", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
-        self.writeCell(owbCurrSheet, "G%d" % (dataHeaderRow), "Loss", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE, alignment=ALIGNMENT__HORIZONAL_CENTER)
+        self.writeCell(owbCurrSheet, "B%d" % (dataHeaderRow), "Date", STYLE__CENTERED_HEADER)
+        self.writeCell(owbCurrSheet, "C%d" % (dataHeaderRow), "Qty", STYLE__CENTERED_HEADER)
+        self.writeCell(owbCurrSheet, "D%d" % (dataHeaderRow), "Investment", STYLE__CENTERED_HEADER)
+        self.writeCell(owbCurrSheet, "E%d" % (dataHeaderRow), "Proceeds", STYLE__CENTERED_HEADER)
+        self.writeCell(owbCurrSheet, "F%d" % (dataHeaderRow), "Carrying Value", STYLE__CENTERED_HEADER)
+        self.writeCell(owbCurrSheet, "G%d" % (dataHeaderRow), amountHeader, STYLE__CENTERED_HEADER)
 
-        ##########################
-        #    Get IWB Columns     #
-        ##########################
-        #Get input WB columns for data
-        dateColNum = self.getColNumByString(4, "Date", iwbSheetName=iwbSheetName)
-        qtyColNum = self.getColNumByString(4, "Qty", iwbSheetName=iwbSheetName)
-        itemColNum = self.getColNumByString(4, "Item", iwbSheetName=iwbSheetName)
-        debitColNum = self.getColNumByString(4, "Debit", iwbSheetName=iwbSheetName)
-        creditColNum = self.getColNumByString(4, "Credit", iwbSheetName=iwbSheetName)
-
-        if dateColNum == -1 or qtyColNum == -1 or itemColNum == -1 or debitColNum == -1 or creditColNum == -1:
-            zprint("  ERROR: Failed to get columns for Date/Qty/Item/Debit/Credit from input workbook.")
-            return -1
-
-        ######################################
-        #     Parse IWB and Copy to OWB      #
-        ######################################
-        #Begin parsing input WB and writing contents to output WB
+        #Write values to output workbook
         currentOWBRow = dataHeaderRow+1
-
-        startRowForInputData = 6
-        currIWBRow = startRowForInputData
-
-        #Loop through all rows of input workbook
-        while currIWBRow < iwbCurrSheet.max_row:
-            itemRowOne = iwbCurrSheet["%s%d" % (get_column_letter(itemColNum), currIWBRow)].value
-            itemRowTwo = iwbCurrSheet["%s%d" % (get_column_letter(itemColNum), currIWBRow+1)].value
-            qtyValue = iwbCurrSheet["%s%d" % (get_column_letter(qtyColNum), currIWBRow)].value
-            dateValue = iwbCurrSheet["%s%d" % (get_column_letter(dateColNum), currIWBRow)].value
-
-            #Make sure the two rows are for the same item
-            if itemRowOne != itemRowTwo:
-                zprint("  ERROR: Consecutive rows didnt match for row %d! Skipping row to try and finish." % (currIWBRow))
-                currIWBRow += 1
-                continue
-
-            try:
-                creditValue = float(iwbCurrSheet["%s%d" % (get_column_letter(creditColNum), currIWBRow)].value)
-            except:
-                zprint("  ERROR: Failed to extract value from credit: ",
-                      iwbCurrSheet["%s%d" % (get_column_letter(creditColNum), currIWBRow)].value)
-                return -1
-
-            try:
-                debitValue = float(iwbCurrSheet["%s%d" % (get_column_letter(debitColNum), currIWBRow+1)].value)
-            except:
-                zprint("  ERROR: Failed to extract value from debit: ",
-                      iwbCurrSheet["%s%d" % (get_column_letter(debitColNum), currIWBRow+1)].value)
-                return -1
-
-            #Check if it was a gain or a loss
-            if creditValue >= debitValue:  #Gain
-                print_debug("  Skipping rows %d and %d because its a gain. (Credit: %.2f, Debit: %.2f)" % (currIWBRow, currIWBRow+1, creditValue, debitValue))
-            else: #loss
-                print_debug("  Found loss on rows %d and %d: %s" % (currIWBRow, currIWBRow+1, itemRowOne))
-                #Write values to output workbook
-                self.writeCell(owbCurrSheet, "B%d" % (currentOWBRow), dateValue)
-                self.writeCell(owbCurrSheet, "C%d" % (currentOWBRow), qtyValue)
-                self.writeCell(owbCurrSheet, "D%d" % (currentOWBRow), itemRowOne)
-                self.writeCell(owbCurrSheet, "E%d" % (currentOWBRow), creditValue)
-                self.writeCell(owbCurrSheet, "F%d" % (currentOWBRow), debitValue)
-                self.writeCell(owbCurrSheet, "G%d" % (currentOWBRow), creditValue-debitValue)
-                currentOWBRow += 1
-
-            #Increment by two becuase input workbook has 2 lines per item
-            currIWBRow += 2
+        for dateValue, qtyValue, itemValue, creditValue, debitValue, amount in ledgerSide.records:
+            self.writeCell(owbCurrSheet, "B%d" % (currentOWBRow), dateValue)
+            self.writeCell(owbCurrSheet, "C%d" % (currentOWBRow), qtyValue)
+            self.writeCell(owbCurrSheet, "D%d" % (currentOWBRow), itemValue)
+            self.writeCell(owbCurrSheet, "E%d" % (currentOWBRow), creditValue)
+            self.writeCell(owbCurrSheet, "F%d" % (currentOWBRow), debitValue)
+            self.writeCell(owbCurrSheet, "G%d" % (currentOWBRow), amount)
+            currentOWBRow += 1
 
         #################################
         #  Manipulate Cell Formatting   #
         #################################
-        totalGainsRow = owbCurrSheet.max_row+2
-        #Write TOTAL GAINS line
-        self.writeCell(owbCurrSheet, "A%d" % (totalGainsRow), "TOTAL LOSSES", font=FONT__BOLD)
-
-        endRow = totalGainsRow
+        endRow = owbCurrSheet.max_row+2
+        #Write TOTAL GAINS/LOSSES line
+        self.writeCell(owbCurrSheet, "A%d" % (endRow), totalLabel, STYLE__BOLD)
 
         #Set cell formatting by column
-        for i in range(dataHeaderRow+1, endRow+2):
-            #Set date column format
-            owbCurrSheet["B%d" % (i)].number_format = NUMBER_FORMAT__DATE
-            owbCurrSheet["C%d" % (i)].number_format = NUMBER_FORMAT__STANDARD
-
-            owbCurrSheet["D%d" % (i)].alignment = ALIGNMENT__WRAP_TEXT
-
-            #Set currency formats
-            owbCurrSheet["E%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["F%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["G%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.formatColumnRange(owbCurrSheet, ["B"], dataHeaderRow+1, endRow+1, STYLE__DATE)
+        self.formatColumnRange(owbCurrSheet, ["C"], dataHeaderRow+1, endRow+1, STYLE__STANDARD)
+        self.formatColumnRange(owbCurrSheet, ["D"], dataHeaderRow+1, endRow+1, STYLE__WRAP_TEXT)
 
+        #Set currency formats
+        self.formatColumnRange(owbCurrSheet, ["E", "F", "G"], dataHeaderRow+1, endRow+1, STYLE__ACCOUNTING)
 
         #######################
         #   Generate Totals   #
         #######################
         for colLetter in ["E", "F", "G"]:
             self.writeCell(owbCurrSheet, "%s%d" % (colLetter, endRow-1), "=ROUND(SUM(%s%d:%s%d),5)"
-                           % (colLetter, dataHeaderRow+1, colLetter, endRow-2), border=BORDER__BOLD_ABOVELINE, font=FONT__BOLD)
+                           % (colLetter, dataHeaderRow+1, colLetter, endRow-2), STYLE__BOLD_SUBTOTAL)
+
+        self.writeCell(owbCurrSheet, "G%d" % (endRow), "=G%d" % (endRow-1), STYLE__FINAL_SUM)
+        log.debug("  %s totals (Proceeds, Carrying Value, %s): %s", owbSheetName, amountHeader, ledgerSide.totals)
+        if self.exportTables:
+            rows = [(dataHeaderRow+1+index,) + tuple(record) for index, record in enumerate(ledgerSide.records)]
+            self.scheduleTables[owbSheetName] = ScheduleTable(owbSheetName, ["Row", "Date", "Qty", "Investment", "Proceeds",
+                                                                             "Carrying Value", amountHeader], rows)
+        self.publishSectionTotal(owbSheetName, ledgerSide.totals[2], "G%d" % (endRow))
 
-        self.writeCell(owbCurrSheet, "G%d" % (endRow), "=G%d" % (endRow-1), border=BORDER__FINAL_SUM, font=FONT__BOLD)
+    # Splits into Sch B and Sch E sheets
+    @profiledStage
+    def migrateSchB(self, iwbSheetName, owbSheetName):
+        ledger = self.splitSchBLedger(iwbSheetName)
+        if ledger is None:
+            return -1
+        gains, losses = ledger
 
+        self.writeSchBESheet(iwbSheetName, owbSheetName, "Schedule B - Gains on Sales or Other Dispositions",
+                             "Gain", "TOTAL GAINS", gains)
 
-        zprint("##Successfully migrated Schedule E\n")
+        log.info("##Successfully migrated Schedule B\n")
+        return 0
+
+    # Splits into Sch B and Sch E sheets
+    @profiledStage
+    def migrateSchB_E(self, iwbSheetName, owbSheetName):
+        ledger = self.splitSchBLedger(iwbSheetName)
+        if ledger is None:
+            return -1
+        gains, losses = ledger
+
+        self.writeSchBESheet(iwbSheetName, owbSheetName, "Schedule E - Losses on Sales or Other Dispositions",
+                             "Loss", "TOTAL LOSSES", losses)
+
+        log.info("##Successfully migrated Schedule E\n")
         return 0
 
     # - If net income is negative, Make empty sheet
     #  Competely done
+    @profiledStage
     def migrateSchC(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
         #Get sheet from input workbook
         iwbCurrSheet = self.iwb[iwbSheetName]
-        #Get sheet from input workbook with data only
-        iwbCurrSheetDataOnly = self.iwb_do[iwbSheetName]
-
         self.migratePageTitle(iwbSheetName, owbSheetName, titleColWidth="G")
 
         #Check if total is negative. If it is, leave sheet empty
@@ -1537,27 +3463,27 @@ class MigrateExcel:
         totalRowNum = iwbCurrSheet.max_row
         balanceCol = iwbCurrSheet.max_column
         if totalRowNum == -1 or balanceCol == -1:
-            zprint("ERROR: Unable to find Total value on sheet: %s" % (iwbSheetName))
+            log.error("ERROR: Unable to find Total value on sheet: %s", iwbSheetName)
             return -1
         else:
-            totalVal = iwbCurrSheetDataOnly["%c%d" % (get_column_letter(balanceCol), totalRowNum)].value
-            print_debug("  Schedule C total: %s" % totalVal)
+            totalVal = self.iwb_do.getValue(iwbSheetName, "%s%d" % (get_column_letter(balanceCol), totalRowNum))
+            log.debug("  Schedule C total: %s", totalVal)
             try:
                 totalVal = int(totalVal)
             except:
                 totalVal = 0
 
             if totalVal <= 0:
-                zprint("  Schedule C has a negative total. Creating empty sheet.")
-                self.writeCell(owbCurrSheet, "C5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                self.writeCell(owbCurrSheet, "D5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                self.writeCell(owbCurrSheet, "E5", "Memo", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                self.writeCell(owbCurrSheet, "F5", "Chk #", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                self.writeCell(owbCurrSheet, "G5", "Amount", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                self.writeCell(owbCurrSheet, "A8", "TOTAL", font=FONT__BOLD)
-                self.writeCell(owbCurrSheet, "G8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-                owbCurrSheet["G8"].number_format = NUMBER_FORMAT__ACCOUNTING
-                zprint("##Successfully migrated Schedule C\n")
+                log.info("  Schedule C has a negative total. Creating empty sheet.")
+                self.writeCell(owbCurrSheet, "C5", "Date", STYLE__HEADER)
+                self.writeCell(owbCurrSheet, "D5", "Name", STYLE__HEADER)
+                self.writeCell(owbCurrSheet, "E5", "Memo", STYLE__HEADER)
+                self.writeCell(owbCurrSheet, "F5", "Chk #", STYLE__HEADER)
+                self.writeCell(owbCurrSheet, "G5", "Amount", STYLE__HEADER)
+                self.writeCell(owbCurrSheet, "A8", "TOTAL", STYLE__BOLD)
+                self.writeCell(owbCurrSheet, "G8", 0, STYLE__FINAL_SUM)
+                self.publishSectionTotal(owbSheetName, 0, "G8")
+                log.info("##Successfully migrated Schedule C\n")
 
                 return 0
             else:
@@ -1571,31 +3497,33 @@ class MigrateExcel:
         if startRow == -1 or endRow == -1:
             return -1
 
-        #Copy data to new sheet
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRow, endRow+1)
+        #Plan where data goes on new sheet
+        layout = self.planLayout(iwbSheetName, startRow, endRow+1)
 
         ##########################
         #    Manipulate Rows     #
         ##########################
         #Insert extra row for data headers
-        owbCurrSheet.insert_rows(4)
+        layout.insertRow(4)
         dataHeaderRow = 5
 
         ##########################
         #    Manipulate Cols     #
         ##########################
         #Delete empty columns
-        for col in self.findEmptyCols(owbSheetName):
-            owbCurrSheet.delete_cols(col)
+        layout.deleteEmptyCols()
 
         #Delete columns with specified data header if they exist
         for colName in ["type", "balance"]:
-            colToDel = self.getColNumByString(dataHeaderRow, colName, owbSheetName=owbSheetName)
+            colToDel = layout.findCol(dataHeaderRow, colName)
             if colToDel == -1:
-                zprint("  Didnt find column with header \"%s\" to delete. Skipping." % (colName))
+                log.info("  Didnt find column with header \"%s\" to delete. Skipping.", colName)
                 continue
             else:
-                owbCurrSheet.delete_cols(colToDel)
+                layout.deleteCol(colToDel)
+
+        #Copy data to its final place on new sheet
+        self.emitLayout(owbSheetName, layout)
 
         #################################
         #  Manipulate Cell Formatting   #
@@ -1605,33 +3533,28 @@ class MigrateExcel:
             for cell in row:
                 if cell.value is not None:
                     if cell.value == "Paid Amount":
-                        cell.value = "Amount"
+                        self.setCellValue(cell, "Amount")
                     if cell.value == "Num":
-                        cell.value = "Chk #"
-                    cell.font = Font(bold=True)
-                    cell.border = Border(bottom=Side(border_style="thick"))
+                        self.setCellValue(cell, "Chk #")
+                    self.styles.apply(cell, STYLE__HEADER)
 
 
         endRow = self.getRowNumByString("A", "total", owbSheetName=owbSheetName)
         if endRow == -1:
             return -1
 
-        #Set cell formatting by column
+        #Bold first column
         for i in range(dataHeaderRow+1, endRow+1):
-            #Bold first column
             if owbCurrSheet["B%d" % (i)].value is not None:
                 if "total" not in owbCurrSheet["B%d" % (i)].value.lower():
-                    owbCurrSheet["B%d" % (i)].font = FONT__BOLD
+                    self.styleCell(owbCurrSheet, "B%d" % (i), STYLE__BOLD)
 
-            #Set date column format
-            owbCurrSheet["C%d" % (i)].number_format = NUMBER_FORMAT__DATE
+        #Set date and Amount column formats
+        self.formatColumnRange(owbCurrSheet, ["C"], dataHeaderRow+1, endRow, STYLE__DATE)
+        self.formatColumnRange(owbCurrSheet, ["G"], dataHeaderRow+1, endRow, STYLE__ACCOUNTING)
 
-            #Set Amount column format
-            owbCurrSheet["G%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
-
-            #Set Memo and Name text wrapping
-            owbCurrSheet["D%d" % (i)].alignment = ALIGNMENT__WRAP_TEXT
-            owbCurrSheet["E%d" % (i)].alignment = ALIGNMENT__WRAP_TEXT
+        #Set Memo and Name text wrapping
+        self.formatColumnRange(owbCurrSheet, ["D", "E"], dataHeaderRow+1, endRow, STYLE__WRAP_TEXT)
 
         #################################
         #     Write Total Formulas      #
@@ -1645,7 +3568,7 @@ class MigrateExcel:
         listOfSubTotalRows = dict()
         listOfSubTotalRows = self.getRowNumsForSubTotalRows(owbSheetName, 2, dataHeaderRow)
         if len(listOfSubTotalRows) == 0:
-            zprint("ERROR: Failed to extract row numbers for sub-total lines")
+            log.error("ERROR: Failed to extract row numbers for sub-total lines")
             return -1
 
         # Specify which column has the formulas for totals
@@ -1660,15 +3583,14 @@ class MigrateExcel:
             sumRangeStart, sumRangeEnd = subTotalStartRowNum + 2, subTotalEndRowNum - 1
 
             # Write SUM formula to cell
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].value = "=SUM(%s%d:%s%d)" % (
-            formulasColLetter, sumRangeStart, formulasColLetter, sumRangeEnd)
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].border = BORDER__BOLD_ABOVELINE
-            owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)].font = FONT__NORMAL
+            self.setCellValue(owbCurrSheet["%s%d" % (formulasColLetter, subTotalEndRowNum)], "=SUM(%s%d:%s%d)" % (
+            formulasColLetter, sumRangeStart, formulasColLetter, sumRangeEnd))
+            self.styleCell(owbCurrSheet, "%s%d" % (formulasColLetter, subTotalEndRowNum), STYLE__SUBTOTAL)
 
         ### Create final total formula: ###
         finalTotalRowFromSubTotals = listOfSubTotalRows[-1][0] + 1
         if finalTotalRowFromSubTotals != finalTotalRowNum:
-            zprint("ERROR: Final Total row number does not match with expected. Error in alogrithm.")
+            log.error("ERROR: Final Total row number does not match with expected. Error in alogrithm.")
             return -1
 
         # Create actual SUM formula
@@ -1680,14 +3602,19 @@ class MigrateExcel:
         finalSumFormula = finalSumFormula[:-1] + ")"
 
         # Write final total SUM formula
-        print_debug("  Final Total: cell %s%d %s" % (formulasColLetter, finalTotalRowFromSubTotals, finalSumFormula))
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].value = finalSumFormula
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].border = BORDER__BOLD_ABOVELINE
-        owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)].font = FONT__NORMAL
+        log.debug("  Final Total: cell %s%d %s", formulasColLetter, finalTotalRowFromSubTotals, finalSumFormula)
+        self.setCellValue(owbCurrSheet["%s%d" % (formulasColLetter, finalTotalRowFromSubTotals)], finalSumFormula)
+        self.styleCell(owbCurrSheet, "%s%d" % (formulasColLetter, finalTotalRowFromSubTotals), STYLE__SUBTOTAL)
+
+        self.publishSectionTotal(owbSheetName, self.sumColumnValues(owbCurrSheet, formulasColLetter, dataHeaderRow+1, finalTotalRowNum-1),
+                                 "%s%d" % (formulasColLetter, finalTotalRowNum))
+
+        self.publishScheduleTable(owbSheetName, dataHeaderRow)
 
-        zprint("##Successfully migrated Schedule C\n")
+        log.info("##Successfully migrated Schedule C\n")
         return 0
 
+    @profiledStage
     def migrateSchD(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -1697,7 +3624,7 @@ class MigrateExcel:
         inputSheetDataHeaderRow = 4
         inputNameCol = self.getColNumByString(inputSheetDataHeaderRow, "Name", iwbSheetName=iwbSheetName)
         if inputNameCol == -1:
-            zprint("  ERROR: Unable to find \"Name\" in input sheet header row. Failed.")
+            log.error("  ERROR: Unable to find \"Name\" in input sheet header row. Failed.")
             return -1
 
         #Dynamically assign header column width based on Name column
@@ -1709,8 +3636,8 @@ class MigrateExcel:
         if startRow == -1 or endRow == -1:
             return -1
 
-        #Copy data to new sheet
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRow, endRow+1, keepFormulas=True)
+        #Plan where data goes on new sheet
+        layout = self.planLayout(iwbSheetName, startRow, endRow+1)
 
         ##########################
         #    Manipulate Rows     #
@@ -1722,24 +3649,25 @@ class MigrateExcel:
         #    Manipulate Cols     #
         ##########################
         #Find Name column
-        nameCol = self.getColNumByString(dataHeaderRow, "Name", owbSheetName=owbSheetName)
+        nameCol = layout.findCol(dataHeaderRow, "Name")
         if nameCol == -1:
-            zprint("  ERROR: Unable to find \"Name\" column. Failed to port.")
+            log.error("  ERROR: Unable to find \"Name\" column. Failed to port.")
             return -1
 
         #Delete empty columns after Name column
-        for col in self.findEmptyCols(owbSheetName):
-            if col > nameCol:
-                owbCurrSheet.delete_cols(col)
+        layout.deleteEmptyCols(minCol=nameCol+1)
+
+        #Copy data to its final place on new sheet
+        self.emitLayout(owbSheetName, layout, keepFormulas=True)
 
         #Find Paid Amount column
         paidAmountCol = self.getColNumByString(dataHeaderRow, "Paid Amount", owbSheetName=owbSheetName)
         if paidAmountCol == -1:
-            zprint("  ERROR: Unable to find \"Paid Amount\" column. Failed to port.")
+            log.error("  ERROR: Unable to find \"Paid Amount\" column. Failed to port.")
             return -1
 
         #Add Income column
-        self.writeCell(owbCurrSheet, "%c%d" % (get_column_letter(paidAmountCol+1), dataHeaderRow), "Income", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
+        self.writeCell(owbCurrSheet, "%c%d" % (get_column_letter(paidAmountCol+1), dataHeaderRow), "Income", STYLE__HEADER)
 
         ###################################
         #  Manipulate Header Formatting   #
@@ -1750,20 +3678,19 @@ class MigrateExcel:
                 if cell.value is not None:
                     #Rename data column titles
                     if cell.value == "Paid Amount":
-                        cell.value = "Principal"
+                        self.setCellValue(cell, "Principal")
                     if cell.value == "Num":
-                        cell.value = "Chk #"
-                    cell.font = Font(bold=True)
-                    cell.border = Border(bottom=Side(border_style="thick"))
+                        self.setCellValue(cell, "Chk #")
+                    self.styles.apply(cell, STYLE__HEADER)
 
         #Update endRow location
         endRow = self.getRowNumByString("A", "total", owbSheetName=owbSheetName)
         if endRow == -1:
-            zprint("  ERROR: Failed to find row containing \"total\" in column A.")
+            log.error("  ERROR: Failed to find row containing \"total\" in column A.")
             return -1
 
         #Add TOTAL PRINCIPAL AND INCOME after total
-        self.writeCell(owbCurrSheet, "A%d" % (endRow+1), "TOTAL PRINCIPAL AND INCOME", font=FONT__BOLD)
+        self.writeCell(owbCurrSheet, "A%d" % (endRow+1), "TOTAL PRINCIPAL AND INCOME", STYLE__BOLD)
 
         ###################################
         #  Set cell formatting by column  #
@@ -1774,7 +3701,7 @@ class MigrateExcel:
         principalCol = self.getColNumByString(dataHeaderRow, "Principal", owbSheetName=owbSheetName)
 
         if nameCol == -1 or dateCol == -1 or memoCol == -1 or principalCol == -1:
-            zprint("  ERROR: Unable to find all columns (Name, Date, Memo, Principal) before applying formatting. Failed to port.")
+            log.error("  ERROR: Unable to find all columns (Name, Date, Memo, Principal) before applying formatting. Failed to port.")
             return -1
 
         for i in range(dataHeaderRow+1, endRow+2):
@@ -1786,76 +3713,56 @@ class MigrateExcel:
 
                     #Bold all non-total headers
                     if "total" not in owbCurrSheet["%c%d" % (get_column_letter(j),i)].value.lower():
-                        owbCurrSheet["%c%d" % (get_column_letter(j),i)].font = FONT__BOLD
-
-            #Set Name column text wrap
-            owbCurrSheet["%c%d" % (get_column_letter(nameCol), i)].alignment = ALIGNMENT__WRAP_TEXT
-            #Set date column format
-            owbCurrSheet["%c%d" % (get_column_letter(dateCol), i)].number_format = NUMBER_FORMAT__DATE
-            #Set Memo column text wrap
-            owbCurrSheet["%c%d" % (get_column_letter(memoCol), i)].alignment = ALIGNMENT__WRAP_TEXT
-            #Set Amount column format
-            owbCurrSheet["%c%d" % (get_column_letter(principalCol), i)].number_format = NUMBER_FORMAT__ACCOUNTING
-
-        ##################
-        #  Fix formulas  #
-        ##################
-        inputSheetAmountCol = self.getColNumByString(inputSheetDataHeaderRow, "Paid Amount", iwbSheetName=iwbSheetName)
-        if inputSheetAmountCol == -1:
-            zprint("  ERROR: Failed to find Paid Amount column from input sheet. Cannot fix formulas.")
-            return -1
-
-        #Fix formulas for principal (formerly Paid Amount) column
+                        self.styleCell(owbCurrSheet, "%c%d" % (get_column_letter(j),i), STYLE__BOLD)
+
+        #Set Name and Memo column text wrap
+        self.formatColumnRange(owbCurrSheet, [get_column_letter(nameCol), get_column_letter(memoCol)], dataHeaderRow+1, endRow+1, STYLE__WRAP_TEXT)
+        #Set date column format
+        self.formatColumnRange(owbCurrSheet, [get_column_letter(dateCol)], dataHeaderRow+1, endRow+1, STYLE__DATE)
+        #Set Amount column format
+        self.formatColumnRange(owbCurrSheet, [get_column_letter(principalCol)], dataHeaderRow+1, endRow+1, STYLE__ACCOUNTING)
+
+        #####################
+        #  Format formulas  #
+        #####################
+        #Formula references were moved to the principal (formerly Paid Amount) column when the data was copied
         for i in range(dataHeaderRow+1, endRow+2):
             currentCell = owbCurrSheet["%c%d" % (get_column_letter(principalCol), i)]
             if currentCell.value is not None and isinstance(currentCell.value, str):
                 if "=" in currentCell.value:
-                    #Prevent ROUND/SUM from being messed up by setting it to higher column letters
-                    currentCell.value = currentCell.value.replace("ROUND", "XXX1")
-                    currentCell.value = currentCell.value.replace("SUM", "YYY1")
+                    log.debug("Principal formula: %s", currentCell.value)
+                    self.styles.apply(currentCell, STYLE__BOLD_SUBTOTAL)
 
-                    #Fix formula
-                    print_debug("Replacing %c with %c is formula: %s" % (get_column_letter(inputSheetAmountCol), get_column_letter(principalCol), currentCell.value))
-                    currentCell.value = currentCell.value.replace("%c" % (get_column_letter(inputSheetAmountCol)), "%c" %(get_column_letter(principalCol)))
+        self.writeSectionTotal(owbSheetName, get_column_letter(principalCol), endRow, dataHeaderRow+1, endRow-1)
 
-                    #Revert ROUND/SUM changes
-                    currentCell.value = currentCell.value.replace("XXX1", "ROUND")
-                    currentCell.value = currentCell.value.replace("YYY1", "SUM")
+        self.publishScheduleTable(owbSheetName, dataHeaderRow)
 
-                    print_debug("New formula: %s" %(currentCell.value))
-
-                    #Fix cell formatting as well
-                    currentCell.border = BORDER__BOLD_ABOVELINE
-                    currentCell.font = FONT__BOLD
-
-        zprint("##Successfully migrated Schedule D\n")
+        log.info("##Successfully migrated Schedule D\n")
         return 0
 
     # - If net income is positive, Make empty sheet
     # Done -- Totals arent tallied
+    @profiledStage
     def migrateSchF(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
         #Get sheet from input workbook
         iwbCurrSheet = self.iwb[iwbSheetName]
-        #Get sheet from input workbook with data only
-        iwbCurrSheetDataOnly = self.iwb_do[iwbSheetName]
-
         self.migratePageTitle(iwbSheetName, owbSheetName, titleColWidth="G")
 
         #Check if input sheet is empty
         rowThresholdToBeEmpty = 7
         if iwbCurrSheet.max_row < rowThresholdToBeEmpty:
-            self.writeCell(owbCurrSheet, "C5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "D5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "E5", "Memo", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "F5", "Chk #", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "G5", "Amount", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "A8", "TOTAL", font=FONT__BOLD)
-            self.writeCell(owbCurrSheet, "G8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-            owbCurrSheet["G8"].number_format = NUMBER_FORMAT__ACCOUNTING
-
-            zprint("##Successfully migrated Schedule F\n")
+            self.writeCell(owbCurrSheet, "C5", "Date", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "D5", "Name", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "E5", "Memo", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "F5", "Chk #", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "G5", "Amount", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "A8", "TOTAL", STYLE__BOLD)
+            self.writeCell(owbCurrSheet, "G8", 0, STYLE__FINAL_SUM)
+            self.publishSectionTotal(owbSheetName, 0, "G8")
+
+            log.info("##Successfully migrated Schedule F\n")
             return 0
 
         try:
@@ -1864,21 +3771,21 @@ class MigrateExcel:
             totalRowNum = self.getRowNumByString("A", "Total", iwbSheetName=iwbSheetName)
             balanceCol = self.getColNumByString(4, "Paid Amount", iwbSheetName=iwbSheetName)
             if totalRowNum == -1 or balanceCol == -1:
-                zprint("ERROR: UNable to find Total value on sheet: %s" % (iwbSheetName))
+                log.error("ERROR: UNable to find Total value on sheet: %s", iwbSheetName)
                 return -1
             else:
-                #zprint("  Schedule F total: ", iwbCurrSheetDataOnly["%c%d" % (get_column_letter(balanceCol), totalRowNum)].value)
-                if iwbCurrSheetDataOnly["%c%d" % (get_column_letter(balanceCol), totalRowNum)].value >= 0:
-                    zprint("  Schedule F has a positive total. Creating empty sheet.")
-                    self.writeCell(owbCurrSheet, "C5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                    self.writeCell(owbCurrSheet, "D5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                    self.writeCell(owbCurrSheet, "E5", "Memo", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                    self.writeCell(owbCurrSheet, "F5", "Chk #", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                    self.writeCell(owbCurrSheet, "G5", "Amount", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-                    self.writeCell(owbCurrSheet, "A8", "TOTAL", font=FONT__BOLD)
-                    self.writeCell(owbCurrSheet, "G8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-                    owbCurrSheet["G8"].number_format = NUMBER_FORMAT__ACCOUNTING
-                    zprint("##Successfully migrated Schedule F\n")
+                #zprint("  Schedule F total: ", self.iwb_do.getValue(iwbSheetName, "%s%d" % (get_column_letter(balanceCol), totalRowNum)))
+                if self.iwb_do.getValue(iwbSheetName, "%s%d" % (get_column_letter(balanceCol), totalRowNum)) >= 0:
+                    log.info("  Schedule F has a positive total. Creating empty sheet.")
+                    self.writeCell(owbCurrSheet, "C5", "Date", STYLE__HEADER)
+                    self.writeCell(owbCurrSheet, "D5", "Name", STYLE__HEADER)
+                    self.writeCell(owbCurrSheet, "E5", "Memo", STYLE__HEADER)
+                    self.writeCell(owbCurrSheet, "F5", "Chk #", STYLE__HEADER)
+                    self.writeCell(owbCurrSheet, "G5", "Amount", STYLE__HEADER)
+                    self.writeCell(owbCurrSheet, "A8", "TOTAL", STYLE__BOLD)
+                    self.writeCell(owbCurrSheet, "G8", 0, STYLE__FINAL_SUM)
+                    self.publishSectionTotal(owbSheetName, 0, "G8")
+                    log.info("##Successfully migrated Schedule F\n")
                     return 0
                 else:
                     #Schedule C has postiive total. Migrate data.
@@ -1891,23 +3798,24 @@ class MigrateExcel:
             if startRow == -1 or endRow == -1:
                 return -1
 
-            #Copy data to new sheet
-            self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRow, endRow+1)
-
+            #Plan where data goes on new sheet
+            layout = self.planLayout(iwbSheetName, startRow, endRow+1)
 
             ##########################
             #    Manipulate Rows     #
             ##########################
             #Insert extra row for data headers
-            owbCurrSheet.insert_rows(4)
+            layout.insertRow(4)
             dataHeaderRow = 5
 
             ##########################
             #    Manipulate Cols     #
             ##########################
             #Delete empty columns
-            for col in self.findEmptyCols(owbSheetName):
-                owbCurrSheet.delete_cols(col)
+            layout.deleteEmptyCols()
+
+            #Copy data to its final place on new sheet
+            self.emitLayout(owbSheetName, layout)
 
             #################################
             #  Manipulate Cell Formatting   #
@@ -1917,11 +3825,10 @@ class MigrateExcel:
                 for cell in row:
                     if cell.value is not None:
                         if cell.value == "Paid Amount":
-                            cell.value = "Amount"
+                            self.setCellValue(cell, "Amount")
                         if cell.value == "Num":
-                            cell.value = "Chk #"
-                        cell.font = Font(bold=True)
-                        cell.border = Border(bottom=Side(border_style="thick"))
+                            self.setCellValue(cell, "Chk #")
+                        self.styles.apply(cell, STYLE__HEADER)
 
             #Get final row
             endRow = self.getRowNumByString("A", "total", owbSheetName=owbSheetName)
@@ -1929,25 +3836,33 @@ class MigrateExcel:
             if endRow == -1:
                 return -1
 
-            #Set cell formatting by column
+            #Bold first column
             for i in range(dataHeaderRow+1, endRow+1):
-                #Bold first column
                 if owbCurrSheet["B%d" % (i)].value is not None:
                     if "total" not in owbCurrSheet["B%d" % (i)].value.lower():
-                        owbCurrSheet["B%d" % (i)].font = FONT__BOLD
+                        self.styleCell(owbCurrSheet, "B%d" % (i), STYLE__BOLD)
 
-                #Set date column format
-                owbCurrSheet["C%d" % (i)].number_format = NUMBER_FORMAT__DATE
+            #Set date and Amount column formats
+            self.formatColumnRange(owbCurrSheet, ["C"], dataHeaderRow+1, endRow, STYLE__DATE)
+            self.formatColumnRange(owbCurrSheet, ["G"], dataHeaderRow+1, endRow, STYLE__ACCOUNTING)
 
-                #Set Amount column format
-                owbCurrSheet["G%d" % (i)].number_format = NUMBER_FORMAT__ACCOUNTING
+            #Amount column is normally G, unless the input had extra columns
+            amountColLetter = "G"
+            amountCol = self.getColNumByString(dataHeaderRow, "Amount", owbSheetName=owbSheetName)
+            if amountCol != -1:
+                amountColLetter = get_column_letter(amountCol)
+            self.publishSectionTotal(owbSheetName, self.sumColumnValues(owbCurrSheet, amountColLetter, dataHeaderRow+1, endRow-1),
+                                     "%s%d" % (amountColLetter, endRow))
 
-            zprint("##Successfully migrated Schedule F\n")
+            self.publishScheduleTable(owbSheetName, dataHeaderRow)
+
+            log.info("##Successfully migrated Schedule F\n")
             return 0
         except:
             return -1
 
     # ??
+    @profiledStage
     def migrateSchG(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -1959,28 +3874,37 @@ class MigrateExcel:
         #Create empty sheet for now
         rowThresholdToBeEmpty = 7
         if iwbCurrSheet.max_row < rowThresholdToBeEmpty:
-            self.writeCell(owbCurrSheet, "C5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "D5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "E5", "Memo", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "F5", "Chk #", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "G5", "Principal", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "H5", "Income", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "A8", "TOTAL", font=FONT__BOLD)
-            self.writeCell(owbCurrSheet, "H8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-            owbCurrSheet["H8"].number_format = NUMBER_FORMAT__ACCOUNTING
-            zprint(" INFO: Creating empty sheet for Schedule G")
+            self.writeCell(owbCurrSheet, "C5", "Name", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "D5", "Date", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "E5", "Memo", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "F5", "Chk #", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "G5", "Principal", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "H5", "Income", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "A8", "TOTAL", STYLE__BOLD)
+            self.writeCell(owbCurrSheet, "H8", 0, STYLE__FINAL_SUM)
+            self.publishSectionTotal(owbSheetName, 0, "H8")
+            log.info(" INFO: Creating empty sheet for Schedule G")
         else:
             #Dumb copy for now
             self.dumbCopyWithRange(iwbSheetName, owbSheetName, 4, iwbCurrSheet.max_row, keepFormulas=True)
 
             #TODO: Fill in real code here when i know what to do
-            pass
 
-        zprint("##Successfully migrated Schedule G\n")
+            #Summary total is on the TOTAL row, in the last column holding amounts
+            totalRow = self.findLastLabelRow(owbCurrSheet, 1, "total")
+            amountCols = [col for (row, col), cell in owbCurrSheet._cells.items()
+                          if 4 < row < totalRow and isinstance(cell.value, (int, float)) and not isinstance(cell.value, bool)]
+            if totalRow == -1 or len(amountCols) == 0:
+                log.warning("  WARNING: No TOTAL row with amounts found on Schedule G, it is left off the summary page.")
+            else:
+                self.writeSectionTotal(owbSheetName, get_column_letter(max(amountCols)), totalRow, 5, totalRow-1)
+
+        log.info("##Successfully migrated Schedule G\n")
 
         return 0
 
 
+    @profiledStage
     def migrateSchH(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -1995,45 +3919,47 @@ class MigrateExcel:
         if startRowOfAssets == -1 or endRowOfAssets == -1:
             return -1
 
-        # Copy over original contents to start with
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRowOfAssets, endRowOfAssets)
+        # Plan where the original contents go
+        layout = self.planLayout(iwbSheetName, startRowOfAssets, endRowOfAssets)
+        lastInputCol = iwbCurrSheet.max_column
+
+        # Make room for new Carrying Value column in front of the value column
+        layout.insertCol(lastInputCol)
 
-        # Insert new column for Carrying Value column
-        owbCurrSheet.insert_cols(owbCurrSheet.max_column - 1)
+        # Copy over original contents to their final place
+        self.emitLayout(owbSheetName, layout)
 
         # Get column letter for Carrying Value and Market Value columns
-        carryingValueColLetter = get_column_letter(owbCurrSheet.max_column - 2)
-        marketValueColLetter = get_column_letter(owbCurrSheet.max_column - 1)
+        carryingValueColLetter = get_column_letter(lastInputCol)
+        marketValueColLetter = get_column_letter(lastInputCol + 1)
 
         # Write new Value Titles
-        self.writeCell(owbCurrSheet, "%c5" % (carryingValueColLetter), "Carrying Value",
-                       font=Font(bold=True), border=Border(bottom=Side(border_style="thick")))
-        self.writeCell(owbCurrSheet, "%c5" % (marketValueColLetter), "Market Value",
-                       font=Font(bold=True), border=Border(bottom=Side(border_style="thick")))
+        self.writeCell(owbCurrSheet, "%c5" % (carryingValueColLetter), "Carrying Value", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "%c5" % (marketValueColLetter), "Market Value", STYLE__HEADER)
 
         # Traverse data format to set bold and write out formulas
         startColNum = 1
         startRowNum = 5
         startCell = "%c%d" % (get_column_letter(startColNum), startRowNum)
         if owbCurrSheet[startCell].value != "ASSETS":
-            zprint("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
-                   "Please fix this manually.")
+            log.error("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
+                      "Please fix this manually.")
             return -1
         else:
             # Find all column cells with "total" in them except overall total
             listOfTotalCells = list()
-            for col in owbCurrSheet.iter_cols(min_col=1, max_col=owbCurrSheet.max_column - 3):
+            for col in owbCurrSheet.iter_cols(min_col=1, max_col=lastInputCol - 1):
                 for cell in col:
                     if cell is not None and isinstance(cell.value, str):
                         #Hack to replace Checking/Savings with "Cash and Cash Equivalents
-                        cell.value = cell.value.replace("Checking/Savings", "Cash and Cash Equivalents")
+                        self.setCellValue(cell, cell.value.replace("Checking/Savings", "Cash and Cash Equivalents"))
 
                         if cell.value.lower().startswith("total"):
                             totalCellRow = cell.row
                             totalCellCol = cell.column_letter
 
                             # Handle each total section
-                            cell.font = FONT__BOLD
+                            self.styles.apply(cell, STYLE__BOLD)
 
                             # Find start point of this total section
                             prevRow = totalCellRow - 1
@@ -2051,27 +3977,29 @@ class MigrateExcel:
 
                             # Make sure start of data was found
                             if not foundStartOfTotalData:
-                                zprint(
-                                    "ERROR: Failed to find starting row for total cell: %s. Migration incomplete." % (
-                                        cell.value))
+                                log.error("ERROR: Failed to find starting row for total cell: %s. Migration incomplete.", cell.value)
                                 return -1
                             else:
                                 # Set section title to bold
-                                owbCurrSheet["%c%d" % (totalCellCol, startOfTotalSectionRow)].font = FONT__BOLD
+                                self.styleCell(owbCurrSheet, "%c%d" % (totalCellCol, startOfTotalSectionRow), STYLE__BOLD)
 
                                 # Set formula
-                                self.writeCell(owbCurrSheet, "%c%d" % (marketValueColLetter, totalCellRow), "FIX_ME",
-                                               font=FONT__BOLD, border=BORDER__BOLD_ABOVELINE)
+                                self.writeCell(owbCurrSheet, "%c%d" % (marketValueColLetter, totalCellRow), "FIX_ME", STYLE__BOLD_SUBTOTAL)
 
-        # Set number format for money columns
-        for row in range(startRowOfAssets + 1, endRowOfAssets + 1):
-            owbCurrSheet["%c%d" % (carryingValueColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["%c%d" % (marketValueColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
+        #Set number format for money columns
+        self.formatColumnRange(owbCurrSheet, [carryingValueColLetter, marketValueColLetter], startRowOfAssets+1, endRowOfAssets, STYLE__ACCOUNTING)
+
+        #Each total row sums its section, TOTAL ASSETS is the Summary total
+        self.writeSubTotals(owbSheetName, marketValueColLetter, lastInputCol-1, startRowOfAssets, endRowOfAssets)
+        self.writeSectionTotal(owbSheetName, marketValueColLetter, endRowOfAssets, startRowOfAssets+1, endRowOfAssets-1)
 
-        zprint("##Successfully migrated Schedule H\n")
+        self.publishScheduleTable(owbSheetName, 5, firstCol=lastInputCol)
+
+        log.info("##Successfully migrated Schedule H\n")
         return 0
 
     #Same as Beginning Detail code
+    @profiledStage
     def migrateSchHDetail(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -2083,38 +4011,30 @@ class MigrateExcel:
         ########################
         ## Write table header ##
         ########################
-        self.writeCell(owbCurrSheet, "B5", "QTY", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "C5", "Investment", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "D5", "Carrying Value", font=Font(bold=True))
-        self.writeCell(owbCurrSheet, "E5", "Market Value", font=Font(bold=True))
-
-        #Set cells to have thick bottom border
-        owbCurrSheet["B5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["C5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["D5"].border = Border(bottom=Side(border_style="thick"))
-        owbCurrSheet["E5"].border = Border(bottom=Side(border_style="thick"))
+        self.writeCell(owbCurrSheet, "B5", "QTY", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "C5", "Investment", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "D5", "Carrying Value", STYLE__HEADER)
+        self.writeCell(owbCurrSheet, "E5", "Market Value", STYLE__HEADER)
 
         ##############################################
         ##  Find row range of table for input data  ##
         ##############################################
         startRowOfData = -1
         endRowOfInventory = -1
-        for i in range(1, iwbCurrSheet.max_row):
-            colData = iwbCurrSheet["B%d" % (i)].value
-            #zprint("colData: %s" % (colData))
-            if colData is None:
-                continue
 
-            if colData.lower() == "inventory":
-                startRowOfData = i+1
-                print_debug("(migrateSchHDetail) Inventory starts on row %d" % (startRowOfData))
-            if colData.lower() == "total inventory":
-                endRowOfInventory = i-1
-                print_debug("(migrateSchHDetail) End of inventory starts on row %d" % (endRowOfInventory))
+        inventoryRow = self.findLastLabelRow(iwbCurrSheet, 2, "inventory")
+        if inventoryRow != -1:
+            startRowOfData = inventoryRow+1
+            log.debug("(migrateSchHDetail) Inventory starts on row %d", startRowOfData)
+
+        totalInventoryRow = self.findLastLabelRow(iwbCurrSheet, 2, "total inventory")
+        if totalInventoryRow != -1:
+            endRowOfInventory = totalInventoryRow-1
+            log.debug("(migrateSchHDetail) End of inventory starts on row %d", endRowOfInventory)
 
         #Make sure data is extracted properly
         if startRowOfData == -1 or endRowOfInventory == -1:
-            zprint("ERROR: (migrateSchHDetail) Failed to extract start and end rows for data on sheet %s" % (iwbSheetName))
+            log.error("ERROR: (migrateSchHDetail) Failed to extract start and end rows for data on sheet %s", iwbSheetName)
             return -1
 
         finalTotalRow = endRowOfInventory+1
@@ -2128,48 +4048,44 @@ class MigrateExcel:
         assetValueCol = self.getColNumByString(4, "Asset Value", iwbSheetName=iwbSheetName)
 
         if onHandCol == -1:
-            zprint("ERROR: Unable to find On Hand column from input sheet %s." % (iwbSheetName))
+            log.error("ERROR: Unable to find On Hand column from input sheet %s.", iwbSheetName)
             return -1
 
         if assetValueCol == -1:
-            zprint("ERROR: Unable to find Asset Value column from input sheet %s." % (iwbSheetName))
+            log.error("ERROR: Unable to find Asset Value column from input sheet %s.", iwbSheetName)
             return -1
 
         for i in range(startRowOfData, finalTotalRow):
             #Copy investments
-            owbCurrSheet["C%d" % i].value = iwbCurrSheet["C%d" % i].value
+            self.setCellValue(owbCurrSheet["C%d" % i], iwbCurrSheet["C%d" % i].value)
 
             #Copy On Hand -> QTY
-            owbCurrSheet["B%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(onHandCol), i)].value
-            owbCurrSheet["B%d" % i].number_format = NUMBER_FORMAT__STANDARD
+            self.setCellValue(owbCurrSheet["B%d" % i], iwbCurrSheet["%c%d" % (get_column_letter(onHandCol), i)].value)
 
             #Copy Asset Value -> Carrying Value
-            owbCurrSheet["D%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value
+            self.setCellValue(owbCurrSheet["D%d" % i], iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value)
             #owbCurrSheet["D%d" % i].font = Font(color='00FF0000')
-            owbCurrSheet["D%d" % i].number_format = NUMBER_FORMAT__ACCOUNTING
 
             #Copy Asset Value -> Market Value -- Set value to 0 instead
             #owbCurrSheet["E%d" % i].value = iwbCurrSheet["%c%d" % (get_column_letter(assetValueCol), i)].value
-            owbCurrSheet["E%d" % i].value = 0
-            owbCurrSheet["E%d" % i].number_format = NUMBER_FORMAT__ACCOUNTING
+            self.setCellValue(owbCurrSheet["E%d" % i], 0)
 
+        self.formatColumnRange(owbCurrSheet, ["B"], startRowOfData, finalTotalRow-1, STYLE__STANDARD)
+        self.formatColumnRange(owbCurrSheet, ["D", "E"], startRowOfData, finalTotalRow-1, STYLE__ACCOUNTING)
 
         ##########################
         ##   Write Final Row    ##
         ##########################
-        self.writeCell(owbCurrSheet, "A%d" % finalTotalRow, "TOTAL", font=Font(bold=True))
+        self.writeCell(owbCurrSheet, "A%d" % finalTotalRow, "TOTAL", STYLE__BOLD)
+        self.writeCell(owbCurrSheet, "D%d" % finalTotalRow, "=ROUND(SUM(D%d:D%d),5)" % (startRowOfData, endRowOfInventory), STYLE__FINAL_SUM)
+        self.writeCell(owbCurrSheet, "E%d" % finalTotalRow, "=ROUND(SUM(E%d:E%d),5)" % (startRowOfData, endRowOfInventory), STYLE__FINAL_SUM)
 
-        self.writeCell(owbCurrSheet, "D%d" % finalTotalRow, "=ROUND(SUM(D%d:D%d),5)" % (startRowOfData, endRowOfInventory), font=Font(bold=True))
-        owbCurrSheet["D%d" % finalTotalRow].number_format = NUMBER_FORMAT__ACCOUNTING
-        owbCurrSheet["D%d" % finalTotalRow].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
+        self.publishScheduleTable(owbSheetName, 5, firstCol=2)
 
-        self.writeCell(owbCurrSheet, "E%d" % finalTotalRow, "=ROUND(SUM(E%d:E%d),5)" % (startRowOfData, endRowOfInventory), font=Font(bold=True))
-        owbCurrSheet["E%d" % finalTotalRow].number_format = NUMBER_FORMAT__ACCOUNTING
-        owbCurrSheet["E%d" % finalTotalRow].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
-
-        zprint("##Successfully migrated Schedule H Detail\n")
+        log.info("##Successfully migrated Schedule H Detail\n")
         return 0
 
+    @profiledStage
     def migrateMarketValue(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -2184,40 +4100,44 @@ class MigrateExcel:
         if startRowOfAssets == -1 or endRowOfAssets == -1:
             return -1
 
-        #Copy over original contents to start with
-        self.dumbCopyWithRange(iwbSheetName, owbSheetName, startRowOfAssets-1, endRowOfAssets, keepFormulas=True)
+        #Plan where the original contents go
+        layout = self.planLayout(iwbSheetName, startRowOfAssets-1, endRowOfAssets)
+        lastInputCol = iwbCurrSheet.max_column
 
         #Clear out title row contents
-        owbCurrSheet.delete_rows(3)
-        owbCurrSheet.insert_rows(3)
+        layout.deleteRow(3)
+        layout.insertRow(3)
+
+        #Copy over original contents to their final place
+        self.emitLayout(owbSheetName, layout, keepFormulas=True)
 
         #Get column letter for start and end dates
-        startDateColLetter = get_column_letter(owbCurrSheet.max_column-1)
-        endDateColLetter = get_column_letter(owbCurrSheet.max_column)
+        startDateColLetter = get_column_letter(lastInputCol-1)
+        endDateColLetter = get_column_letter(lastInputCol)
 
         #Traverse data format to set bold and write out formulas
         startColNum = 1
         startRowNum = 6
         startCell = "%c%d" % (get_column_letter(startColNum), startRowNum)
         if owbCurrSheet[startCell].value != "ASSETS":
-            zprint("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
-                   "Please fix this manually.")
+            log.error("ERROR: Failed to fix formulas and bolding because cell A5 did not contain \"ASSETS\". "
+                      "Please fix this manually.")
             return -1
         else:
             #Find all column cells with "total" in them except overall total
             listOfTotalCells = list()
-            for col in owbCurrSheet.iter_cols(min_col=1, max_col=owbCurrSheet.max_column-3):
+            for col in owbCurrSheet.iter_cols(min_col=1, max_col=lastInputCol-3):
                 for cell in col:
                     if cell is not None and isinstance(cell.value, str):
                         #Hack to replace Checking/Savings with "Cash and Cash Equivalents
-                        cell.value = cell.value.replace("Checking/Savings", "Cash and Cash Equivalents")
+                        self.setCellValue(cell, cell.value.replace("Checking/Savings", "Cash and Cash Equivalents"))
 
                         if cell.value.lower().startswith("total"):
                             totalCellRow = cell.row
                             totalCellCol = cell.column_letter
 
                             #Handle each total section
-                            cell.font = FONT__BOLD
+                            self.styles.apply(cell, STYLE__BOLD)
 
                             #Find start point of this total section
                             prevRow = totalCellRow - 1
@@ -2235,32 +4155,30 @@ class MigrateExcel:
 
                             #Make sure start of data was found
                             if not foundStartOfTotalData:
-                                zprint("ERROR: Failed to find starting row for total cell: %s. Migration incomplete." % (cell.value))
+                                log.error("ERROR: Failed to find starting row for total cell: %s. Migration incomplete.", cell.value)
                                 return -1
                             else:
                                 #Set section title to bold
-                                owbCurrSheet["%c%d" % (totalCellCol, startOfTotalSectionRow)].font = FONT__BOLD
+                                self.styleCell(owbCurrSheet, "%c%d" % (totalCellCol, startOfTotalSectionRow), STYLE__BOLD)
 
                                 #Set SUM cells to bold formatting
-                                owbCurrSheet["%c%d" % (startDateColLetter, totalCellRow)].border = BORDER__BOLD_ABOVELINE
-                                owbCurrSheet["%c%d" % (startDateColLetter, totalCellRow)].font = FONT__BOLD
-
-                                owbCurrSheet["%c%d" % (endDateColLetter, totalCellRow)].border = BORDER__BOLD_ABOVELINE
-                                owbCurrSheet["%c%d" % (endDateColLetter, totalCellRow)].font = FONT__BOLD
+                                self.styleCell(owbCurrSheet, "%c%d" % (startDateColLetter, totalCellRow), STYLE__BOLD_SUBTOTAL)
+                                self.styleCell(owbCurrSheet, "%c%d" % (endDateColLetter, totalCellRow), STYLE__BOLD_SUBTOTAL)
 
         #Fix Total Assets border formatting
-        owbCurrSheet["%c%d" % (startDateColLetter, endRowOfAssets)].border = BORDER__FINAL_SUM
-        owbCurrSheet["%c%d" % (endDateColLetter, endRowOfAssets)].border = BORDER__FINAL_SUM
+        self.styleCell(owbCurrSheet, "%c%d" % (startDateColLetter, endRowOfAssets), STYLE__FINAL_SUM)
+        self.styleCell(owbCurrSheet, "%c%d" % (endDateColLetter, endRowOfAssets), STYLE__FINAL_SUM)
 
         #Set number format for money columns
-        for row in range(startRowOfAssets+1, endRowOfAssets+1):
-            owbCurrSheet["%c%d" % (startDateColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["%c%d" % (endDateColLetter, row)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.formatColumnRange(owbCurrSheet, [startDateColLetter, endDateColLetter], startRowOfAssets+1, endRowOfAssets, STYLE__ACCOUNTING)
+
+        self.publishScheduleTable(owbSheetName, 5, firstCol=lastInputCol-1)
 
-        zprint("##Successfully migrated Market Value\n")
+        log.info("##Successfully migrated Market Value\n")
         return 0
 
     # Filled in dummy page -- ??
+    @profiledStage
     def migrateLiability(self, iwbSheetName, owbSheetName):
         #Create new sheet in output workbook
         owbCurrSheet = self.owb.create_sheet(title=owbSheetName)
@@ -2272,18 +4190,16 @@ class MigrateExcel:
         #Create empty sheet for now
         rowThresholdToBeEmpty = 6
         if iwbCurrSheet.max_row < rowThresholdToBeEmpty:
-            zprint("  INFO: Creating empty sheet for Lability page beacuse row count is < %d" % (rowThresholdToBeEmpty))
-            self.writeCell(owbCurrSheet, "C5", "Name", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "D5", "Date", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "E5", "Chk #", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "F5", "Amount", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "G5", "Balance", font=FONT__BOLD, border=BORDER__BOLD_UNDERLINE)
-            self.writeCell(owbCurrSheet, "A8", "TOTAL", font=FONT__BOLD)
-            self.writeCell(owbCurrSheet, "F8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-            self.writeCell(owbCurrSheet, "G8", 0, font=FONT__BOLD, border=BORDER__FINAL_SUM)
-            owbCurrSheet["F8"].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet["G8"].number_format = NUMBER_FORMAT__ACCOUNTING
-            owbCurrSheet.insert_cols(2)
+            log.info("  INFO: Creating empty sheet for Lability page beacuse row count is < %d", rowThresholdToBeEmpty)
+            #Written one column to the right of the data layout, leaving column B empty
+            self.writeCell(owbCurrSheet, "D5", "Name", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "E5", "Date", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "F5", "Chk #", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "G5", "Amount", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "H5", "Balance", STYLE__HEADER)
+            self.writeCell(owbCurrSheet, "A8", "TOTAL", STYLE__BOLD)
+            self.writeCell(owbCurrSheet, "G8", 0, STYLE__FINAL_SUM)
+            self.writeCell(owbCurrSheet, "H8", 0, STYLE__FINAL_SUM)
         else:
             #Dumb copy for now
             self.dumbCopyWithRange(iwbSheetName, owbSheetName, 4, iwbCurrSheet.max_row, keepFormulas=True)
@@ -2291,11 +4207,12 @@ class MigrateExcel:
             # TODO: Fill in real code here when i know what to do
             pass
 
-        zprint("##Successfully migrated Liability\n")
+        log.info("##Successfully migrated Liability\n")
 
         return 0
 
     #Creates summary page, nothing else yet
+    @profiledStage
     def createSummaryPage(self):
         owbCurrSheet = self.owb["Sheet"]
         owbCurrSheet.title = "Summary"
@@ -2320,92 +4237,600 @@ class MigrateExcel:
             if year > 2000 or year < 2100:
                 date = "January %d through December %d" % (year-1, year)
         except:
-            print("  WARNING: Unable to detect date range for summary page.")
+            log.warning("  WARNING: Unable to detect date range for summary page.")
 
 
 
         #Merge first %c columns of first three rows
         titleColWidth = 'D'
         for i in range(1,4):
-            print_debug("  Column widths to merge for Summary page: A%d:%c%d" % (i, titleColWidth, i))
+            log.debug("  Column widths to merge for Summary page: A%d:%c%d", i, titleColWidth, i)
             owbCurrSheet.merge_cells("A%d:%c%d" % (i, titleColWidth, i))
 
         #Write first 3 title lines to page
-        self.writeCell(owbCurrSheet, "A1", title1, font=Font(bold=True, size=12), alignment=Alignment(horizontal="center"))
-        self.writeCell(owbCurrSheet, "A2", title2, font=Font(bold=True, size=16), alignment=Alignment(horizontal="center"))
-        self.writeCell(owbCurrSheet, "A3", date, font=Font(bold=True, size=11), alignment=Alignment(horizontal="center"))
+        self.writeCell(owbCurrSheet, "A1", title1, STYLE__TITLE_1)
+        self.writeCell(owbCurrSheet, "A2", title2, STYLE__SUMMARY_TITLE_2)
+        self.writeCell(owbCurrSheet, "A3", date, STYLE__TITLE_3)
 
         #Write row section titles
         chargesRowNum, numOfChargeLines = 5, 5
         creditsRowNum, numOfCreditLines = 14, 5
-        self.writeCell(owbCurrSheet, "B%d"%chargesRowNum, "CHARGES", font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "B%d"%(chargesRowNum+numOfChargeLines+1), "TOTAL CHARGES:", font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "B%d"%creditsRowNum, "CREDITS", font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "B%d"%(creditsRowNum+numOfCreditLines+1), "TOTAL CREDITS:", font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
+        self.writeCell(owbCurrSheet, "B%d"%chargesRowNum, "CHARGES", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "B%d"%(chargesRowNum+numOfChargeLines+1), "TOTAL CHARGES:", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "B%d"%creditsRowNum, "CREDITS", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "B%d"%(creditsRowNum+numOfCreditLines+1), "TOTAL CREDITS:", STYLE__SUMMARY_LABEL)
 
         #Write Charges section contents
-        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+1), "Property on Hand at Beginning of Account (or Inventories)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+2), "Additional Property Received (or Supplemental Inventories)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+3), "Receipts (Schedule A)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+4), "Gains on Sales or Other Dispositions (Schedule B)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+5), "Net Income from Trade or Business (Schedule C)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
+        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+1), "Property on Hand at Beginning of Account (or Inventories)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+2), "Additional Property Received (or Supplemental Inventories)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+3), "Receipts (Schedule A)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+4), "Gains on Sales or Other Dispositions (Schedule B)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(chargesRowNum+5), "Net Income from Trade or Business (Schedule C)", STYLE__SUMMARY_LABEL)
 
         #Write Credits section contents
-        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+1), "Disbursement (Schedule D)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+2), "Losses on Sales or Other Dispositions (Schedule E)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+3), "Net Loss from Trade or Business (Schedule F)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+4), "Distributions (Schedule G)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+5), "Property on Hand at Close of Account (Schedule H)",
-                  font=Font(bold=True, size=11), alignment=Alignment(horizontal="left"))
-
-        #TODO: Get values of each row from other pages
+        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+1), "Disbursement (Schedule D)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+2), "Losses on Sales or Other Dispositions (Schedule E)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+3), "Net Loss from Trade or Business (Schedule F)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+4), "Distributions (Schedule G)", STYLE__SUMMARY_LABEL)
+        self.writeCell(owbCurrSheet, "C%d"%(creditsRowNum+5), "Property on Hand at Close of Account (Schedule H)", STYLE__SUMMARY_LABEL)
+
+        #Reference the section totals published by the migrators, each linked to the cell on its sheet.
+        # The published total is the value saved with the reference.
+        summaryLines = [(chargesRowNum+1, ["Beginning", "Additional", "Sch A", "Sch B", "Sch C"]),
+                        (creditsRowNum+1, ["Sch D", "Sch E", "Sch F", "Sch G", "Sch H"])]
+        linkedValues = self.linkedValues.setdefault(owbCurrSheet.title, dict())
+        for firstRowNum, owbSheetNames in summaryLines:
+            for rowNum, owbSheetName in enumerate(owbSheetNames, firstRowNum):
+                sectionTotal = self.sectionTotals.get(owbSheetName)
+                if sectionTotal is None:
+                    log.warning("  WARNING: No total from %s for the summary page.", owbSheetName)
+                    continue
+
+                total, totalCell = sectionTotal
+                if isinstance(total, bool) or not isinstance(total, (int, float)) or not math.isfinite(total):
+                    log.warning("  WARNING: Total %r from %s is not a number, it is left off the summary page.", total, owbSheetName)
+                    continue
+
+                totalLocation = "'%s'!%s" % (owbSheetName, totalCell)
+                self.writeCell(owbCurrSheet, "D%d" % (rowNum), "=" + totalLocation, STYLE__ACCOUNTING)
+                owbCurrSheet["D%d" % (rowNum)].hyperlink = Hyperlink(ref="D%d" % (rowNum), location=totalLocation)
+                linkedValues["D%d" % (rowNum)] = total
 
         #Create summary cell for Charges
-        self.writeCell(owbCurrSheet, "D%d"%(chargesRowNum+numOfChargeLines+1), "=SUM(D%d:D%d)" % (chargesRowNum+1, chargesRowNum+numOfChargeLines))
-        owbCurrSheet["D%d"%(chargesRowNum+numOfChargeLines+1)].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
-        owbCurrSheet["D%d"%(chargesRowNum+numOfChargeLines+1)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.writeCell(owbCurrSheet, "D%d"%(chargesRowNum+numOfChargeLines+1), "=SUM(D%d:D%d)" % (chargesRowNum+1, chargesRowNum+numOfChargeLines),
+                       STYLE__SUMMARY_TOTAL)
 
         # Create summary cell for Credits
-        self.writeCell(owbCurrSheet, "D%d"%(creditsRowNum+numOfCreditLines+1), "=SUM(D%d:D%d)" % (creditsRowNum+1, creditsRowNum+numOfCreditLines))
-        owbCurrSheet["D%d"%(creditsRowNum+numOfCreditLines+1)].border = Border(top=Side(border_style="thick"), bottom=Side(border_style="double"))
-        owbCurrSheet["D%d"%(creditsRowNum+numOfCreditLines+1)].number_format = NUMBER_FORMAT__ACCOUNTING
+        self.writeCell(owbCurrSheet, "D%d"%(creditsRowNum+numOfCreditLines+1), "=SUM(D%d:D%d)" % (creditsRowNum+1, creditsRowNum+numOfCreditLines),
+                       STYLE__SUMMARY_TOTAL)
+
+
+################################
+#       Conversion Cache       #
+################################
+#Hash of this file, part of every cache key so a changed converter never serves stale outputs
+converterSourceHash = None
+
+def hashFile(path):
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as hashedFile:
+        for chunk in iter(lambda: hashedFile.read(1024 * 1024), b""):
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+def converterFingerprint():
+    #Converter version plus a hash of this file, so a changed converter never reuses old outputs
+    global converterSourceHash
+    if converterSourceHash is None:
+        converterSourceHash = hashFile(os.path.abspath(__file__))
+    return "%s-%s" % (CONVERTER_VERSION, converterSourceHash)
+
+def defaultCacheDir():
+    if "LOCALAPPDATA" in os.environ:
+        return os.path.join(os.environ["LOCALAPPDATA"], "excelConverter", "cache")
+    return os.path.join(os.path.expanduser("~"), ".cache", "excelConverter")
+
+class PreviousConversion:
+    #Input sheet fingerprints behind the last output workbook of one input file, kept with the conversion cache.
+    # Lets an incremental conversion reuse the output sheets whose input sheet did not change.
+    def __init__(self, stateDir, inputWorkbookPath):
+        os.makedirs(stateDir, exist_ok=True)
+        pathHash = hashlib.sha256(os.path.normcase(os.path.abspath(inputWorkbookPath)).encode()).hexdigest()
+        self.statePath = os.path.join(stateDir, pathHash + ".json")
+
+        self.outputPath = None
+        self.sheets = dict()
+        self.outputWorkbook = None
 
+        try:
+            with open(self.statePath) as stateFile:
+                state = json.load(stateFile)
+        except (OSError, ValueError):
+            return
+
+        #Outputs of another converter version, or ones that were moved, deleted or edited since, cant be reused
+        if state.get("converter") != converterFingerprint():
+            return
+        try:
+            if hashFile(state["output"]) != state.get("outputHash"):
+                log.info("Previous output %s changed since it was written, migrating every sheet again", state["output"])
+                return
+        except OSError:
+            return
+        self.outputPath = state["output"]
+        self.sheets = state["sheets"]
+
+    def reusableSheet(self, owbSheetName, fingerprint):
+        previousSheet = self.sheets.get(owbSheetName)
+        return previousSheet is not None and previousSheet["fingerprint"] == fingerprint and previousSheet["status"] == 0
+
+    def sectionTotals(self, owbSheetName):
+        #Summary totals the sheets of this migration published last time, {output sheet name: (total, cell)}
+        previousTotals = self.sheets[owbSheetName].get("totals", dict())
+        return {sheetName: tuple(entry) for sheetName, entry in previousTotals.items()}
+
+    def getOutputSheet(self, owbSheetName):
+        #Previous output is only parsed when a sheet is actually reused
+        if self.outputWorkbook is None:
+            loadOpenpyxl()
+            self.outputWorkbook = load_workbook(self.outputPath)
+        if owbSheetName not in self.outputWorkbook.sheetnames:
+            return None
+        return self.outputWorkbook[owbSheetName]
+
+    def save(self, outputPath, sheets):
+        state = {"converter": converterFingerprint(), "output": os.path.abspath(outputPath), "outputHash": hashFile(outputPath),
+                 "sheets": sheets}
+        tempPath = self.statePath + ".tmp"
+        with open(tempPath, "w") as stateFile:
+            json.dump(state, stateFile, indent=2)
+        os.replace(tempPath, self.statePath)
+
+class ConversionCache:
+    #Persistent cache of finished conversions keyed by the input file's content hash and the converter version.
+    # Each entry is a directory holding the output workbook and the conversion report.
+    OUTPUT_NAME = "output.xlsx"
+    REPORT_NAME = "report.json"
+
+    def __init__(self, cacheDir=None, maxBytes=CACHE_MAX_BYTES, maxAgeDays=CACHE_MAX_AGE_DAYS):
+        self.cacheDir = cacheDir or defaultCacheDir()
+        self.maxBytes = maxBytes
+        self.maxAgeDays = maxAgeDays
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+    def keyFor(self, inputWorkbookPath):
+        key = hashlib.sha256()
+        key.update(hashFile(inputWorkbookPath).encode())
+        key.update(converterFingerprint().encode())
+        return key.hexdigest()
+
+    def lookup(self, key):
+        #Returns (cached output path, report) or None
+        entryDir = os.path.join(self.cacheDir, key)
+        outputPath = os.path.join(entryDir, self.OUTPUT_NAME)
+        reportPath = os.path.join(entryDir, self.REPORT_NAME)
+        try:
+            with open(reportPath) as reportFile:
+                report = json.load(reportFile)
+            if not os.path.exists(outputPath):
+                return None
+
+            #Report mtime is the entry's last use, eviction drops the least recently used first
+            os.utime(reportPath)
+        except (OSError, ValueError):
+            return None
+
+        return outputPath, report
+
+    def store(self, key, outputPath, report):
+        entryDir = os.path.join(self.cacheDir, key)
+        if os.path.exists(entryDir):
+            return
+
+        #Build the entry next to its final place and rename it in, parallel batch workers may race on the same key
+        tempDir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cacheDir)
+        try:
+            shutil.copyfile(outputPath, os.path.join(tempDir, self.OUTPUT_NAME))
+            with open(os.path.join(tempDir, self.REPORT_NAME), "w") as reportFile:
+                json.dump(report, reportFile, indent=2)
+            os.rename(tempDir, entryDir)
+        except OSError:
+            shutil.rmtree(tempDir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self):
+        #Drop entries not used for maxAgeDays, then the least recently used ones until the cache fits in maxBytes
+        now = time.time()
+        maxAgeSeconds = self.maxAgeDays * 24 * 60 * 60
+
+        entries = list()
+        for name in os.listdir(self.cacheDir):
+            entryDir = os.path.join(self.cacheDir, name)
+            try:
+                if name.startswith(".tmp_"):
+                    #Left behind by a killed conversion
+                    if now - os.path.getmtime(entryDir) > 24 * 60 * 60:
+                        shutil.rmtree(entryDir, ignore_errors=True)
+                    continue
+
+                lastUsed = os.path.getmtime(os.path.join(entryDir, self.REPORT_NAME))
+                size = sum(os.path.getsize(os.path.join(entryDir, fileName)) for fileName in os.listdir(entryDir))
+            except OSError:
+                continue
+
+            if now - lastUsed > maxAgeSeconds:
+                shutil.rmtree(entryDir, ignore_errors=True)
+            else:
+                entries.append((lastUsed, size, entryDir))
+
+        totalBytes = sum(size for lastUsed, size, entryDir in entries)
+        for lastUsed, size, entryDir in sorted(entries):
+            if totalBytes <= self.maxBytes:
+                break
+            shutil.rmtree(entryDir, ignore_errors=True)
+            totalBytes -= size
+
+
+################################
+#        Schedule Export       #
+################################
+SQLITE_COLUMN_TYPES = {"integer": "INTEGER", "number": "REAL", "date": "TEXT", "text": "TEXT"}
+
+def sqlTableName(scheduleName):
+    #"Sch H Detail" -> sch_h_detail
+    return re.sub(r"\W+", "_", scheduleName.strip()).strip("_").lower()
+
+def quoteSqlName(name):
+    return '"%s"' % (name.replace('"', '""'))
+
+def exportCsv(tables, basePath):
+    #One <schedule>.csv per table in <output>_export, dates in ISO format
+    exportDir = basePath + "_export"
+    os.makedirs(exportDir, exist_ok=True)
+
+    paths = list()
+    for table in tables:
+        path = os.path.join(exportDir, table.name + ".csv")
+        with open(path, "w", newline="", encoding="utf-8") as csvFile:
+            writer = csv.writer(csvFile)
+            writer.writerow(table.columnNames())
+            writer.writerows(table.exportRows())
+        paths.append(path)
+    return paths
+
+def exportSqlite(tables, basePath):
+    #One table per schedule in <output>.sqlite, tables of an earlier export of the same output are replaced
+    import sqlite3
+
+    path = basePath + ".sqlite"
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            for table in tables:
+                tableName = quoteSqlName(sqlTableName(table.name))
+                columns = ", ".join("%s %s" % (quoteSqlName(columnName), SQLITE_COLUMN_TYPES[columnType])
+                                    for columnName, columnType in table.columns)
+                connection.execute("DROP TABLE IF EXISTS %s" % (tableName))
+                connection.execute("CREATE TABLE %s (%s)" % (tableName, columns))
+                connection.executemany("INSERT INTO %s VALUES (%s)" % (tableName, ", ".join("?" * len(table.columns))),
+                                       table.exportRows())
+    except sqlite3.Error as e:
+        raise OSError("SQLite export failed: %s" % (str(e)))
+    finally:
+        connection.close()
+    return [path]
+
+def exportParquet(tables, basePath):
+    #One <schedule>.parquet per table in <output>_export, needs pyarrow
+    if loadPyarrow() is None:
+        log.warning("WARNING: pyarrow is not installed, skipping Parquet export")
+        return []
+
+    arrowTypes = {"integer": pyarrow.int64(), "number": pyarrow.float64(), "date": pyarrow.timestamp("us"), "text": pyarrow.string()}
+    exportDir = basePath + "_export"
+    os.makedirs(exportDir, exist_ok=True)
+
+    paths = list()
+    for table in tables:
+        arrays = list()
+        for index, (columnName, columnType) in enumerate(table.columns):
+            values = [row[index] for row in table.rows]
+            if columnType == "number":
+                values = [float(value) if value is not None else None for value in values]
+            elif columnType == "date":
+                values = [datetime.datetime.combine(value, datetime.time()) if type(value) is datetime.date else value for value in values]
+            arrays.append(pyarrow.array(values, type=arrowTypes[columnType]))
+
+        path = os.path.join(exportDir, table.name + ".parquet")
+        pyarrow.parquet.write_table(pyarrow.Table.from_arrays(arrays, names=table.columnNames()), path)
+        paths.append(path)
+    return paths
+
+#Export format -> sink writing the schedule tables next to the output workbook, returns the paths written
+EXPORT_SINKS = {
+    "csv":      exportCsv,
+    "sqlite":   exportSqlite,
+    "parquet":  exportParquet,
+}
+
+################################
+#      Headless Batch Mode     #
+################################
+def convertWorkbook(inputWorkbookPath, verbose=False, streamOutput=False, profile=False, profileTable=False, traceMemory=False, sheetWorkers=1,
+                    useCache=False, cacheDir=None, cacheMaxBytes=CACHE_MAX_BYTES, cacheMaxAgeDays=CACHE_MAX_AGE_DAYS, incremental=False,
+                    logLevel=LOG_LEVEL__INFO, logFile=False, fastReader=False, exportFormats=()):
+    #Runs one full conversion without any GUI interaction. Module level so process pool workers can pickle it.
+    result = {"input": inputWorkbookPath, "output": None, "success": False, "seconds": 0.0, "cached": False,
+              "failedSheets": [], "unknownSheets": [], "errors": [], "profileReport": None, "profileTable": None,
+              "log": None, "logFile": None, "exports": []}
+
+    startTime = time.perf_counter()
+
+    #An identical input converted by this converter version before only needs its output copied.
+    # Exports are made from the migrated sheets, so they always convert.
+    cache = None
+    profiling = profile or profileTable or traceMemory
+    if useCache and not profiling and not logFile and not exportFormats:
+        try:
+            cache = ConversionCache(cacheDir, cacheMaxBytes, cacheMaxAgeDays)
+            cacheKey = cache.keyFor(inputWorkbookPath)
+            cachedEntry = cache.lookup(cacheKey)
+        except OSError as e:
+            result["errors"].append("WARNING: Conversion cache unavailable: %s" % (str(e)))
+            cache = None
+            cachedEntry = None
+
+        if cachedEntry is not None:
+            cachedOutputPath, report = cachedEntry
+            outputPath = uniqueOutputPath(defaultOutputPath(inputWorkbookPath))
+            try:
+                shutil.copyfile(cachedOutputPath, outputPath)
+                result.update(success=True, cached=True, output=outputPath, failedSheets=report["failedSheets"],
+                              unknownSheets=report["unknownSheets"], errors=report["errors"])
+                result["seconds"] = time.perf_counter() - startTime
+                return result
+            except OSError as e:
+                result["errors"].append("WARNING: Failed to copy cached output, converting again: %s" % (str(e)))
+
+    #Buffered so conversions in parallel workers do not interleave on the console, runBatch prints it when asked for
+    with activeLog(ConversionLog(logLevel, buffered=True)) as conversionLog:
+        try:
+            profiler = None
+            if profiling:
+                profiler = StageProfiler(traceMemory)
+
+            incrementalStateDir = None
+            if incremental and not exportFormats:
+                incrementalStateDir = os.path.join(cacheDir or defaultCacheDir(), "incremental")
+
+            migrateExcel = MigrateExcel(inputWorkbookPath, streamOutput, profiler, sheetWorkers, incrementalStateDir, fastReader,
+                                        exportTables=bool(exportFormats))
+            migrateExcel.openIWB()
+            migrateExcel.openIWB_dataOnly()
+            migrateExcel.openOWB()
+            migrateExcel.extractSheetNameMappings()
+            migrateExcel.startMigration()
+            migrateExcel.finalPolishing()
+
+            if migrateExcel.writeOWB(openOutputFolder=False) == 0:
+                result["success"] = True
+                result["output"] = migrateExcel.owb_path
+                if exportFormats:
+                    result["exports"] = migrateExcel.writeExports(exportFormats)
+
+            result["failedSheets"] = list(migrateExcel.migrationFailedSheets)
+            result["unknownSheets"] = list(migrateExcel.unknownInputSheetNames)
+
+            if profiler is not None:
+                result["profileReport"] = migrateExcel.writeProfileReport()
+                if profileTable:
+                    result["profileTable"] = profiler.formatTable()
+        except SystemExit:
+            #extractSheetNameMappings exits when the sheets cant be mapped
+            result["errors"].append("Conversion aborted, input sheets could not be mapped")
+        except Exception as e:
+            result["errors"].append("Fatal error: %s" % (str(e)))
+
+    for message in conversionLog.messages(LOG_LEVEL__ERROR):
+        result["errors"].append(message.strip())
+
+    if verbose:
+        result["log"] = conversionLog.formatText()
+    if logFile:
+        result["logFile"] = os.path.splitext(result["output"] or defaultOutputPath(inputWorkbookPath))[0] + "_log.txt"
+        try:
+            conversionLog.writeFile(result["logFile"])
+        except OSError as e:
+            result["errors"].append("WARNING: Failed to write log file: %s" % (str(e)))
+            result["logFile"] = None
+
+    if cache is not None and result["success"]:
+        report = {"input": inputWorkbookPath, "converterVersion": CONVERTER_VERSION, "created": datetime.datetime.now().isoformat(),
+                  "failedSheets": result["failedSheets"], "unknownSheets": result["unknownSheets"], "errors": result["errors"]}
+        try:
+            cache.store(cacheKey, result["output"], report)
+        except OSError as e:
+            result["errors"].append("WARNING: Failed to store conversion in cache: %s" % (str(e)))
+
+    result["seconds"] = time.perf_counter() - startTime
+    return result
+
+def collectInputWorkbooks(inputs, recursive=False):
+    #Expand files, directories and glob patterns into a sorted, de-duplicated list of workbooks
+    workbookPaths = list()
+    for inputPath in inputs:
+        if os.path.isdir(inputPath):
+            if recursive:
+                candidates = glob.glob(os.path.join(inputPath, "**", "*.xls*"), recursive=True)
+            else:
+                candidates = glob.glob(os.path.join(inputPath, "*.xls*"))
+        elif os.path.isfile(inputPath):
+            #Explicitly named files are always converted
+            workbookPaths.append(os.path.abspath(inputPath))
+            continue
+        else:
+            candidates = glob.glob(inputPath, recursive=recursive)
+            if len(candidates) == 0:
+                log.warning("WARNING: No files found for input: %s", inputPath)
+
+        #Skip our own outputs and Excel lock files when scanning folders and globs
+        candidates = [c for c in candidates if not os.path.basename(c).startswith(("final_", "~$"))]
+
+        for candidate in candidates:
+            name, ext = os.path.splitext(candidate)
+            if "xls" in ext.lower() and os.path.isfile(candidate):
+                workbookPaths.append(os.path.abspath(candidate))
+
+    return sorted(set(workbookPaths))
+
+def printConversionLog(result):
+    #Verbose conversion logs are printed in one piece as each workbook finishes
+    if result["log"]:
+        log.info("\n### LOG: %s ###", result["input"])
+        log.info(result["log"].rstrip("\n"))
+
+def runBatch(workbookPaths, workers=None, **conversionOptions):
+    #conversionOptions are passed through to convertWorkbook
+    log.info("Converting %d workbooks using %s worker processes..", len(workbookPaths), workers or os.cpu_count())
+    batchStartTime = time.perf_counter()
+
+    results = list()
+    if workers == 1:
+        #Run in this process, handy for debugging
+        for workbookPath in workbookPaths:
+            results.append(convertWorkbook(workbookPath, **conversionOptions))
+            printConversionLog(results[-1])
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futureToPath = dict()
+            for workbookPath in workbookPaths:
+                futureToPath[executor.submit(convertWorkbook, workbookPath, **conversionOptions)] = workbookPath
+
+            for future in concurrent.futures.as_completed(futureToPath):
+                try:
+                    results.append(future.result())
+                    printConversionLog(results[-1])
+                except Exception as e:
+                    #Worker process died, report it like any other failure
+                    results.append({"input": futureToPath[future], "output": None, "success": False, "seconds": 0.0, "cached": False,
+                                    "failedSheets": [], "unknownSheets": [], "errors": ["Worker failed: %s" % (str(e))],
+                                    "profileReport": None, "profileTable": None, "log": None, "logFile": None, "exports": []})
+
+    #Print per file summary
+    log.info("\n### BATCH SUMMARY ###")
+    numFailed = 0
+    for result in sorted(results, key=lambda r: r["input"]):
+        if result["success"]:
+            status = "OK"
+            if result["failedSheets"] or result["unknownSheets"]:
+                status = "PARTIAL"
+        else:
+            status = "FAILED"
+            numFailed += 1
+
+        log.info("  %-7s %8.2fs  %s%s", status, result["seconds"], result["input"], " (cached)" if result["cached"] else "")
+        if result["output"] is not None:
+            log.info("                    -> %s", result["output"])
+        if result["failedSheets"]:
+            log.info("                    Failed sheets: %s", ", ".join(result["failedSheets"]))
+        if result["unknownSheets"]:
+            log.info("                    Unknown sheets: %s", ", ".join(result["unknownSheets"]))
+        if not result["success"]:
+            for error in result["errors"]:
+                log.info("                    %s", error)
+        if result["logFile"] is not None:
+            log.info("                    Log: %s", result["logFile"])
+        for exportPath in result["exports"]:
+            log.info("                    Export: %s", exportPath)
+        if result["profileReport"] is not None:
+            log.info("                    Profile: %s", result["profileReport"])
+        if result["profileTable"] is not None:
+            log.info(result["profileTable"])
+
+    log.info("\nConverted %d of %d workbooks in %.2fs", len(results) - numFailed, len(results), time.perf_counter() - batchStartTime)
+
+    return 1 if numFailed > 0 else 0
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Convert court accounting workbooks. Opens a file picker when no inputs are given.")
+    parser.add_argument("inputs", nargs="*", help="Workbook files, directories or glob patterns to convert")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Search directories and ** globs recursively")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the full conversion log of every workbook")
+    parser.add_argument("--sheet-workers", type=int, default=1, help="Worker processes per workbook migrating sheets in parallel (0: one per CPU, default: 1)")
+    parser.add_argument("-s", "--stream", action="store_true", help="Stream finished sheets to disk to convert workbooks too large for memory")
+    parser.add_argument("--fast-reader", action="store_true", help="Parse the input sheet XML directly instead of through openpyxl (falls back to openpyxl on unknown content)")
+    parser.add_argument("--no-cache", action="store_true", help="Always convert every sheet, do not use the conversion cache or reuse unchanged sheets")
+    parser.add_argument("--cache-dir", default=None, help="Conversion cache directory (default: %s)" % (defaultCacheDir()))
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_BYTES // (1024 * 1024), help="Evict least recently used cache entries above this size")
+    parser.add_argument("--cache-max-days", type=int, default=CACHE_MAX_AGE_DAYS, help="Evict cache entries not used for this many days")
+    parser.add_argument("-p", "--profile", action="store_true", help="Write a JSON timing/memory report of every stage next to each output")
+    parser.add_argument("--profile-table", action="store_true", help="Also print the stage report as a table (implies --profile)")
+    parser.add_argument("--trace-memory", action="store_true", help="Add tracemalloc peaks to the stage report, slows conversion (implies --profile)")
+    parser.add_argument("--log-level", choices=sorted(LOG_LEVELS, key=LOG_LEVELS.get), default="info", help="Least severe messages to log (default: info)")
+    parser.add_argument("--log-file", action="store_true", help="Write the conversion log of every workbook next to its output (<output>_log.txt)")
+    parser.add_argument("--export", action="append", choices=sorted(EXPORT_SINKS), metavar="FORMAT",
+                        help="Also export every migrated schedule as typed columns: csv, sqlite or parquet (needs pyarrow), repeat for several formats")
+    args = parser.parse_args(argv)
+
+    #Each format once, in the order given
+    args.export = list(collections.OrderedDict.fromkeys(args.export or []))
+    return args
+
+def main(argv=None):
+    args = parseArguments(argv)
+
+    #No inputs given, fall back to the file picker
+    if len(args.inputs) == 0:
+        log.level = LOG_LEVELS[args.log_level]
+        mainGUI()
+        return
+
+    if "parquet" in args.export and loadPyarrow() is None:
+        log.warning("WARNING: pyarrow is not installed, Parquet files will not be exported")
+
+    workbookPaths = collectInputWorkbooks(args.inputs, args.recursive)
+    if len(workbookPaths) == 0:
+        log.error("ERROR: No Excel documents found to convert.")
+        exit(1)
+
+    exit(runBatch(workbookPaths, args.workers, verbose=args.verbose, streamOutput=args.stream,
+                  profile=args.profile, profileTable=args.profile_table, traceMemory=args.trace_memory,
+                  sheetWorkers=args.sheet_workers, useCache=not args.no_cache, cacheDir=args.cache_dir, incremental=not args.no_cache,
+                  cacheMaxBytes=args.cache_max_mb * 1024 * 1024, cacheMaxAgeDays=args.cache_max_days,
+                  logLevel=LOG_LEVELS[args.log_level], logFile=args.log_file, fastReader=args.fast_reader,
+                  exportFormats=args.export))
+
+def mainGUI():
+    from tkinter.filedialog import askopenfilename
 
-def main():
     #Get input file from user using Explorer
     validFile = False
     while not validFile:
         filename = askopenfilename()
         #Check if user cancelled or closed the file selection window
         if filename == "":
-            zprint("No file was selected. Exiting.")
+            log.info("No file was selected. Exiting.")
             exit(0)
-        zprint("Excel file selected: %s" % (filename))
+        log.info("Excel file selected: %s", filename)
 
         #Make sure input file is an excel sheet
         name, ext = os.path.splitext(filename)
-        zprint("File: %s -- Ext: %s" % (name, ext))
+        log.info("File: %s -- Ext: %s", name, ext)
 
         if "xls" in ext:
             if os.path.exists(filename):
                 validFile = True
             else:
-                zprint("ERROR: File selected does not exist: \"%s\"" % (filename))
+                log.error("ERROR: File selected does not exist: \"%s\"", filename)
                 validFile = False
         else:
-            zprint("ERROR: You must provide an Excel document as input. The file you selected: %s" % (filename))
+            log.error("ERROR: You must provide an Excel document as input. The file you selected: %s", filename)
             validFile = False
 
-    zprint("Converting file: %s" % (filename))
+    log.info("Converting file: %s", filename)
 
     #Create class to handle the migration
     migrateExcel = MigrateExcel(filename)
@@ -2414,6 +4839,7 @@ def main():
     # https://openpyxl.readthedocs.io/en/stable/usage.html
 
     #Open both input and output workbooks to start
+    # NOTE: Input workbook is parsed once, cached values are read on demand
     migrateExcel.openIWB()
     migrateExcel.openIWB_dataOnly()
     migrateExcel.openOWB()
@@ -2424,13 +4850,11 @@ def main():
     #Starts migrating all input workbook sheets to output workbook
     migrateExcel.startMigration()
 
-    #Write final workbook
-    migrateExcel.writeOWB()
-
-    #Fix column widths, headers, and a few other cleanups
-    # NOTE: This is required due to bug in openpyxl that wont allow column
-    #       width assignments after writing values to cell
+    #Fix column widths, headers, and a few other cleanups on the in-memory workbook
     migrateExcel.finalPolishing()
 
+    #Write final workbook (single save)
+    migrateExcel.writeOWB()
+
 if __name__ == '__main__':
     main()